@@ -0,0 +1,335 @@
+"""
+Walker constellation optimizer
+Searches T/P/F combinations and altitudes for the fewest satellites that meet
+a revisit and coverage target, evaluating candidates in a process pool.
+Each request searches within a time budget; progress is cached, so designs
+for the built-in mission profiles are precomputed at startup.
+"""
+
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, List, Optional, Sequence, Tuple
+import math
+import os
+import threading
+import time
+
+from app.calculators.coverage import footprint_half_angle, simulate_coverage
+from app.calculators.propagation import EARTH_RADIUS_KM, MU_KM3_S2
+
+MAX_SATELLITES = 48
+MAX_PLANES = 12
+
+# Coarser grid and step than request-time coverage: candidates only need ranking
+_CANDIDATE_MAX_CELLS = 600
+_CANDIDATE_STEP_S = 120.0
+
+# Longest one request searches; past it the best design found so far is
+# returned, marked as not necessarily minimal
+SEARCH_BUDGET_S = 2.0
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+# (best design, highest fully-searched satellite count) per (revisit, latitude band, altitude, ...) key,
+# least recently used first; shared by the threadpool stages of concurrent requests
+_MAX_CACHED = 512
+_cache: "OrderedDict[Tuple, Tuple[Optional[Dict], int]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+class SearchBudgetExceeded(Exception):
+    """The search budget ran out before any design meeting the targets was found"""
+
+
+def sso_inclination(altitude_km: float) -> float:
+    """Sun-synchronous inclination for a circular orbit"""
+    semi_major_axis = EARTH_RADIUS_KM + altitude_km
+    return round(math.degrees(math.acos(-((semi_major_axis / 12352.0) ** 3.5))), 2)
+
+
+def _cached(key: Tuple) -> Optional[Tuple[Optional[Dict], int]]:
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is not None:
+            _cache.move_to_end(key)
+        return entry
+
+
+def _store(key: Tuple, entry: Tuple[Optional[Dict], int]):
+    with _cache_lock:
+        _cache[key] = entry
+        _cache.move_to_end(key)
+        while len(_cache) > _MAX_CACHED:
+            _cache.popitem(last=False)
+
+
+def latitude_band(lat_min: float, lat_max: float, step: float = 10.0) -> Tuple[float, float]:
+    """Widen a latitude range to step-degree boundaries so nearby requests share results"""
+    return (max(-90.0, math.floor(lat_min / step) * step), min(90.0, math.ceil(lat_max / step) * step))
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+        return _executor
+
+
+def shutdown_optimizer():
+    """Stop the worker pool (called on application shutdown)"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def _evaluate(candidate: Dict) -> Dict:
+    """Simulate one candidate design (runs in a worker process)"""
+    result = simulate_coverage(
+        altitude_km=candidate["altitude_km"],
+        inclination_deg=candidate["inclination_deg"],
+        satellites=candidate["satellites"],
+        planes=candidate["planes"],
+        phasing=candidate["phasing"],
+        swath_km=candidate["swath_km"],
+        regions=[candidate["band"]],
+        duration_hours=candidate["window_hours"],
+        step_s=_CANDIDATE_STEP_S,
+        max_cells=_CANDIDATE_MAX_CELLS,
+    )
+    stats = next(iter(result["regions"].values()))
+    revisit = stats["gaps"]["p95_hours"] if stats["gaps"]["p95_hours"] is not None else stats["max_revisit_hours"]
+    return dict(
+        candidate,
+        configuration=result["configuration"],
+        coverage_percent=stats["coverage_percent"],
+        revisit_hours=revisit or 0.0,
+        mean_revisit_hours=stats["mean_revisit_hours"],
+    )
+
+
+def _min_satellites(revisit_hours: float, altitude_km: float, swath_km: Optional[float]) -> int:
+    """
+    Area-rate lower bound used to skip hopeless satellite counts
+
+    T satellites sweeping swath strips for one revisit period must at least
+    tile the globe once; halved because orbits crowd together at high latitudes.
+    """
+    swath = 2 * footprint_half_angle(altitude_km, swath_km) * EARTH_RADIUS_KM
+    ground_speed = math.sqrt(MU_KM3_S2 / (EARTH_RADIUS_KM + altitude_km)) * EARTH_RADIUS_KM / (EARTH_RADIUS_KM + altitude_km)
+    swept_km2 = swath * ground_speed * revisit_hours * 3600
+    return max(1, math.ceil(0.5 * 4 * math.pi * EARTH_RADIUS_KM ** 2 / swept_km2))
+
+
+def _walker_candidates(total: int) -> List[Tuple[int, int]]:
+    """(planes, phasing) pairs worth trying for T satellites"""
+    pairs = []
+    for planes in range(1, min(total, MAX_PLANES) + 1):
+        if total % planes:
+            continue
+        for phasing in sorted({0, 1, planes // 2}):
+            if phasing < planes:
+                pairs.append((planes, phasing))
+    return pairs
+
+
+def _max_coverage_percent(band: Tuple[float, float], inclination_deg: float, half_angle: float) -> float:
+    """Share of the band (by area) that ground tracks plus footprint can ever reach"""
+    reach = min(90.0, min(inclination_deg, 180.0 - inclination_deg) + math.degrees(half_angle))
+    lo, hi = max(band[0], -reach), min(band[1], reach)
+    if hi <= lo:
+        return 0.0
+    rad = math.radians
+    return 100.0 * (math.sin(rad(hi)) - math.sin(rad(lo))) / (math.sin(rad(band[1])) - math.sin(rad(band[0])))
+
+
+def _evaluate_levels(probes: Dict[float, int], band, window_hours, inclination_deg, swath_km,
+                     revisit_hours, coverage_target, deadline: Optional[float] = None) -> Dict[float, Optional[Dict]]:
+    """
+    Evaluate every Walker P/F for each (altitude, satellite count) probe in parallel
+
+    Raises:
+        SearchBudgetExceeded: deadline (time.monotonic) passed first; pending
+        candidates are cancelled
+    """
+    executor = _get_executor()
+    futures = []
+    for alt, total in probes.items():
+        for planes, phasing in _walker_candidates(total):
+            candidate = {
+                "altitude_km": alt,
+                "inclination_deg": inclination_deg if inclination_deg is not None else sso_inclination(alt),
+                "satellites": total,
+                "planes": planes,
+                "phasing": phasing,
+                "swath_km": swath_km,
+                "band": band,
+                "window_hours": window_hours,
+            }
+            futures.append(executor.submit(_evaluate, candidate))
+
+    best: Dict[float, Optional[Dict]] = {alt: None for alt in probes}
+    for future in futures:
+        try:
+            result = future.result(timeout=None if deadline is None else max(0.0, deadline - time.monotonic()))
+        except FutureTimeoutError:
+            for pending in futures:
+                pending.cancel()
+            raise SearchBudgetExceeded()
+        if result["coverage_percent"] < coverage_target or result["revisit_hours"] > revisit_hours:
+            continue
+        current = best[result["altitude_km"]]
+        if current is None or result["revisit_hours"] < current["revisit_hours"]:
+            best[result["altitude_km"]] = result
+    return best
+
+
+def _search(revisit_hours: float, band: Tuple[float, float], starts: Dict[float, int], cap: int,
+            inclination_deg: Optional[float], swath_km: Optional[float], coverage_target: float,
+            deadline: Optional[float] = None) -> Tuple[Dict[float, Tuple[Optional[Dict], int]], bool]:
+    """
+    Find the smallest feasible satellite count at each altitude
+
+    Feasibility is treated as monotonic in the satellite count: each altitude
+    gallops upward (doubling) until a count is feasible, then bisects down to
+    the smallest one. Every round evaluates one count per unresolved altitude,
+    all candidates in parallel, and drops altitudes that can no longer beat
+    the best count found at another altitude.
+
+    Args:
+        starts: First satellite count to try per altitude
+        cap: Largest satellite count worth trying
+
+    Returns:
+        ({altitude: (best design or None, highest satellite count known to be
+        infeasible)}, whether the deadline cut the search short); a design
+        is the smallest feasible count only if the count below it is infeasible
+    """
+    window_hours = max(24.0, 2 * revisit_hours)
+    infeasible = {alt: start - 1 for alt, start in starts.items()}
+    best: Dict[float, Optional[Dict]] = {alt: None for alt in starts}
+
+    while True:
+        limit = min([d["satellites"] for d in best.values() if d is not None] + [cap])
+        probes = {}
+        for alt in starts:
+            lo = infeasible[alt]
+            hi = best[alt]["satellites"] if best[alt] is not None else None
+            if hi is not None and hi - lo <= 1:
+                continue
+            if hi is None:
+                if lo >= limit:
+                    continue
+                probes[alt] = min(limit, max(lo + 1, 2 * lo))
+            else:
+                probes[alt] = (lo + hi) // 2
+        if not probes:
+            break
+
+        try:
+            found = _evaluate_levels(probes, band, window_hours, inclination_deg, swath_km, revisit_hours,
+                                     coverage_target, deadline)
+        except SearchBudgetExceeded:
+            return {alt: (best[alt], infeasible[alt]) for alt in starts}, True
+        for alt, total in probes.items():
+            if found[alt] is not None:
+                best[alt] = found[alt]
+            else:
+                infeasible[alt] = total
+
+    return {alt: (best[alt], infeasible[alt]) for alt in starts}, False
+
+
+def optimize_constellation(
+    revisit_hours: float,
+    lat_range: Tuple[float, float] = (-60.0, 60.0),
+    altitudes: Sequence[float] = (500.0, 550.0, 600.0, 700.0),
+    inclination_deg: Optional[float] = None,
+    swath_km: Optional[float] = 100.0,
+    coverage_target: float = 90.0,
+    fixed_total: Optional[int] = None,
+    budget_s: Optional[float] = SEARCH_BUDGET_S,
+) -> Optional[Dict]:
+    """
+    Fewest-satellite Walker design meeting the revisit and coverage targets
+
+    Args:
+        revisit_hours: Required revisit (95th percentile coverage gap)
+        lat_range: Latitude range of interest (widened to 10-degree bands)
+        altitudes: Candidate circular orbit altitudes
+        inclination_deg: Fixed inclination (None = sun-synchronous per altitude)
+        swath_km: Payload swath width
+        coverage_target: Minimum share of the band covered at least once (%)
+        fixed_total: Only search planes/phasing for this satellite count
+        budget_s: Search time limit (None = no limit, 0 = cached results only)
+
+    Returns:
+        Best design dict (satellites, planes, phasing, altitude_km, ...,
+        minimal) or None if no candidate up to MAX_SATELLITES meets the
+        targets; minimal is False when the budget ran out before fewer
+        satellites were ruled out
+
+    Raises:
+        SearchBudgetExceeded: the budget ran out before any design was found
+    """
+    band = latitude_band(*lat_range)
+    revisit_key = round(revisit_hours, 1)
+
+    def key(alt):
+        return (revisit_key, band, alt, inclination_deg, swath_km, coverage_target, fixed_total)
+
+    # Cache entries are (design, searched_to): a design is the smallest feasible
+    # count at that altitude; every count up to searched_to is infeasible.
+    # Read once and kept locally, so evictions by other requests cannot undo
+    # progress made in this call
+    known = {alt: _cached(key(alt)) for alt in altitudes}
+    for alt in altitudes:
+        inclination = inclination_deg if inclination_deg is not None else sso_inclination(alt)
+        if known[alt] is None and _max_coverage_percent(band, inclination, footprint_half_angle(alt, swath_km)) < coverage_target:
+            known[alt] = (None, MAX_SATELLITES)
+            _store(key(alt), known[alt])
+
+    deadline = None if budget_s is None else time.monotonic() + budget_s
+    exhausted = False
+    # Feasible designs from a search cut short, not known to be the smallest
+    unproven: List[Dict] = []
+    while True:
+        entries = {alt: known[alt] or (None, 0) for alt in altitudes}
+        designs = [design for design, _ in entries.values() if design is not None]
+        cap = min([d["satellites"] for d in designs + unproven] + [fixed_total or MAX_SATELLITES])
+
+        starts = {}
+        for alt, (design, searched) in entries.items():
+            if design is not None:
+                continue
+            first = max(searched + 1, fixed_total or _min_satellites(revisit_hours, alt, swath_km))
+            if first <= cap:
+                starts[alt] = first
+        if not starts:
+            break
+        if deadline is not None and time.monotonic() >= deadline:
+            exhausted = True
+            break
+
+        found, exhausted = _search(revisit_hours, band, starts, cap, inclination_deg, swath_km, coverage_target, deadline)
+        for alt, (design, searched) in found.items():
+            if design is not None and design["satellites"] - searched > 1:
+                # Only the infeasible counts are cached, so a later search resumes from them
+                unproven.append(design)
+                design = None
+            known[alt] = (design, max(searched, entries[alt][1]))
+            _store(key(alt), known[alt])
+        if exhausted:
+            designs = [entry[0] for entry in known.values() if entry is not None and entry[0] is not None]
+            break
+
+    candidates = designs + unproven
+    if not candidates:
+        if exhausted:
+            raise SearchBudgetExceeded()
+        return None
+    best = min(candidates, key=lambda d: (d["satellites"], d["revisit_hours"], d["altitude_km"]))
+    return dict(best, minimal=not exhausted)
@@ -0,0 +1,415 @@
+"""
+Grid-based coverage and revisit simulation
+Propagates a Walker constellation over a time window and evaluates swath
+footprints against a lat/lon grid using vectorized array operations
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import math
+import numpy as np
+
+from app.calculators.propagation import (
+    EARTH_RADIUS_KM,
+    mean_motion_rad_s,
+    walker_elements,
+    propagate_circular,
+    latlon_to_unit,
+)
+
+# Region bounding boxes: lon_min, lon_max, lat_min, lat_max
+# (lon_min > lon_max means the box crosses the antimeridian)
+REGION_BOUNDS = {
+    "global": [-180.0, 180.0, -80.0, 80.0],
+    "india": [68.7, 97.4, 8.1, 37.6],
+    "punjab": [73.8, 77.0, 29.5, 32.6],
+    "haryana": [74.4, 77.6, 27.6, 31.0],
+    "maharashtra": [72.6, 80.9, 15.6, 22.1],
+    "karnataka": [74.0, 78.6, 11.5, 18.5],
+    "asia-pacific": [60.0, -150.0, -50.0, 55.0],
+    "americas": [-170.0, -30.0, -56.0, 72.0],
+    "europe": [-25.0, 45.0, 35.0, 72.0],
+    "indian ocean": [40.0, 110.0, -45.0, 25.0],
+    "pacific": [120.0, -70.0, -60.0, 60.0],
+    "atlantic": [-80.0, 15.0, -60.0, 65.0],
+    "amazon": [-80.0, -44.0, -20.0, 5.0],
+    "california": [-124.5, -114.1, 32.5, 42.0],
+    "australia": [112.0, 154.0, -44.0, -10.0],
+    "indonesia": [95.0, 141.0, -11.0, 6.0],
+}
+
+# Swath assumed for medium-resolution imagers when the payload is unspecified
+DEFAULT_SWATH_KM = 100.0
+
+# Upper bound on (time x satellite x cell) elements evaluated per chunk
+_CHUNK_ELEMENTS = 4_000_000
+
+
+def resolve_region(region: Optional[str]) -> str:
+    """Map a free-text region name onto a REGION_BOUNDS key (defaults to global)"""
+    text = (region or "").strip().lower()
+    if text in REGION_BOUNDS:
+        return text
+    for name in REGION_BOUNDS:
+        if name in text:
+            return name
+    return "global"
+
+
+def footprint_half_angle(altitude_km: float, swath_km: Optional[float] = None, min_elevation_deg: float = 10.0) -> float:
+    """
+    Earth central half-angle (rad) seen by the payload
+
+    Uses the swath width when given, capped by the horizon at the
+    minimum elevation angle.
+    """
+    eps = math.radians(min_elevation_deg)
+    horizon = math.acos(EARTH_RADIUS_KM * math.cos(eps) / (EARTH_RADIUS_KM + altitude_km)) - eps
+    if swath_km:
+        return min(horizon, (swath_km / 2.0) / EARTH_RADIUS_KM)
+    return horizon
+
+
+def region_bounds(region: Union[str, Sequence[float]]) -> Tuple[str, List[float]]:
+    """
+    Resolve a region to (name, bounds)
+
+    Accepts a region name, or a (lat_min, lat_max) latitude band covering all longitudes.
+    """
+    if isinstance(region, str) or region is None:
+        name = resolve_region(region)
+        return name, REGION_BOUNDS[name]
+    lat_min, lat_max = region
+    return f"lat {lat_min:g}..{lat_max:g}", [-180.0, 180.0, float(lat_min), float(lat_max)]
+
+
+class Grid:
+    """Regular lat/lon grid of cell centers over a region"""
+
+    def __init__(self, bounds: Sequence[float], max_cells: int = 2000, grid_step_deg: Optional[float] = None):
+        lon_min, lon_max, lat_min, lat_max = bounds
+        if lon_max <= lon_min:
+            lon_max += 360.0
+        lon_span = lon_max - lon_min
+        lat_span = lat_max - lat_min
+
+        if grid_step_deg is None:
+            grid_step_deg = max(0.05, math.sqrt(lon_span * lat_span / max_cells))
+
+        self.n_lon = max(1, int(round(lon_span / grid_step_deg)))
+        self.n_lat = max(1, int(round(lat_span / grid_step_deg)))
+        self.lon_min, self.lat_min = lon_min, lat_min
+        self.dlon = lon_span / self.n_lon
+        self.dlat = lat_span / self.n_lat
+        self.lat_max = lat_max
+        self.wraps = lon_span >= 360.0
+        self.step_deg = grid_step_deg
+
+        lons = lon_min + (np.arange(self.n_lon) + 0.5) * self.dlon
+        lats = lat_min + (np.arange(self.n_lat) + 0.5) * self.dlat
+        self.lats = lats
+        lat_grid, lon_grid = np.meshgrid(lats, lons, indexing="ij")
+        self.cells = latlon_to_unit(lat_grid.ravel(), lon_grid.ravel())
+        weights = np.cos(np.radians(lat_grid.ravel()))
+        self.weights = weights / weights.sum()
+
+    def __len__(self):
+        return self.n_lat * self.n_lon
+
+
+def _dense_access(position, normal, cells, samples, covered, half_angle, half_step):
+    """Test every cell at each time step that has a sample near the region"""
+    n_sats = position.shape[1]
+    steps = np.unique(samples // n_sats)
+    chunk = max(1, _CHUNK_ELEMENTS // max(1, n_sats * len(cells)))
+    cells_t = cells.T.astype(np.float32)
+
+    for start in range(0, steps.size, chunk):
+        batch = steps[start:start + chunk]
+        along = position[batch].reshape(-1, 3).astype(np.float32) @ cells_t
+        cross = normal[batch].reshape(-1, 3).astype(np.float32) @ cells_t
+        hits = _in_swath(along, cross, half_angle, half_step)
+        covered[batch] = hits.reshape(batch.size, n_sats, -1).any(axis=1)
+
+    return covered
+
+
+def _footprint_access(lat, rel_lon, samples, n_sats, grid: Grid, half_angle, covered):
+    """
+    Mark the cells inside each sample's footprint circle, row by row
+
+    On a grid row at latitude phi the circle of angular radius h around a
+    sub-satellite point (phi_s, lon_s) covers exactly the cells with
+    cos(lon - lon_s) >= (cos h - sin phi_s sin phi) / (cos phi_s cos phi),
+    one contiguous run of columns. Each (sample, row) pair within reach in
+    latitude is therefore a column interval, marked through a difference
+    array, and no per-cell dot products are needed.
+    """
+    reach = math.degrees(half_angle)
+    n_lat, n_lon = grid.n_lat, grid.n_lon
+    s_lat, s_lon = lat[samples], rel_lon[samples]
+
+    # Rows whose cell centers are within reach in latitude
+    row_lo = np.maximum(0, np.ceil((s_lat - reach - grid.lat_min) / grid.dlat - 0.5)).astype(np.int64)
+    row_hi = np.minimum(n_lat - 1, np.floor((s_lat + reach - grid.lat_min) / grid.dlat - 0.5)).astype(np.int64)
+    counts = np.maximum(0, row_hi - row_lo + 1)
+    pair_sample = np.repeat(np.arange(samples.size), counts)
+    first = np.cumsum(counts) - counts
+    row = np.repeat(row_lo - first, counts) + np.arange(pair_sample.size)
+
+    phi_s, phi = np.radians(s_lat), np.radians(grid.lats)
+    sin_s, cos_s = np.sin(phi_s)[pair_sample], np.cos(phi_s)[pair_sample]
+    bound = (math.cos(half_angle) - sin_s * np.sin(phi)[row]) / np.maximum(cos_s * np.cos(phi)[row], 1e-12)
+    reached = bound <= 1.0
+    pair_sample, row = pair_sample[reached], row[reached]
+    half_width = np.degrees(np.arccos(np.maximum(bound[reached], -1.0)))
+
+    # Column interval of cell centers within half_width of the sample; an
+    # interval past 0 or 360 degrees (relative to the grid's western edge)
+    # also continues a full turn away
+    def columns(center, half_width):
+        return (np.ceil((center - half_width) / grid.dlon - 0.5).astype(np.int64),
+                np.floor((center + half_width) / grid.dlon - 0.5).astype(np.int64))
+
+    center = s_lon[pair_sample]
+    t = samples[pair_sample] // n_sats
+    parts = [(t, row, *columns(center, half_width))]
+    for outside, shift in ((center - half_width < 0, 360.0), (center + half_width >= 360.0, -360.0)):
+        parts.append((t[outside], row[outside], *columns(center[outside] + shift, half_width[outside])))
+    t, row, lo, hi = (np.concatenate(arrays) for arrays in zip(*parts))
+    lo, hi = np.maximum(lo, 0), np.minimum(hi, n_lon - 1)
+    keep = lo <= hi
+    t, row, lo, hi = t[keep], row[keep], lo[keep], hi[keep]
+
+    # One difference array per block of time steps bounds the memory used
+    row_width = n_lon + 1
+    block = max(1, _CHUNK_ELEMENTS // (n_lat * row_width))
+    for start in range(0, covered.shape[0], block):
+        stop = min(covered.shape[0], start + block)
+        sel = slice(None) if block >= covered.shape[0] else (t >= start) & (t < stop)
+        base = ((t[sel] - start) * n_lat + row[sel]) * row_width
+        size = (stop - start) * n_lat * row_width
+        diff = np.bincount(base + lo[sel], minlength=size) - np.bincount(base + hi[sel] + 1, minlength=size)
+        runs = np.cumsum(diff.reshape(stop - start, n_lat, row_width)[..., :-1], axis=-1)
+        covered[start:stop] = (runs > 0).reshape(stop - start, -1)
+    return covered
+
+
+def _in_swath(along, cross, half_angle, half_step):
+    """
+    Swath test from dot products with the sub-satellite point and orbit normal
+
+    A cell is covered when it lies within the strip swept between samples
+    (cross-track and along-track test) or inside the nadir footprint.
+    """
+    cos_step_sq = math.cos(half_step) ** 2
+    in_strip = (np.abs(cross) <= math.sin(half_angle)) & (along >= 0) & (
+        along * along + cos_step_sq * cross * cross >= cos_step_sq
+    )
+    return in_strip | (along >= math.cos(half_angle))
+
+
+def _access_matrix(position, normal, grid: Grid, half_angle, half_step):
+    """
+    Boolean (T, G) matrix: True where any satellite's swath covers the cell
+    during the step centered on each sample
+
+    Each sample only tests the window of grid cells within reach of its
+    sub-satellite point, so cost scales with footprint size rather than
+    with the full grid.
+    """
+    n_times, n_sats, _ = position.shape
+    reach = math.degrees(half_angle + half_step)
+
+    lat = np.degrees(np.arcsin(np.clip(position[..., 2], -1.0, 1.0))).ravel()
+    lon = np.degrees(np.arctan2(position[..., 1], position[..., 0])).ravel()
+
+    # Drop samples that cannot reach the region at all
+    stretch = 1.0 / np.cos(np.radians(np.minimum(89.0, np.abs(lat) + reach)))
+    lon_reach = reach * stretch
+    rel_lon = np.mod(lon - grid.lon_min, 360.0)
+    near = (lat >= grid.lat_min - reach) & (lat <= grid.lat_max + reach)
+    if not grid.wraps:
+        span = grid.n_lon * grid.dlon
+        near &= (rel_lon <= span + lon_reach) | (rel_lon >= 360.0 - lon_reach)
+    samples = np.nonzero(near)[0]
+
+    covered = np.zeros((n_times, len(grid)), dtype=bool)
+    if samples.size == 0:
+        return covered
+
+    # With footprints much wider than the step, consecutive circles overlap and
+    # the along-track strip test is skipped
+    footprint_only = half_angle >= 2 * half_step
+    if footprint_only:
+        return _footprint_access(lat, rel_lon, samples, n_sats, grid, half_angle, covered)
+
+    n_lat_w = min(grid.n_lat, int(math.ceil(2 * reach / grid.dlat)) + 1)
+    n_lon_w = min(grid.n_lon, int(math.ceil(2 * lon_reach[samples].max() / grid.dlon)) + 1)
+    # The dense path costs a few ns per (sample, cell) pair against tens of ns
+    # per windowed candidate, so only window when it prunes most of the grid
+    if n_lat_w * n_lon_w * 8 >= len(grid):
+        return _dense_access(position, normal, grid.cells, samples, covered, half_angle, half_step)
+
+    lat_idx = np.floor((lat[samples] - reach - grid.lat_min) / grid.dlat).astype(np.int64)
+    lon_off = np.where(rel_lon[samples] > 180.0 + grid.n_lon * grid.dlon / 2, rel_lon[samples] - 360.0, rel_lon[samples])
+    lon_idx = np.floor((lon_off - lon_reach[samples]) / grid.dlon).astype(np.int64)
+
+    win_lat = lat_idx[:, None, None] + np.arange(n_lat_w)[None, :, None]
+    win_lon = lon_idx[:, None, None] + np.arange(n_lon_w)[None, None, :]
+    if grid.wraps:
+        win_lon = np.mod(win_lon, grid.n_lon)
+    valid = (win_lat >= 0) & (win_lat < grid.n_lat) & (win_lon >= 0) & (win_lon < grid.n_lon)
+
+    sample_idx = np.broadcast_to(samples[:, None, None], valid.shape)[valid]
+    cell_idx = (np.broadcast_to(win_lat, valid.shape) * grid.n_lon + np.broadcast_to(win_lon, valid.shape))[valid]
+
+    cells = grid.cells[cell_idx]
+    along = np.einsum("ij,ij->i", cells, position.reshape(-1, 3)[sample_idx])
+    cross = np.einsum("ij,ij->i", cells, normal.reshape(-1, 3)[sample_idx])
+    hit = _in_swath(along, cross, half_angle, half_step)
+
+    covered[sample_idx[hit] // n_sats, cell_idx[hit]] = True
+    return covered
+
+
+def _revisit_statistics(covered: np.ndarray, weights: np.ndarray, step_s: float) -> Dict:
+    """
+    Coverage, revisit and gap statistics from a (T, G) access matrix
+
+    Revisit time is the gap between the end of one access and the start of
+    the next, with the window treated as periodic so single-pass cells still
+    get a revisit estimate. Cells that are covered throughout have zero revisit.
+    """
+    n_times, n_cells = covered.shape
+    step_h = step_s / 3600.0
+
+    # Work cell-major so nonzero() yields accesses grouped by cell, in time order
+    # Every access contributes a rising then a falling edge, so the nonzero
+    # edges alternate start/end within each cell
+    padded = np.zeros((n_cells, n_times + 2), dtype=np.int8)
+    padded[:, 1:-1] = covered.T
+    edge_cell, edge_t = np.nonzero(np.diff(padded, axis=1))
+    start_cell, start_t = edge_cell[0::2], edge_t[0::2]
+    end_t = edge_t[1::2]
+
+    accesses = np.bincount(start_cell, minlength=n_cells)
+    seen = accesses > 0
+
+    same_cell = start_cell[1:] == start_cell[:-1]
+    gaps = (start_t[1:] - end_t[:-1])[same_cell]
+    gap_cells = start_cell[1:][same_cell]
+
+    # Wrap-around gap from each cell's last access to its first
+    if start_cell.size:
+        first = np.flatnonzero(np.r_[True, ~same_cell])
+        last = np.r_[first[1:] - 1, start_cell.size - 1]
+        wrap = start_t[first] + n_times - end_t[last]
+        gaps = np.concatenate([gaps, wrap])
+        gap_cells = np.concatenate([gap_cells, start_cell[first]])
+        keep = gaps > 0
+        gaps, gap_cells = gaps[keep] * step_h, gap_cells[keep]
+
+    gap_count = np.bincount(gap_cells, minlength=n_cells) if gaps.size else np.zeros(n_cells)
+    gap_total = np.bincount(gap_cells, weights=gaps, minlength=n_cells) if gaps.size else np.zeros(n_cells)
+    mean_revisit = gap_total / np.maximum(gap_count, 1)
+    max_revisit = np.zeros(n_cells)
+    if gaps.size:
+        np.maximum.at(max_revisit, gap_cells, gaps)
+
+    seen_weight = weights[seen].sum()
+
+    return {
+        "coverage_percent": round(float(seen_weight) * 100, 1),
+        "time_coverage_percent": round(float((covered.mean(axis=0) * weights).sum()) * 100, 2),
+        "mean_revisit_hours": _round(float((mean_revisit * weights)[seen].sum() / seen_weight)) if seen.any() else None,
+        "max_revisit_hours": _round(float(max_revisit[seen].max())) if seen.any() else None,
+        "gaps": {
+            "count": int(gaps.size),
+            "mean_hours": _round(float(gaps.mean())) if gaps.size else None,
+            "p95_hours": _round(float(np.percentile(gaps, 95))) if gaps.size else None,
+            "max_hours": _round(float(gaps.max())) if gaps.size else None,
+        },
+        "grid_cells": int(n_cells),
+    }
+
+
+def _round(value):
+    return None if value is None else round(value, 2)
+
+
+def simulate_coverage(
+    altitude_km: float,
+    inclination_deg: float,
+    satellites: int,
+    planes: int = 1,
+    phasing: int = 0,
+    swath_km: Optional[float] = None,
+    regions: Sequence[Union[str, Sequence[float]]] = ("global",),
+    duration_hours: float = 24.0,
+    step_s: float = 60.0,
+    max_cells: int = 2000,
+    min_elevation_deg: float = 10.0,
+) -> Dict:
+    """
+    Simulate coverage of a Walker T/P/F constellation over one or more regions
+
+    Args:
+        altitude_km: Circular orbit altitude
+        inclination_deg: Orbit inclination
+        satellites: Total satellites (T)
+        planes: Orbital planes (P)
+        phasing: Walker phasing factor (F)
+        swath_km: Payload swath width (None = field of view down to min elevation)
+        regions: Region names (see REGION_BOUNDS) or (lat_min, lat_max) bands
+        duration_hours: Simulation window
+        step_s: Propagation step
+        max_cells: Grid cell budget per region
+
+    Returns:
+        Dict with constellation description and per-region statistics
+    """
+    satellites = max(1, int(satellites))
+    planes = max(1, min(int(planes or 1), satellites))
+    while satellites % planes:
+        planes -= 1
+
+    times = np.arange(0.0, duration_hours * 3600.0, step_s)
+    raan, arg_lat = walker_elements(satellites, planes, phasing)
+    position, normal = propagate_circular(altitude_km, inclination_deg, raan, arg_lat, times)
+
+    half_angle = footprint_half_angle(altitude_km, swath_km, min_elevation_deg)
+    half_step = float(mean_motion_rad_s(altitude_km)) * step_s / 2.0
+
+    results = {}
+    for region in regions:
+        name, bounds = region_bounds(region)
+        if name in results:
+            continue
+        grid = Grid(bounds, max_cells)
+        covered = _access_matrix(position, normal, grid, half_angle, half_step)
+        stats = _revisit_statistics(covered, grid.weights, step_s)
+        stats["grid_step_deg"] = round(grid.step_deg, 2)
+        results[name] = stats
+
+    return {
+        "configuration": f"Walker {satellites}/{planes}/{phasing}",
+        "satellites": satellites,
+        "planes": planes,
+        "altitude_km": altitude_km,
+        "inclination_deg": inclination_deg,
+        "window_hours": duration_hours,
+        "step_s": step_s,
+        "regions": results,
+    }
+
+
+def summarize_coverage(result: Dict) -> Dict:
+    """Average the per-region statistics of simulate_coverage() into one score"""
+    stats: List[Dict] = list(result["regions"].values())
+    revisits = [s["mean_revisit_hours"] for s in stats if s["mean_revisit_hours"] is not None]
+    max_revisits = [s["max_revisit_hours"] for s in stats if s["max_revisit_hours"] is not None]
+    return {
+        "coverage_percent": round(sum(s["coverage_percent"] for s in stats) / len(stats), 1),
+        "mean_revisit_hours": round(sum(revisits) / len(revisits), 2) if revisits else None,
+        "max_revisit_hours": max(max_revisits) if max_revisits else None,
+    }
@@ -1,4 +1,9 @@
 from app.schemas.mission import OrbitInfo, ConstellationInfo, DataInfo, GroundInfo
+from app.calculators.coverage import region_bounds, DEFAULT_SWATH_KM
+from app.calculators.constellation_optimizer import (
+    optimize_constellation, MAX_SATELLITES, SEARCH_BUDGET_S, SearchBudgetExceeded
+)
+from app.calculators.passes import predict_passes, select_stations, summarize_passes
 
 
 def estimate_orbit(mission_type: str = "earth_observation") -> OrbitInfo:
@@ -10,13 +15,46 @@ def estimate_orbit(mission_type: str = "earth_observation") -> OrbitInfo:
     )
 
 
-def estimate_constellation(orbit_period: float = 95.0) -> ConstellationInfo:
-    sats = 3
+def estimate_constellation(orbit: OrbitInfo, revisit_hours: float = 24.0, region: str = "global",
+                           swath_km: float = DEFAULT_SWATH_KM, budget_s: float = SEARCH_BUDGET_S) -> ConstellationInfo:
+    _, bounds = region_bounds(region)
+    try:
+        design = optimize_constellation(
+            revisit_hours=revisit_hours,
+            lat_range=(bounds[2], bounds[3]),
+            altitudes=(orbit.altitude_km,),
+            inclination_deg=orbit.inclination_deg,
+            swath_km=swath_km,
+            budget_s=budget_s,
+        )
+    except SearchBudgetExceeded:
+        sats = 3
+        return ConstellationInfo(
+            satellites=sats,
+            configuration="Walker",
+            phasing_deg=360.0 / sats,
+            coverage_note=f"Not optimized: no Walker design for {revisit_hours}h revisit found within the search budget",
+        )
+
+    if design is None:
+        sats = 3
+        return ConstellationInfo(
+            satellites=sats,
+            configuration="Walker",
+            phasing_deg=360.0 / sats,
+            coverage_note=f"No Walker design up to {MAX_SATELLITES} satellites meets {revisit_hours}h revisit",
+        )
+
+    sats = design["satellites"]
     return ConstellationInfo(
         satellites=sats,
-        configuration="Walker",
-        phasing_deg=360.0 / sats,
-        coverage_note=f"{sats} satellites for daily coverage",
+        configuration=design["configuration"],
+        phasing_deg=360.0 * design["phasing"] / sats,
+        coverage_note=(
+            f"{sats} satellites in {design['planes']} planes for {revisit_hours}h revisit "
+            f"({design['coverage_percent']:.0f}% coverage, p95 gap {design['revisit_hours']}h)"
+        ),
+        planes=design["planes"],
     )
 
 
@@ -28,9 +66,22 @@ def estimate_data() -> DataInfo:
     )
 
 
-def estimate_ground(data_volume_gb: float = 10.5) -> GroundInfo:
+def estimate_ground(orbit: OrbitInfo, constellation: ConstellationInfo, data_volume_gb: float = 10.5) -> GroundInfo:
+    planes = max(1, constellation.planes)
+    prediction = predict_passes(
+        altitude_km=orbit.altitude_km,
+        inclination_deg=orbit.inclination_deg,
+        satellites=constellation.satellites,
+        planes=planes,
+        phasing=round(constellation.phasing_deg * constellation.satellites / 360.0) % planes,
+    )
+    stations = select_stations(prediction, data_volume_gb)
+    passes = summarize_passes(prediction, stations)
     return GroundInfo(
-        passes_per_day=4,
-        stations_needed=2,
-        avg_pass_duration_min=8.0,
+        passes_per_day=round(passes["passes_per_day"]),
+        stations_needed=len(stations),
+        avg_pass_duration_min=passes["avg_pass_duration_min"],
+        contact_minutes_per_day=passes["contact_minutes_per_day"],
+        downlink_capacity_GB=passes["capacity_GB_per_day"],
+        stations=stations,
     )
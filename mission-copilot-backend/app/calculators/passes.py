@@ -0,0 +1,241 @@
+"""
+Ground-station pass prediction
+Computes elevation of every satellite above every station over a time window
+in one array operation, then finds AOS/LOS crossings to size the downlink
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+import math
+import numpy as np
+
+from app.calculators.propagation import (
+    EARTH_RADIUS_KM,
+    walker_elements,
+    propagate_circular,
+    latlon_to_unit,
+)
+
+# Commercial and agency ground stations commonly used by LEO missions: name, lat, lon
+GROUND_STATIONS = [
+    ("Svalbard", 78.23, 15.41),
+    ("Troll", -72.01, 2.53),
+    ("Kiruna", 67.86, 20.96),
+    ("Fairbanks", 64.86, -147.85),
+    ("Punta Arenas", -52.94, -70.85),
+    ("Awarua", -46.53, 168.38),
+    ("Matera", 40.65, 16.70),
+    ("Wallops", 37.94, -75.46),
+    ("Hawaii", 19.01, -155.66),
+    ("Hyderabad", 17.03, 78.18),
+    ("Bangalore", 13.03, 77.51),
+    ("Singapore", 1.35, 103.82),
+    ("Hartebeesthoek", -25.89, 27.69),
+    ("Alice Springs", -23.76, 133.88),
+    ("Santiago", -33.15, -70.67),
+]
+
+# X-band downlink rate assumed when the mission does not specify one
+DEFAULT_DOWNLINK_MBPS = 150.0
+
+# Upper bound on (time x satellite x station) elements evaluated per chunk
+_CHUNK_ELEMENTS = 2_000_000
+
+_MAX_CACHED = 256
+_cache: Dict[Tuple, Dict] = {}
+
+
+class StationSet:
+    """Station names and ECEF unit vectors, built once per station list"""
+
+    def __init__(self, stations: Sequence[Tuple[str, float, float]]):
+        self.names = [name for name, _, _ in stations]
+        lat = np.array([s[1] for s in stations], dtype=float)
+        lon = np.array([s[2] for s in stations], dtype=float)
+        self.lat, self.lon = lat, lon
+        self.unit = latlon_to_unit(lat, lon)
+
+    def __len__(self):
+        return len(self.names)
+
+
+_default_stations: Optional[StationSet] = None
+
+
+def get_stations() -> StationSet:
+    """Shared station set over GROUND_STATIONS"""
+    global _default_stations
+    if _default_stations is None:
+        _default_stations = StationSet(GROUND_STATIONS)
+    return _default_stations
+
+
+def _elevation(position, stations: StationSet, altitude_km: float) -> np.ndarray:
+    """
+    Elevation angle (rad) of each satellite above each station
+
+    Args:
+        position: Satellite ECEF unit vectors, shape (T, S, 3)
+
+    Returns:
+        Array of shape (T, S, G)
+    """
+    radius = EARTH_RADIUS_KM + altitude_km
+    cos_angle = position @ stations.unit.T
+    # Station-to-satellite range from the law of cosines on the central angle
+    slant = np.sqrt(radius ** 2 + EARTH_RADIUS_KM ** 2 - 2 * radius * EARTH_RADIUS_KM * cos_angle)
+    return np.arcsin(np.clip((radius * cos_angle - EARTH_RADIUS_KM) / slant, -1.0, 1.0))
+
+
+def _crossings(elevation: np.ndarray, mask_rad: float):
+    """
+    AOS/LOS sample positions of every pass in an elevation time series
+
+    Crossing times are linearly interpolated between samples; passes already
+    in progress at the window edges are clipped to the window.
+
+    Args:
+        elevation: Elevation (rad), shape (S, G, T)
+
+    Returns:
+        (satellite, station, aos, los, max_elevation_rad) arrays with one entry
+        per pass; aos/los are fractional sample indices
+    """
+    n_s, n_g, n_t = elevation.shape
+    above = elevation >= mask_rad
+    pad = np.zeros((n_s, n_g, 1), dtype=bool)
+    edges = np.diff(np.concatenate([pad, above, pad], axis=-1).astype(np.int8), axis=-1)
+
+    # Sample k is the first above the mask at a rise and the first below it at a fall;
+    # nonzero walks (satellite, station, time) in order, so rises and falls pair up
+    sat, sta, rise = np.nonzero(edges == 1)
+    fall = np.nonzero(edges == -1)[2]
+
+    def crossing(k):
+        before = np.clip(k - 1, 0, n_t - 1)
+        after = np.clip(k, 0, n_t - 1)
+        e0 = elevation[sat, sta, before]
+        e1 = elevation[sat, sta, after]
+        delta = np.where(e1 != e0, e1 - e0, 1.0)
+        frac = np.clip((mask_rad - e0) / delta, 0.0, 1.0)
+        return np.where((k > 0) & (k < n_t), before + frac, np.clip(k, 0, n_t - 1))
+
+    # Peak elevation over each [rise, fall) run of the flattened series
+    flat = np.append(elevation.ravel(), -np.inf)
+    base = (sat * n_g + sta) * n_t
+    bounds = np.empty(2 * len(sat), dtype=np.int64)
+    bounds[0::2] = base + rise
+    bounds[1::2] = base + fall
+    peak = np.maximum.reduceat(flat, bounds)[0::2] if len(sat) else np.zeros(0)
+
+    return sat, sta, crossing(rise), crossing(fall), peak
+
+
+def predict_passes(
+    altitude_km: float,
+    inclination_deg: float,
+    satellites: int = 1,
+    planes: int = 1,
+    phasing: int = 0,
+    stations: Optional[StationSet] = None,
+    duration_hours: float = 24.0,
+    step_s: float = 30.0,
+    min_elevation_deg: float = 10.0,
+    downlink_mbps: float = DEFAULT_DOWNLINK_MBPS,
+) -> Dict:
+    """
+    Predict passes of a Walker constellation over each ground station
+
+    Results are cached per orbit, constellation and station set.
+
+    Returns:
+        {"stations": {name: {passes_per_day, contact_minutes_per_day,
+        avg_pass_duration_min, max_elevation_deg, capacity_GB_per_day}},
+        "passes_per_day", "contact_minutes_per_day", "capacity_GB_per_day", ...}
+        with network totals summed over all stations and satellites
+    """
+    stations = stations or get_stations()
+    key = (round(altitude_km, 1), round(inclination_deg, 2), satellites, planes, phasing,
+           tuple(stations.names), duration_hours, step_s, min_elevation_deg, downlink_mbps)
+    if key in _cache:
+        return _cache[key]
+
+    raan, arg_lat = walker_elements(satellites, planes, phasing)
+    times = np.arange(0.0, duration_hours * 3600.0, step_s)
+    mask = math.radians(min_elevation_deg)
+    days = duration_hours / 24.0
+    n_g = len(stations)
+
+    passes = np.zeros(n_g)
+    contact_s = np.zeros(n_g)
+    peak = np.zeros(n_g)
+
+    # Chunk over satellites to bound the (T, S, G) elevation array
+    chunk = max(1, _CHUNK_ELEMENTS // max(1, len(times) * n_g))
+    for lo in range(0, len(raan), chunk):
+        position, _ = propagate_circular(altitude_km, inclination_deg, raan[lo:lo + chunk], arg_lat[lo:lo + chunk], times)
+        elevation = np.moveaxis(_elevation(position, stations, altitude_km), 0, -1)
+        _, sta, aos, los, max_el = _crossings(elevation, mask)
+        passes += np.bincount(sta, minlength=n_g)
+        contact_s += np.bincount(sta, weights=(los - aos) * step_s, minlength=n_g)
+        np.maximum.at(peak, sta, max_el)
+
+    capacity_gb = contact_s * downlink_mbps / 8.0 / 1000.0
+    per_station = {
+        name: {
+            "passes_per_day": round(float(passes[g]) / days, 1),
+            "contact_minutes_per_day": round(float(contact_s[g]) / 60.0 / days, 1),
+            "avg_pass_duration_min": round(float(contact_s[g]) / 60.0 / passes[g], 1) if passes[g] else 0.0,
+            "max_elevation_deg": round(math.degrees(peak[g]), 1) if passes[g] else None,
+            "capacity_GB_per_day": round(float(capacity_gb[g]) / days, 2),
+        }
+        for g, name in enumerate(stations.names)
+    }
+
+    result = {
+        "altitude_km": altitude_km,
+        "inclination_deg": inclination_deg,
+        "satellites": satellites,
+        "min_elevation_deg": min_elevation_deg,
+        "downlink_mbps": downlink_mbps,
+        "stations": per_station,
+        "passes_per_day": round(float(passes.sum()) / days, 1),
+        "contact_minutes_per_day": round(float(contact_s.sum()) / 60.0 / days, 1),
+        "avg_pass_duration_min": round(float(contact_s.sum()) / 60.0 / passes.sum(), 1) if passes.sum() else 0.0,
+        "capacity_GB_per_day": round(float(capacity_gb.sum()) / days, 2),
+    }
+
+    if len(_cache) >= _MAX_CACHED:
+        _cache.pop(next(iter(_cache)))
+    _cache[key] = result
+    return result
+
+
+def select_stations(prediction: Dict, data_volume_gb: float) -> List[str]:
+    """
+    Fewest stations (highest capacity first) whose combined daily downlink
+    capacity covers the data volume; all stations with contact if none suffice
+    """
+    ranked = sorted(prediction["stations"].items(), key=lambda item: -item[1]["capacity_GB_per_day"])
+    selected, capacity = [], 0.0
+    for name, stats in ranked:
+        if stats["capacity_GB_per_day"] <= 0:
+            break
+        selected.append(name)
+        capacity += stats["capacity_GB_per_day"]
+        if capacity >= data_volume_gb:
+            break
+    return selected
+
+
+def summarize_passes(prediction: Dict, stations: Sequence[str]) -> Dict:
+    """Per-satellite pass statistics over a subset of stations"""
+    chosen = [prediction["stations"][name] for name in stations]
+    passes = sum(s["passes_per_day"] for s in chosen)
+    contact = sum(s["contact_minutes_per_day"] for s in chosen)
+    satellites = max(1, prediction["satellites"])
+    return {
+        "passes_per_day": round(passes / satellites, 1),
+        "contact_minutes_per_day": round(contact / satellites, 1),
+        "avg_pass_duration_min": round(contact / passes, 1) if passes else 0.0,
+        "capacity_GB_per_day": round(sum(s["capacity_GB_per_day"] for s in chosen), 2),
+    }
@@ -0,0 +1,156 @@
+"""
+Vectorized orbit propagation helpers
+Shared by the coverage, ground-pass and catalog calculators
+"""
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+MU_KM3_S2 = 398600.0
+J2 = 1.08263e-3
+EARTH_ROTATION_RAD_S = 7.2921159e-5
+
+
+def mean_motion_rad_s(altitude_km):
+    """Mean motion of a circular orbit at the given altitude"""
+    semi_major_axis = EARTH_RADIUS_KM + np.asarray(altitude_km, dtype=float)
+    return np.sqrt(MU_KM3_S2 / semi_major_axis ** 3)
+
+
+def raan_drift_rad_s(altitude_km, inclination_deg):
+    """Secular J2 drift of the ascending node for a circular orbit"""
+    semi_major_axis = EARTH_RADIUS_KM + np.asarray(altitude_km, dtype=float)
+    n = mean_motion_rad_s(altitude_km)
+    return -1.5 * n * J2 * (EARTH_RADIUS_KM / semi_major_axis) ** 2 * np.cos(np.radians(inclination_deg))
+
+
+def walker_elements(total: int, planes: int, phasing: int):
+    """
+    Initial RAAN and argument of latitude for a Walker delta pattern T/P/F
+
+    Returns:
+        (raan_rad, arg_lat_rad) arrays of length T
+    """
+    planes = max(1, min(planes, total))
+    per_plane = total // planes
+    plane_idx = np.repeat(np.arange(planes), per_plane)
+    slot_idx = np.tile(np.arange(per_plane), planes)
+
+    raan = 2 * np.pi * plane_idx / planes
+    arg_lat = 2 * np.pi * slot_idx / per_plane + 2 * np.pi * phasing * plane_idx / (planes * per_plane)
+    return raan, arg_lat
+
+
+def propagate_circular(altitude_km, inclination_deg, raan_rad, arg_lat_rad, times_s, gmst0_rad: float = 0.0):
+    """
+    Propagate circular orbits and return Earth-fixed unit vectors
+
+    Args:
+        altitude_km: Orbit altitude (scalar)
+        inclination_deg: Orbit inclination (scalar)
+        raan_rad: Initial RAAN per satellite, shape (S,)
+        arg_lat_rad: Initial argument of latitude per satellite, shape (S,)
+        times_s: Seconds since epoch, shape (T,)
+        gmst0_rad: Greenwich sidereal angle at epoch
+
+    Returns:
+        (position, normal) unit vectors in ECEF, each shape (T, S, 3)
+    """
+    times_s = np.asarray(times_s, dtype=float)[:, None]
+    inc = np.radians(inclination_deg)
+
+    u = np.asarray(arg_lat_rad)[None, :] + mean_motion_rad_s(altitude_km) * times_s
+    theta = gmst0_rad + EARTH_ROTATION_RAD_S * times_s
+    node = np.asarray(raan_rad)[None, :] + raan_drift_rad_s(altitude_km, inclination_deg) * times_s - theta
+
+    cos_u, sin_u = np.cos(u), np.sin(u)
+    cos_n, sin_n = np.cos(node), np.sin(node)
+    cos_i, sin_i = np.cos(inc), np.sin(inc)
+
+    position = np.stack([
+        cos_u * cos_n - sin_u * sin_n * cos_i,
+        cos_u * sin_n + sin_u * cos_n * cos_i,
+        sin_u * sin_i * np.ones_like(cos_n),
+    ], axis=-1)
+    normal = np.stack([
+        sin_n * sin_i,
+        -cos_n * sin_i,
+        np.full_like(cos_n, cos_i),
+    ], axis=-1)
+    return position, normal
+
+
+def latlon_to_unit(lat_deg, lon_deg):
+    """Convert geodetic lat/lon (spherical Earth) to ECEF unit vectors, shape (..., 3)"""
+    lat = np.radians(lat_deg)
+    lon = np.radians(lon_deg)
+    cos_lat = np.cos(lat)
+    return np.stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+def gmst_rad(unix_s):
+    """Greenwich mean sidereal angle for Unix timestamps"""
+    days = np.asarray(unix_s, dtype=float) / 86400.0 + 2440587.5 - 2451545.0
+    return np.radians(np.mod(280.46061837 + 360.98564736629 * days, 360.0))
+
+
+def solve_kepler(mean_anomaly, eccentricity, iterations: int = 6):
+    """Eccentric anomaly from mean anomaly (vectorized Newton iterations)"""
+    ecc_anomaly = mean_anomaly + eccentricity * np.sin(mean_anomaly)
+    for _ in range(iterations):
+        ecc_anomaly = ecc_anomaly - (ecc_anomaly - eccentricity * np.sin(ecc_anomaly) - mean_anomaly) / (
+            1.0 - eccentricity * np.cos(ecc_anomaly)
+        )
+    return ecc_anomaly
+
+
+def propagate_elements(elements, unix_s):
+    """
+    Two-body propagation with J2 secular drift of mean orbital elements
+
+    Args:
+        elements: Object with array attributes epoch_s, mean_motion, eccentricity,
+            inclination, raan, arg_perigee, mean_anomaly (radians, rad/s)
+        unix_s: Scalar or array of Unix timestamps, shape (T,)
+
+    Returns:
+        ECEF positions in km, shape (T, N, 3) (or (N, 3) for a scalar time)
+    """
+    scalar = np.ndim(unix_s) == 0
+    times = np.atleast_1d(np.asarray(unix_s, dtype=float))[:, None]
+    dt = times - elements.epoch_s[None, :]
+
+    n = elements.mean_motion
+    e = elements.eccentricity
+    inc = elements.inclination
+    semi_major_axis = (MU_KM3_S2 / n ** 2) ** (1.0 / 3.0)
+    semi_latus = semi_major_axis * (1.0 - e ** 2)
+    j2_rate = 1.5 * n * J2 * (EARTH_RADIUS_KM / semi_latus) ** 2
+    cos_i = np.cos(inc)
+
+    raan = elements.raan + (-j2_rate * cos_i) * dt - gmst_rad(times)
+    arg_perigee = elements.arg_perigee + (0.5 * j2_rate * (5.0 * cos_i ** 2 - 1.0)) * dt
+    ecc_anomaly = solve_kepler(np.mod(elements.mean_anomaly + n * dt, 2 * np.pi), e)
+
+    # Perifocal coordinates
+    x_p = semi_major_axis * (np.cos(ecc_anomaly) - e)
+    y_p = semi_major_axis * np.sqrt(1.0 - e ** 2) * np.sin(ecc_anomaly)
+
+    cos_o, sin_o = np.cos(raan), np.sin(raan)
+    cos_w, sin_w = np.cos(arg_perigee), np.sin(arg_perigee)
+    sin_i = np.sin(inc)
+
+    position = np.stack([
+        (cos_o * cos_w - sin_o * sin_w * cos_i) * x_p + (-cos_o * sin_w - sin_o * cos_w * cos_i) * y_p,
+        (sin_o * cos_w + cos_o * sin_w * cos_i) * x_p + (-sin_o * sin_w + cos_o * cos_w * cos_i) * y_p,
+        (sin_w * sin_i) * x_p + (cos_w * sin_i) * y_p,
+    ], axis=-1)
+    return position[0] if scalar else position
+
+
+def ecef_to_geodetic(position_km):
+    """Spherical-Earth lat/lon (deg) and altitude (km) from ECEF positions"""
+    radius = np.linalg.norm(position_km, axis=-1)
+    lat = np.degrees(np.arcsin(position_km[..., 2] / radius))
+    lon = np.degrees(np.arctan2(position_km[..., 1], position_km[..., 0]))
+    return lat, lon, radius - EARTH_RADIUS_KM
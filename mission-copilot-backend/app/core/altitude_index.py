@@ -0,0 +1,194 @@
+"""
+Altitude-interval index for congestion screening of candidate orbits
+Every catalog object occupies the altitude interval [perigee, apogee]; keeping
+sorted perigee and apogee arrays per inclination band answers "how many
+objects cross this shell" with two binary searches per band
+"""
+
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+from app.core.catalog import Catalog, CatalogDelta, catalog_store
+
+# Inclination band edges in degrees (retrograde/SSO orbits get their own bands)
+INCLINATION_BANDS = [0.0, 30.0, 60.0, 80.0, 95.0, 105.0, 180.0]
+
+# Half-width of the shell a candidate orbit occupies
+SHELL_HALF_WIDTH_KM = 25.0
+
+# A shell is congested when this share of the catalog crosses it
+# (the old screen flagged 50 km bins holding 20 of a 500-object sample)
+CONGESTION_FRACTION = 0.04
+MIN_CONGESTION_COUNT = 20
+
+
+def _threshold(size: int) -> int:
+    return max(MIN_CONGESTION_COUNT, int(CONGESTION_FRACTION * size))
+
+
+def _band_rows(catalog: Catalog) -> np.ndarray:
+    """Inclination band of every catalog row"""
+    inclination = np.degrees(catalog.inclination)
+    return np.clip(np.searchsorted(INCLINATION_BANDS, inclination, side="right") - 1, 0, len(INCLINATION_BANDS) - 2)
+
+
+def _remove_sorted(values: np.ndarray, drop: np.ndarray) -> np.ndarray:
+    """Sorted array without one occurrence of each value in drop (all present)"""
+    if not len(drop):
+        return values
+    drop = np.sort(drop)
+    # Equal values map to consecutive positions: offset each by its rank among equals
+    rank = np.arange(len(drop)) - np.searchsorted(drop, drop, side="left")
+    return np.delete(values, np.searchsorted(values, drop, side="left") + rank)
+
+
+def _insert_sorted(values: np.ndarray, new: np.ndarray) -> np.ndarray:
+    if not len(new):
+        return values
+    new = np.sort(new)
+    return np.insert(values, np.searchsorted(values, new), new)
+
+
+class AltitudeIndex:
+    """Sorted perigee/apogee arrays, overall and per inclination band"""
+
+    def __init__(self, catalog: Catalog):
+        self.catalog = catalog
+        # Row-aligned with the catalog, so a delta can find the exact values to move
+        self._perigee = catalog.perigee_km
+        self._apogee = catalog.apogee_km
+        self._band = _band_rows(catalog)
+
+        self.size = len(catalog)
+        self.threshold = _threshold(self.size)
+        self._all = (np.sort(self._perigee), np.sort(self._apogee))
+        self._bands = [
+            (np.sort(self._perigee[self._band == b]), np.sort(self._apogee[self._band == b]))
+            for b in range(len(INCLINATION_BANDS) - 1)
+        ]
+
+    def apply(self, delta: CatalogDelta) -> "AltitudeIndex":
+        """
+        Index over delta.catalog derived from this one (built over
+        delta.previous) by moving only the changed objects' intervals:
+        binary-search inserts and deletes instead of re-sorting everything
+        """
+        previous, catalog = delta.previous, delta.catalog
+        old_rows = previous.lookup(np.concatenate([delta.updated, delta.removed]))[0]
+        new_rows = catalog.lookup(np.concatenate([delta.added, delta.updated]))[0]
+
+        index = object.__new__(AltitudeIndex)
+        index.catalog = catalog
+        index._perigee = catalog.perigee_km
+        index._apogee = catalog.apogee_km
+        index._band = _band_rows(catalog)
+
+        # Unchanged objects carry over their stored values bit for bit
+        unchanged = np.ones(len(catalog), dtype=bool)
+        unchanged[new_rows] = False
+        kept = previous.lookup(catalog.norad_id[unchanged])[0]
+        index._perigee[unchanged] = self._perigee[kept]
+        index._apogee[unchanged] = self._apogee[kept]
+
+        def moved(arrays, old, new):
+            perigee, apogee = arrays
+            return (
+                _insert_sorted(_remove_sorted(perigee, self._perigee[old]), index._perigee[new]),
+                _insert_sorted(_remove_sorted(apogee, self._apogee[old]), index._apogee[new]),
+            )
+
+        index.size = len(catalog)
+        index.threshold = _threshold(index.size)
+        index._all = moved(self._all, old_rows, new_rows)
+        index._bands = [
+            moved(arrays, old_rows[self._band[old_rows] == b], new_rows[index._band[new_rows] == b])
+            for b, arrays in enumerate(self._bands)
+        ]
+        return index
+
+    @staticmethod
+    def _crossing(arrays: Tuple[np.ndarray, np.ndarray], lo: float, hi: float) -> int:
+        """Objects whose [perigee, apogee] overlaps [lo, hi]"""
+        perigee, apogee = arrays
+        # Objects entirely above (perigee > hi) and entirely below (apogee < lo) are disjoint sets
+        above = len(perigee) - np.searchsorted(perigee, hi, side="right")
+        below = np.searchsorted(apogee, lo, side="left")
+        return int(len(perigee) - above - below)
+
+    def count_crossing(self, lo: float, hi: float, inclination_deg: Optional[float] = None) -> int:
+        """Objects crossing the shell [lo, hi] km, optionally only within one inclination band"""
+        if inclination_deg is None:
+            return self._crossing(self._all, lo, hi)
+        return self._crossing(self._bands[self.band_of(inclination_deg)], lo, hi)
+
+    @staticmethod
+    def band_of(inclination_deg: float) -> int:
+        return int(np.clip(np.searchsorted(INCLINATION_BANDS, inclination_deg, side="right") - 1, 0, len(INCLINATION_BANDS) - 2))
+
+    def is_congested(self, altitude_km: float, half_width_km: float = SHELL_HALF_WIDTH_KM,
+                     inclination_deg: Optional[float] = None) -> bool:
+        """
+        Whether more than the congestion share of the catalog crosses the
+        shell, or, given an inclination, that share of its band's objects
+        """
+        count = self.count_crossing(altitude_km - half_width_km, altitude_km + half_width_km, inclination_deg)
+        if inclination_deg is None:
+            return count > self.threshold
+        return count > _threshold(len(self._bands[self.band_of(inclination_deg)][0]))
+
+    def nearest_clear_shell(
+        self,
+        altitude_km: float,
+        half_width_km: float = SHELL_HALF_WIDTH_KM,
+        step_km: float = 5.0,
+        max_shift_km: float = 300.0,
+        floor_km: float = 300.0,
+        ceiling_km: float = 2000.0,
+        inclination_deg: Optional[float] = None,
+    ) -> Optional[float]:
+        """
+        Closest altitude whose shell is not congested, searching outward from
+        altitude_km (upward first on ties, since higher orbits decay slower)
+        """
+        for shift in np.arange(0.0, max_shift_km + step_km / 2, step_km):
+            for candidate in (altitude_km + shift, altitude_km - shift):
+                if floor_km <= candidate <= ceiling_km and not self.is_congested(candidate, half_width_km, inclination_deg):
+                    return float(candidate)
+        return None
+
+    def crowded_shells(self, lo: float = 200.0, hi: float = 2000.0, width_km: float = 50.0) -> List[int]:
+        """Centers of congested shells on a fixed grid (for summaries and prompts)"""
+        centers = np.arange(lo, hi + width_km / 2, width_km)
+        return [int(c) for c in centers if self.is_congested(c, width_km / 2)]
+
+    def band_breakdown(self, lo: float, hi: float) -> Dict[str, int]:
+        """Objects crossing [lo, hi] per inclination band"""
+        return {
+            f"{INCLINATION_BANDS[b]:g}-{INCLINATION_BANDS[b + 1]:g}deg": self._crossing(arrays, lo, hi)
+            for b, arrays in enumerate(self._bands)
+        }
+
+
+_index: Optional[AltitudeIndex] = None
+
+
+def _on_catalog_delta(delta: CatalogDelta):
+    global _index
+    if _index is not None and _index.catalog is delta.previous:
+        _index = _index.apply(delta)
+
+
+catalog_store.subscribe(_on_catalog_delta)
+
+
+def get_altitude_index(catalog: Catalog) -> AltitudeIndex:
+    """Index over the given catalog, kept current by catalog deltas and rebuilt only when it falls behind"""
+    global _index
+    if _index is None or _index.catalog is not catalog:
+        _index = AltitudeIndex(catalog)
+    return _index
+
+
+def current_altitude_index() -> Optional[AltitudeIndex]:
+    """Most recently built index, or None if no catalog has been loaded"""
+    return _index
@@ -0,0 +1,502 @@
+"""
+Columnar satellite catalog built from Celestrak GP (OMM JSON) records
+Keeps the active catalog as typed arrays so positions can be batch-propagated.
+GP feeds are stream-parsed straight into arrays and merged by NORAD ID: only
+objects whose epoch advanced are replaced, and each ingest publishes a delta
+so indexes can update in place. Each group's pull is shared by all workers,
+so Celestrak is queried once per refresh interval however many there are.
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+import math
+import struct
+import threading
+import time
+import anyio
+import numpy as np
+import orjson
+
+from app.calculators.propagation import EARTH_RADIUS_KM, MU_KM3_S2
+from app.core.config import get_catalog_settings
+from app.services.shared_state import get_shared_state
+
+GP_URL = "https://celestrak.org/NORAD/elements/gp.php?GROUP={group}&FORMAT=json"
+
+# Per-object arrays, in constructor order after norad_id and names
+_ELEMENT_FIELDS = ("epoch_s", "mean_motion", "eccentricity", "inclination", "raan", "arg_perigee", "mean_anomaly")
+
+# Packed catalogs: header length (little-endian uint32), an orjson header with
+# each array's dtype, shape and offset, then the raw arrays 8-byte aligned
+_PACK_LENGTH = struct.Struct("<I")
+
+
+def _gp_row(rec: Dict) -> Optional[tuple]:
+    """
+    (NORAD ID, name, epoch, mean motion, eccentricity, inclination, RAAN,
+    argument of perigee, mean anomaly) of a GP record, None if it is malformed
+    """
+    try:
+        return (
+            int(rec["NORAD_CAT_ID"]),
+            rec.get("OBJECT_NAME", ""),
+            rec["EPOCH"],
+            float(rec["MEAN_MOTION"]),
+            float(rec["ECCENTRICITY"]),
+            float(rec["INCLINATION"]),
+            float(rec["RA_OF_ASC_NODE"]),
+            float(rec["ARG_OF_PERICENTER"]),
+            float(rec["MEAN_ANOMALY"]),
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class Catalog:
+    """Orbital elements of every catalog object, one array per field, sorted by NORAD ID"""
+
+    def __init__(self, norad_id, names, epoch_s, mean_motion, eccentricity, inclination, raan, arg_perigee, mean_anomaly):
+        self.norad_id = norad_id
+        self.names = names
+        self.epoch_s = epoch_s
+        self.mean_motion = mean_motion          # rad/s
+        self.eccentricity = eccentricity
+        self.inclination = inclination          # rad
+        self.raan = raan                        # rad
+        self.arg_perigee = arg_perigee          # rad
+        self.mean_anomaly = mean_anomaly        # rad
+
+    def __len__(self):
+        return len(self.norad_id)
+
+    @property
+    def semi_major_axis_km(self):
+        return (MU_KM3_S2 / self.mean_motion ** 2) ** (1.0 / 3.0)
+
+    @property
+    def perigee_km(self):
+        return self.semi_major_axis_km * (1.0 - self.eccentricity) - EARTH_RADIUS_KM
+
+    @property
+    def apogee_km(self):
+        return self.semi_major_axis_km * (1.0 + self.eccentricity) - EARTH_RADIUS_KM
+
+    def lookup(self, norad_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Row of each NORAD ID (binary search) and whether it is in the catalog"""
+        norad_ids = np.asarray(norad_ids, dtype=np.int64)
+        if not len(self):
+            return np.zeros(len(norad_ids), dtype=np.int64), np.zeros(len(norad_ids), dtype=bool)
+        rows = np.minimum(np.searchsorted(self.norad_id, norad_ids), len(self) - 1)
+        return rows, self.norad_id[rows] == norad_ids
+
+    def take(self, rows: np.ndarray) -> "Catalog":
+        """Catalog of the given rows, in the given order"""
+        return Catalog(
+            self.norad_id[rows],
+            [self.names[i] for i in rows],
+            *(getattr(self, field)[rows] for field in _ELEMENT_FIELDS),
+        )
+
+    def latest_per_object(self) -> "Catalog":
+        """Rows sorted by NORAD ID; an object listed twice keeps its latest epoch"""
+        order = np.lexsort((self.epoch_s, self.norad_id))
+        ids_sorted = self.norad_id[order]
+        last = np.append(ids_sorted[1:] != ids_sorted[:-1], True)
+        return self.take(order[last])
+
+    @classmethod
+    def concat(cls, first: "Catalog", second: "Catalog") -> "Catalog":
+        """Both catalogs' rows, re-sorted by NORAD ID"""
+        merged = cls(
+            np.concatenate([first.norad_id, second.norad_id]),
+            first.names + second.names,
+            *(np.concatenate([getattr(first, field), getattr(second, field)]) for field in _ELEMENT_FIELDS),
+        )
+        return merged.take(np.argsort(merged.norad_id, kind="stable"))
+
+    @classmethod
+    def from_gp(cls, records: List[Dict]) -> "Catalog":
+        """Build a catalog from parsed GP JSON records, skipping malformed entries"""
+        rows = [row for row in map(_gp_row, records) if row is not None]
+        if not rows:
+            return cls.empty()
+
+        ids, names, epochs, mm, ecc, inc, raan, argp, ma = zip(*rows)
+        catalog = cls(
+            norad_id=np.array(ids, dtype=np.int64),
+            names=list(names),
+            epoch_s=np.array(epochs, dtype="datetime64[us]").astype(np.int64) / 1e6,
+            mean_motion=np.array(mm) * 2 * math.pi / 86400.0,
+            eccentricity=np.array(ecc),
+            inclination=np.radians(inc),
+            raan=np.radians(raan),
+            arg_perigee=np.radians(argp),
+            mean_anomaly=np.radians(ma),
+        )
+
+        return catalog.latest_per_object()
+
+    def to_bytes(self, **meta) -> bytes:
+        """Raw arrays plus a small header, for sharing between workers without re-parsing"""
+        layout, chunks, offset = {}, [], 0
+        for field in ("norad_id",) + _ELEMENT_FIELDS:
+            array = np.ascontiguousarray(getattr(self, field))
+            layout[field] = [array.dtype.str, list(array.shape), offset]
+            data = array.tobytes()
+            chunks.append(data + bytes(-len(data) % 8))
+            offset += len(chunks[-1])
+        header = orjson.dumps({"arrays": layout, "names": self.names, "meta": meta})
+        # Pad with JSON whitespace so the arrays start 8-byte aligned
+        header += b" " * (-(_PACK_LENGTH.size + len(header)) % 8)
+        return _PACK_LENGTH.pack(len(header)) + header + b"".join(chunks)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Tuple["Catalog", Dict]:
+        """
+        Catalog packed by to_bytes, and the meta passed to it
+
+        The arrays are read-only views of data, not copies.
+        """
+        (length,) = _PACK_LENGTH.unpack_from(data)
+        start = _PACK_LENGTH.size + length
+        header = orjson.loads(memoryview(data)[_PACK_LENGTH.size:start])
+        arrays = {
+            field: np.frombuffer(data, dtype=np.dtype(dtype), count=math.prod(shape), offset=start + offset).reshape(shape)
+            for field, (dtype, shape, offset) in header["arrays"].items()
+        }
+        catalog = cls(arrays["norad_id"], header["names"], *(arrays[field] for field in _ELEMENT_FIELDS))
+        return catalog, header["meta"]
+
+    @classmethod
+    def empty(cls) -> "Catalog":
+        zeros = np.zeros(0)
+        return cls(np.zeros(0, dtype=np.int64), [], zeros, zeros, zeros, zeros, zeros, zeros, zeros)
+
+
+class CatalogDelta:
+    """
+    What one ingest changed, as NORAD IDs
+
+    added: new to the catalog; updated: epoch advanced; removed: no longer
+    listed in any ingested group. `previous` and `catalog` are the snapshots
+    before and after, so listeners can map IDs to rows in either.
+    """
+
+    def __init__(self, group: str, previous: Catalog, catalog: Catalog,
+                 added: np.ndarray, updated: np.ndarray, removed: np.ndarray):
+        self.group = group
+        self.previous = previous
+        self.catalog = catalog
+        self.added = added
+        self.updated = updated
+        self.removed = removed
+
+    def __len__(self):
+        return len(self.added) + len(self.updated) + len(self.removed)
+
+    def summary(self) -> dict:
+        return {
+            "group": self.group,
+            "added": len(self.added),
+            "updated": len(self.updated),
+            "removed": len(self.removed),
+            "size": len(self.catalog),
+        }
+
+
+# Bytes read from the HTTP body at a time while streaming a GP group
+STREAM_CHUNK_SIZE = 256 * 1024
+
+# Buffered bytes needed before cutting records off the stream, so small
+# network reads are not decoded one by one
+MIN_BATCH_SIZE = 64 * 1024
+
+# Raw GP values kept per object, in _gp_row order after the NORAD ID, name and epoch
+_GP_COLUMNS = ("mean_motion", "eccentricity", "inclination", "raan", "arg_perigee", "mean_anomaly")
+
+
+class GPStreamParser:
+    """
+    Incremental parser for a Celestrak GP JSON array
+
+    As the body arrives, the complete records buffered so far are cut off at
+    the last closing brace, decoded with orjson and copied into preallocated
+    arrays. Only one batch of record dicts exists at a time, so memory beyond
+    the arrays is bounded by the batch size rather than the catalog size.
+    """
+
+    def __init__(self, size_hint: int = 0):
+        # A GP record is roughly 500 bytes of JSON; arrays grow if that underestimates
+        capacity = max(1024, size_hint // 400)
+        self._norad_id = np.empty(capacity, dtype=np.int64)
+        self._epoch_s = np.empty(capacity)
+        self._columns = {column: np.empty(capacity) for column in _GP_COLUMNS}
+        self._names: List[str] = []
+        self.count = 0
+        self._buffer = bytearray()
+        self._started = False
+        self._batches = 0
+        self._next_cut = MIN_BATCH_SIZE
+
+    def _reserve(self, n: int):
+        needed = self.count + n
+        if needed <= len(self._norad_id):
+            return
+        capacity = max(needed, 2 * len(self._norad_id))
+        self._norad_id = np.resize(self._norad_id, capacity)
+        self._epoch_s = np.resize(self._epoch_s, capacity)
+        self._columns = {column: np.resize(values, capacity) for column, values in self._columns.items()}
+
+    def feed(self, chunk: bytes):
+        self._buffer += chunk
+        if not self._started:
+            start = len(self._buffer) - len(self._buffer.lstrip())
+            if start == len(self._buffer):
+                return
+            if self._buffer[start:start + 1] != b"[":
+                raise ValueError("Celestrak response is not a GP JSON array")
+            del self._buffer[:start + 1]
+            self._started = True
+        if len(self._buffer) >= self._next_cut:
+            self._cut()
+
+    def _records(self, body: bytes) -> List[Dict]:
+        """Decode records that follow the opening bracket (or a previous batch)"""
+        body = body.lstrip()
+        if self._batches:
+            if not body.startswith(b","):
+                raise ValueError("Celestrak response is not a GP JSON array")
+            body = body[1:]
+        records = orjson.loads(b"[" + body + (b"" if body.rstrip().endswith(b"]") else b"]"))
+        if not isinstance(records, list):
+            raise ValueError("Celestrak response is not a GP JSON array")
+        return records
+
+    def _cut(self):
+        """Decode and drop everything up to the last complete record in the buffer"""
+        end = self._buffer.rfind(b"}") + 1
+        try:
+            records = self._records(bytes(self._buffer[:end])) if end else None
+        except orjson.JSONDecodeError:
+            # The brace was inside a string; try again once more has arrived
+            records = None
+        if records is None:
+            self._next_cut = len(self._buffer) + MIN_BATCH_SIZE
+            return
+        self._append(records)
+        del self._buffer[:end]
+        self._next_cut = MIN_BATCH_SIZE
+
+    def _append(self, records: List[Dict]):
+        self._batches += 1
+        rows = [row for row in map(_gp_row, records) if row is not None]
+        if not rows:
+            return
+
+        n = len(rows)
+        self._reserve(n)
+        end = self.count + n
+        norad_ids, names, epochs, *values = zip(*rows)
+        self._norad_id[self.count:end] = norad_ids
+        self._names.extend(names)
+        self._epoch_s[self.count:end] = np.array(epochs, dtype="datetime64[us]").astype(np.int64) / 1e6
+        for column, column_values in zip(_GP_COLUMNS, values):
+            self._columns[column][self.count:end] = column_values
+        self.count = end
+
+    def finish(self) -> Catalog:
+        """Catalog of every record fed, one row per object sorted by NORAD ID"""
+        if not self._started:
+            raise ValueError("Celestrak response is empty")
+
+        rest = bytes(self._buffer).strip()
+        if not rest.endswith(b"]"):
+            raise ValueError("Celestrak response ended mid-record")
+        if rest != b"]":
+            self._append(self._records(rest))
+
+        n = self.count
+        if not n:
+            return Catalog.empty()
+        columns = {column: values[:n] for column, values in self._columns.items()}
+        return Catalog(
+            norad_id=self._norad_id[:n],
+            names=self._names,
+            epoch_s=self._epoch_s[:n],
+            mean_motion=columns["mean_motion"] * 2 * math.pi / 86400.0,
+            eccentricity=columns["eccentricity"],
+            inclination=np.radians(columns["inclination"]),
+            raan=np.radians(columns["raan"]),
+            arg_perigee=np.radians(columns["arg_perigee"]),
+            mean_anomaly=np.radians(columns["mean_anomaly"]),
+        ).latest_per_object()
+
+
+_NO_IDS = np.zeros(0, dtype=np.int64)
+
+
+class CatalogStore:
+    """
+    The shared catalog, kept current by merging GP pulls
+
+    Pulls arrive as parsed catalogs, so matching by NORAD ID and comparing
+    epochs are array operations. The catalog is replaced (never mutated) only
+    when something changed, and every non-empty delta is passed to the
+    subscribed listeners in order.
+    """
+
+    def __init__(self):
+        self.catalog = Catalog.empty()
+        self.fetched_at = 0.0
+        self.version = 0
+        self._members: Dict[str, np.ndarray] = {}
+        self._pulled: Dict[str, float] = {}
+        self._listeners: List[Callable[[CatalogDelta], None]] = []
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.RLock()
+
+    def subscribe(self, listener: Callable[[CatalogDelta], None]):
+        self._listeners.append(listener)
+
+    def ingest(self, fresh: Catalog, group: str = "active") -> CatalogDelta:
+        """Merge one group's records (one row per object, sorted by NORAD ID) into the catalog"""
+        with self._lock:
+            previous = self.catalog
+            listed = fresh.norad_id
+
+            # Keep only objects that are new or whose epoch advanced
+            rows, found = previous.lookup(fresh.norad_id)
+            advanced = ~found
+            if found.any():
+                advanced[found] = fresh.epoch_s[found] > previous.epoch_s[rows[found]]
+            fresh, rows, found = fresh.take(np.flatnonzero(advanced)), rows[advanced], found[advanced]
+            added = fresh.norad_id[~found]
+            updated = fresh.norad_id[found]
+
+            # Objects this group dropped, unless another group still lists them
+            removed = np.setdiff1d(self._members.get(group, _NO_IDS), listed, assume_unique=True)
+            others = [members for name, members in self._members.items() if name != group]
+            if len(removed) and others:
+                removed = np.setdiff1d(removed, np.concatenate(others))
+            self._members[group] = listed
+
+            if len(fresh) or len(removed):
+                drop = np.concatenate([rows[found], previous.lookup(removed)[0]])
+                keep = np.ones(len(previous), dtype=bool)
+                keep[drop] = False
+                self.catalog = Catalog.concat(previous.take(np.flatnonzero(keep)), fresh)
+                self.version += 1
+            self.fetched_at = time.time()
+
+            delta = CatalogDelta(group, previous, self.catalog, added, updated, removed)
+            if len(delta):
+                for listener in self._listeners:
+                    try:
+                        listener(delta)
+                    except Exception as e:
+                        print(f"Catalog listener error: {e}")
+            return delta
+
+    def refresh(self, groups: Optional[List[str]] = None, max_age_s: Optional[float] = None) -> CatalogDelta:
+        """
+        Merge every configured group's latest shared pull; returns their combined delta
+
+        A pull this store has already merged is skipped, and the catalog goes
+        stale again when the oldest pull is max_age_s old.
+        """
+        settings = get_catalog_settings()
+        groups = groups or settings.group_list
+        if max_age_s is None:
+            max_age_s = settings.max_age_s
+        with self._refresh_lock:
+            previous = self.catalog
+            deltas, pulled_at = [], []
+            for group in groups:
+                fresh, pulled = shared_pull(group, max_age_s)
+                pulled_at.append(pulled)
+                if pulled > self._pulled.get(group, 0.0):
+                    deltas.append(self.ingest(fresh, group))
+                    self._pulled[group] = pulled
+            self.fetched_at = min(pulled_at, default=self.fetched_at)
+
+        added = np.unique(np.concatenate([d.added for d in deltas] or [_NO_IDS]))
+        updated = np.setdiff1d(np.concatenate([d.updated for d in deltas] or [_NO_IDS]), added)
+        removed = np.unique(np.concatenate([d.removed for d in deltas] or [_NO_IDS]))
+        return CatalogDelta(",".join(groups), previous, self.catalog, added, updated, removed)
+
+    def refresh_if_stale(self, max_age_s: float) -> Catalog:
+        """Refresh unless another caller did so within max_age_s"""
+        if time.time() - self.fetched_at > max_age_s:
+            with self._refresh_lock:
+                if time.time() - self.fetched_at > max_age_s:
+                    self.refresh(max_age_s=max_age_s)
+        return self.catalog
+
+    def group_size(self, group: str) -> int:
+        """Objects listed in a group at its last ingest"""
+        return len(self._members.get(group, _NO_IDS))
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self.catalog),
+            "version": self.version,
+            "groups": {name: len(members) for name, members in self._members.items()},
+            "age_s": round(time.time() - self.fetched_at, 1) if self.fetched_at else None,
+        }
+
+
+# Shared catalog used by the indexes
+catalog_store = CatalogStore()
+
+
+def fetch_group(group: str) -> Catalog:
+    """Stream one GP group from Celestrak straight into catalog arrays"""
+    import requests
+
+    with requests.get(GP_URL.format(group=group), timeout=10, stream=True) as response:
+        response.raise_for_status()
+        parser = GPStreamParser(size_hint=int(response.headers.get("Content-Length") or 0))
+        for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+            parser.feed(chunk)
+        return parser.finish()
+
+
+def _pull(group: str) -> bytes:
+    return fetch_group(group).to_bytes(pulled_at=time.time())
+
+
+def shared_pull(group: str, max_age_s: float) -> Tuple[Catalog, float]:
+    """
+    A group's latest GP pull and its pulled_at time
+
+    One worker fetches the group from Celestrak when the shared pull is older
+    than max_age_s; the others wait for it and map its arrays. Must be
+    called from the server's threadpool; scripts and tests outside it fetch
+    directly.
+    """
+    try:
+        data = anyio.from_thread.run(get_shared_state().get_or_compute, f"catalog-gp:{group}", lambda: _pull(group), max_age_s)
+    except anyio.NoEventLoopError:
+        data = _pull(group)
+    catalog, meta = Catalog.from_bytes(data)
+    return catalog, meta["pulled_at"]
+
+
+def update_catalog(records: List[Dict], group: str = "active") -> Catalog:
+    """Merge parsed GP JSON records of one group into the shared catalog"""
+    return catalog_store.ingest(Catalog.from_gp(records), group).catalog
+
+
+def refresh_catalog(groups: Optional[List[str]] = None) -> CatalogDelta:
+    """Merge the configured GP groups' shared pulls into the catalog"""
+    return catalog_store.refresh(groups)
+
+
+def get_catalog(max_age_s: Optional[float] = None) -> Catalog:
+    """Return the shared catalog, refreshing it when missing or stale"""
+    if max_age_s is None:
+        max_age_s = get_catalog_settings().max_age_s
+    try:
+        return catalog_store.refresh_if_stale(max_age_s)
+    except Exception as e:
+        print(f"Celestrak catalog error: {e}")
+        return catalog_store.catalog
@@ -0,0 +1,246 @@
+"""
+Negotiated response compression (brotli or gzip)
+Bodies under a size threshold and already-encoded or binary responses are
+passed through; compressed bodies are cached by content hash so a payload
+served repeatedly (e.g. from the chat/mission caches) is compressed once
+"""
+
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import gzip
+import hashlib
+import zlib
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+# (gzip level 1-9, brotli quality 0-11)
+Levels = Tuple[int, int]
+
+DEFAULT_LEVELS: Levels = (6, 5)
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "text/",
+)
+
+# Bodies at least this large are compressed off the event loop
+THREADPOOL_SIZE = 256 * 1024
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Best supported coding from an Accept-Encoding header (brotli wins ties)"""
+    supported = ("br", "gzip") if brotli is not None else ("gzip",)
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if coding == "*":
+            for name in supported:
+                weights.setdefault(name, q)
+        elif coding in supported:
+            weights[coding] = q
+
+    best = max(supported, key=lambda name: weights.get(name, 0.0))
+    return best if weights.get(best, 0.0) > 0 else None
+
+
+def compress(body: bytes, encoding: str, levels: Levels) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=levels[1])
+    return gzip.compress(body, compresslevel=levels[0], mtime=0)
+
+
+class _StreamCompressor:
+    """Incremental compressor for streamed (more_body) responses"""
+
+    def __init__(self, encoding: str, levels: Levels):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=levels[1])
+            self._zlib = None
+        else:
+            self._brotli = None
+            # wbits 16+ writes a gzip header and trailer
+            self._zlib = zlib.compressobj(levels[0], zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, chunk: bytes) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.process(chunk) + self._brotli.flush()
+        return self._zlib.compress(chunk) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.finish()
+        return self._zlib.flush(zlib.Z_FINISH)
+
+
+class CompressedBodyCache:
+    """LRU of compressed bodies keyed by (encoding, levels, body hash), bounded by bytes"""
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(body: bytes, encoding: str, levels: Levels) -> tuple:
+        return encoding, levels, hashlib.blake2b(body, digest_size=16).digest()
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        compressed = self._entries.get(key)
+        if compressed is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return compressed
+
+    def put(self, key: tuple, compressed: bytes):
+        if len(compressed) > self.max_bytes // 4 or key in self._entries:
+            return
+        self._entries[key] = compressed
+        self._bytes += len(compressed)
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "bytes": self._bytes, "hits": self.hits, "misses": self.misses}
+
+
+body_cache = CompressedBodyCache()
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses the client can decode
+
+    Args:
+        minimum_size: Smallest body (bytes) worth compressing
+        route_levels: Path prefix -> (gzip level, brotli quality); the longest
+            matching prefix wins, other paths use default_levels
+        cache: Compressed-body cache (None disables caching)
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, route_levels: Optional[Dict[str, Levels]] = None,
+                 default_levels: Levels = DEFAULT_LEVELS, cache: Optional[CompressedBodyCache] = None):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.route_levels = sorted((route_levels or {}).items(), key=lambda item: len(item[0]), reverse=True)
+        self.default_levels = default_levels
+        self.cache = cache
+
+    def levels_for(self, path: str) -> Levels:
+        for prefix, levels in self.route_levels:
+            if path.startswith(prefix):
+                return levels
+        return self.default_levels
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressingSender(self, send, encoding, self.levels_for(scope["path"]))
+        await self.app(scope, receive, responder)
+
+
+class _CompressingSender:
+    """Wraps `send` for one response, deciding on compression at the first body message"""
+
+    def __init__(self, middleware: CompressionMiddleware, send, encoding: str, levels: Levels):
+        self.middleware = middleware
+        self.send = send
+        self.encoding = encoding
+        self.levels = levels
+        self.start_message = None
+        self.stream: Optional[_StreamCompressor] = None
+        self.passthrough = False
+
+    def _compressible(self, headers: MutableHeaders) -> bool:
+        if "content-encoding" in headers or self.start_message["status"] in (204, 304):
+            return False
+        content_type = headers.get("content-type", "")
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    def _mark_encoded(self, headers: MutableHeaders):
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+
+    async def __call__(self, message):
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.stream is not None:
+            chunk = self.stream.compress(body) if body else b""
+            if not more_body:
+                chunk += self.stream.finish()
+            await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+            return
+
+        headers = MutableHeaders(scope=self.start_message)
+        if not self._compressible(headers) or (not more_body and len(body) < self.middleware.minimum_size):
+            self.passthrough = True
+            await self.send(self.start_message)
+            await self.send(message)
+            return
+
+        if more_body:
+            # Streamed response (e.g. NDJSON export): compress chunk by chunk
+            self.stream = _StreamCompressor(self.encoding, self.levels)
+            self._mark_encoded(headers)
+            del headers["Content-Length"]
+            await self.send(self.start_message)
+            await self.send({"type": "http.response.body", "body": self.stream.compress(body), "more_body": True})
+            return
+
+        compressed = await self._compress_body(body)
+        self._mark_encoded(headers)
+        headers["Content-Length"] = str(len(compressed))
+        await self.send(self.start_message)
+        await self.send({"type": "http.response.body", "body": compressed})
+
+    async def _compress_body(self, body: bytes) -> bytes:
+        cache = self.middleware.cache
+        key = None
+        if cache is not None:
+            key = cache.key(body, self.encoding, self.levels)
+            compressed = cache.get(key)
+            if compressed is not None:
+                return compressed
+
+        if len(body) >= THREADPOOL_SIZE:
+            compressed = await run_in_threadpool(compress, body, self.encoding, self.levels)
+        else:
+            compressed = compress(body, self.encoding, self.levels)
+
+        if cache is not None:
+            cache.put(key, compressed)
+        return compressed
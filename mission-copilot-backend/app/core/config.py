@@ -1,3 +1,5 @@
+from functools import lru_cache
+from pydantic import model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -5,10 +7,150 @@ class Settings(BaseSettings):
         env_file='.env',
         extra='ignore'
     )
-    
+
     google_api_key: str
     gemini_api_key: str
     gemini_model: str = "gemini-2.0-flash-exp"
     backend_cors_origins: str = "*"
 
-settings = Settings()
+
+class DatabaseSettings(BaseSettings):
+    """MongoDB connection settings, read from MONGODB_* environment variables"""
+    model_config = SettingsConfigDict(
+        env_file='.env',
+        env_prefix='MONGODB_',
+        extra='ignore'
+    )
+
+    uri: str = ""
+    db_name: str = "planexa"
+
+    # Connection pool
+    max_pool_size: int = 50
+    min_pool_size: int = 5
+    max_idle_time_ms: int = 300000
+
+    # Timeouts
+    server_selection_timeout_ms: int = 5000
+    connect_timeout_ms: int = 10000
+    socket_timeout_ms: int = 30000
+
+    # Wire compression, comma-separated in preference order (zstd/snappy need extra packages)
+    compressors: str = "zlib"
+    zlib_compression_level: int = 1
+
+    # Retry delay after a failed connection, doubling up to the maximum
+    reconnect_interval_s: float = 5.0
+    reconnect_max_interval_s: float = 60.0
+
+    # Save every generated mission through the write-behind queue
+    auto_persist_missions: bool = False
+    write_behind_batch_size: int = 100
+    write_behind_flush_interval_s: float = 1.0
+    write_behind_max_pending: int = 1000
+
+
+class SharedStateSettings(BaseSettings):
+    """State shared between workers, read from SHARED_STATE_* environment variables"""
+    model_config = SettingsConfigDict(
+        env_file='.env',
+        env_prefix='SHARED_STATE_',
+        extra='ignore'
+    )
+
+    # "auto" uses Redis when redis_url is set, otherwise files in directory
+    backend: str = "auto"
+    directory: str = ""  # default: /dev/shm/planexa-shared
+    redis_url: str = ""
+
+    # How long a worker waits for another worker's recomputation
+    lock_timeout_s: float = 30.0
+
+    live_data_ttl_s: float = 300.0
+    llm_cache_ttl_s: float = 3600.0
+
+
+class AdmissionSettings(BaseSettings):
+    """Rate limits and load shedding for LLM-bound endpoints, read from ADMISSION_* environment variables"""
+    model_config = SettingsConfigDict(
+        env_file='.env',
+        env_prefix='ADMISSION_',
+        extra='ignore'
+    )
+
+    # Token bucket per client IP and per signed-in userId
+    rate_per_minute: float = 10.0
+    burst: int = 5
+    max_tracked_clients: int = 10000
+
+    # Concurrent LLM requests; others wait up to queue_timeout_s
+    max_concurrent: int = 4
+    queue_timeout_s: float = 20.0
+
+    # Waiting requests beyond which new ones get the fallback instead of
+    # queueing, and waiting plus fallback requests beyond which they get a 429
+    # (so at most max_queue - degrade_queue_depth fallbacks run at once)
+    degrade_queue_depth: int = 16
+    max_queue: int = 24
+
+    # Live-data snapshots older than this are served with the fallback only
+    max_snapshot_age_s: float = 900.0
+
+    @model_validator(mode="after")
+    def check_queue_depths(self):
+        if self.degrade_queue_depth >= self.max_queue:
+            raise ValueError("ADMISSION_DEGRADE_QUEUE_DEPTH must be below ADMISSION_MAX_QUEUE")
+        return self
+
+
+class CatalogSettings(BaseSettings):
+    """Satellite catalog ingest, read from CATALOG_* environment variables"""
+    model_config = SettingsConfigDict(
+        env_file='.env',
+        env_prefix='CATALOG_',
+        extra='ignore'
+    )
+
+    # Celestrak GP groups merged into the catalog, comma-separated
+    # (e.g. "active,analyst,cosmos-2251-debris")
+    groups: str = "active"
+
+    # Refresh the catalog at most this often
+    max_age_s: float = 7200.0
+
+    @property
+    def group_list(self) -> list:
+        return [group.strip() for group in self.groups.split(",") if group.strip()]
+
+
+@lru_cache
+def get_settings() -> Settings:
+    return Settings()
+
+
+@lru_cache
+def get_database_settings() -> DatabaseSettings:
+    return DatabaseSettings()
+
+
+@lru_cache
+def get_shared_state_settings() -> SharedStateSettings:
+    return SharedStateSettings()
+
+
+@lru_cache
+def get_admission_settings() -> AdmissionSettings:
+    return AdmissionSettings()
+
+
+@lru_cache
+def get_catalog_settings() -> CatalogSettings:
+    return CatalogSettings()
+
+
+def __getattr__(name):
+    # `settings` is built on first use so importing this module for database
+    # settings does not require the Gemini API keys
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
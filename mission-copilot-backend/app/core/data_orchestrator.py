@@ -1,15 +1,15 @@
-import requests
-import pandas as pd
-from typing import Dict, List
-from skyfield.api import load, EarthSatellite, wgs84
-from app.core.config import settings
+from typing import Dict, List, Optional
+from starlette.concurrency import run_in_threadpool
+from app.calculators.coverage import simulate_coverage, DEFAULT_SWATH_KM
 
 async def fetch_celestrak_tle(category: str = "starlink") -> List[Dict]:
     """Fetch live TLE from Celestrak"""
+    import requests
+
     url = f"https://celestrak.com/NORAD/elements/{category}/supplemental/supplemental.txt"
     
     try:
-        resp = requests.get(url, timeout=10)
+        resp = await run_in_threadpool(requests.get, url, timeout=10)
         lines = resp.text.strip().split('\n')
         
         satellites = []
@@ -34,6 +34,8 @@ async def fetch_celestrak_tle(category: str = "starlink") -> List[Dict]:
 
 def parse_tle_to_position(tle_data: Dict) -> Dict:
     """Convert TLE to current position"""
+    from skyfield.api import load, EarthSatellite, wgs84
+
     ts = load.timescale()
     satellite = EarthSatellite(tle_data["tle_line1"], tle_data["tle_line2"], tle_data["name"], ts)
     now = ts.now()
@@ -48,18 +50,23 @@ def parse_tle_to_position(tle_data: Dict) -> Dict:
         "name": tle_data["name"]
     }
 
-def calculate_coverage(satellites: List[Dict], region: str = "India") -> Dict:
-    """Simple coverage score (extend later)"""
-    if not satellites:
-        return {"percentage": 0, "optimal": []}
-    
-    # India bounding box
-    india_bbox = [68.7, 97.4, 8.1, 37.6]  # lon_min, lon_max, lat_min, lat_max
-    
-    visible = sum(1 for s in satellites if 68.7 <= s.get('lon', 0) <= 97.4 and 8.1 <= s.get('lat', 0) <= 37.6)
-    
+def calculate_coverage(orbit, constellation, region: str = "global", swath_km: Optional[float] = DEFAULT_SWATH_KM) -> Dict:
+    """Simulate a day of coverage for the proposed constellation over a region"""
+    result = simulate_coverage(
+        altitude_km=orbit.altitude_km,
+        inclination_deg=orbit.inclination_deg,
+        satellites=constellation.satellites,
+        planes=constellation.planes,
+        phasing=round(constellation.phasing_deg * constellation.satellites / 360.0) % constellation.planes,
+        swath_km=swath_km,
+        regions=[region],
+    )
+    stats = next(iter(result["regions"].values()))
+
     return {
-        "percentage": min(95, (visible / len(satellites)) * 100),
-        "optimal": [s["name"] for s in satellites[:3]],
-        "total_available": len(satellites)
+        "percentage": stats["coverage_percent"],
+        "mean_revisit_hours": stats["mean_revisit_hours"],
+        "max_revisit_hours": stats["max_revisit_hours"],
+        "region": next(iter(result["regions"])),
+        "configuration": result["configuration"],
     }
@@ -0,0 +1,216 @@
+"""
+Live space-environment snapshot for mission planning
+Celestrak active-satellite counts and altitude crowding, NOAA solar flux and
+Kp over rolling windows, and a derived debris risk, shared by all workers
+through the shared-state store
+"""
+
+from datetime import datetime
+from starlette.concurrency import run_in_threadpool
+
+from app.core.catalog import catalog_store, get_catalog, refresh_catalog
+from app.core.pipeline import Stage
+from app.core.altitude_index import get_altitude_index
+from app.core.space_weather import space_weather
+from app.core.config import get_shared_state_settings
+from app.services.shared_state import get_shared_state
+
+
+# Longest a request waits for a live-data refresh before using nominal values
+LIVE_DATA_TIMEOUT_S = 30.0
+
+
+def empty_insights():
+    """Nominal snapshot before any source has been queried"""
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "satellite_count": 0,
+        "debris_objects": 0,
+        "solar_flux": 0,
+        "solar_flux_81d": 0,
+        "kp_index": 0,
+        "kp_max_24h": 0,
+        "crowded_altitudes": [],
+        "recommended_altitude_adjustment": 0,
+        "debris_risk": "unknown",
+        "solar_activity_level": "unknown",
+        "sources_status": []
+    }
+
+
+def offline_insights():
+    """Nominal snapshot used when live data could not be fetched in time"""
+    live_insights = empty_insights()
+    live_insights["sources_status"].append({
+        "name": "Live Data",
+        "status": "Offline",
+        "data_used": "Using nominal conditions"
+    })
+    return live_insights
+
+
+def fetch_and_analyze_live_data():
+    """
+    Fetch REAL live data from APIs and analyze it
+    Returns actionable insights for mission planning
+    """
+
+    live_insights = empty_insights()
+
+    print("📡 Fetching real-time space data...")
+
+    # ===== 1. CELESTRAK: GP catalog, merged incrementally =====
+    try:
+        print("🛰️  Fetching from Celestrak...")
+        delta = refresh_catalog()
+        catalog_snapshot = delta.catalog
+        # Congestion thresholds are calibrated on active satellites, not debris groups
+        live_insights["satellite_count"] = catalog_store.group_size("active") or len(catalog_snapshot)
+
+        # Index every object's perigee-apogee interval and screen 50km shells
+        # (the catalog delta has already moved the changed intervals)
+        altitude_index = get_altitude_index(catalog_snapshot)
+        crowded = altitude_index.crowded_shells()
+        live_insights["crowded_altitudes"] = crowded
+        print(f"   ✅ Indexed {altitude_index.size} orbital altitude intervals")
+
+        live_insights["sources_status"].append({
+            "name": f"Celestrak - GP groups ({delta.group})",
+            "status": "Live",
+            "data_used": (
+                f"Analyzed {altitude_index.size} orbital altitude intervals "
+                f"({len(delta.added)} new, {len(delta.updated)} updated, {len(delta.removed)} removed)"
+            ),
+            "satellites_tracked": len(catalog_snapshot)
+        })
+
+        print(f"   ✅ Tracking {len(catalog_snapshot)} objects: {delta.summary()}")
+        print(f"   ✅ Crowded zones: {crowded}")
+
+    except Exception as e:
+        live_insights["sources_status"].append({
+            "name": "Celestrak",
+            "status": "Error",
+            "data_used": f"Error: {str(e)[:50]}"
+        })
+        print(f"   ❌ Celestrak error: {e}")
+
+
+    # ===== 2. NOAA SPACE WEATHER: Solar Activity =====
+    try:
+        print("☀️  Fetching from NOAA Space Weather...")
+
+        # Solar Flux (F10.7): only samples newer than the buffered ones are added
+        new_flux = space_weather.refresh_f107()
+        f107 = space_weather.f107
+
+        if f107.latest is not None:
+            solar_flux = f107.latest
+            # Drag tracks the smoothed flux more than a single day's reading
+            flux_mean = f107.mean
+            live_insights["solar_flux"] = solar_flux
+            live_insights["solar_flux_81d"] = round(flux_mean, 1)
+
+            # Kp Index (Geomagnetic Activity)
+            try:
+                space_weather.refresh_kp()
+            except Exception as e:
+                print(f"   ⚠️ Kp refresh failed, using buffered samples: {e}")
+            if space_weather.kp.latest is not None:
+                live_insights["kp_index"] = space_weather.kp.latest
+                live_insights["kp_max_24h"] = space_weather.kp.max
+            else:
+                live_insights["kp_index"] = 3  # Default moderate
+                live_insights["kp_max_24h"] = 3
+
+            # Analyze solar activity
+            if flux_mean > 150:
+                live_insights["solar_activity_level"] = "High"
+                live_insights["recommended_altitude_adjustment"] = +50
+                reasoning = "High solar activity increases atmospheric drag"
+            elif flux_mean < 80:
+                live_insights["solar_activity_level"] = "Low"
+                live_insights["recommended_altitude_adjustment"] = -30
+                reasoning = "Low solar activity allows lower orbits"
+            else:
+                live_insights["solar_activity_level"] = "Normal"
+                live_insights["recommended_altitude_adjustment"] = 0
+                reasoning = "Normal solar conditions"
+
+            window_days = f107.covered_s / 86400
+            live_insights["sources_status"].append({
+                "name": "NOAA Space Weather",
+                "status": "Live",
+                "data_used": f"Solar flux: {solar_flux} SFU, {window_days:.0f}-day mean {flux_mean:.1f} SFU, max Kp 24h {live_insights['kp_max_24h']}",
+                "reasoning": reasoning
+            })
+
+            print(f"   ✅ Solar flux: {solar_flux} SFU, mean {flux_mean:.1f} SFU ({live_insights['solar_activity_level']}, {new_flux} new samples)")
+
+        else:
+            live_insights["sources_status"].append({
+                "name": "NOAA Space Weather",
+                "status": "Offline",
+                "data_used": "Using nominal solar conditions"
+            })
+            print("   ⚠️ NOAA returned no solar flux samples")
+
+    except Exception as e:
+        live_insights["sources_status"].append({
+            "name": "NOAA Space Weather",
+            "status": "Error",
+            "data_used": f"Error: {str(e)[:50]}"
+        })
+        print(f"   ❌ NOAA error: {e}")
+
+
+    # ===== 3. Calculate Debris Risk =====
+    if live_insights["satellite_count"] > 5000:
+        live_insights["debris_risk"] = "High"
+        live_insights["recommended_altitude_adjustment"] += 20
+        risk_note = f"High congestion: {live_insights['satellite_count']} active satellites"
+    elif live_insights["satellite_count"] > 3000:
+        live_insights["debris_risk"] = "Medium"
+        live_insights["recommended_altitude_adjustment"] += 10
+        risk_note = f"Moderate congestion: {live_insights['satellite_count']} active satellites"
+    else:
+        live_insights["debris_risk"] = "Low"
+        risk_note = "Low orbital congestion"
+
+    live_insights["sources_status"].append({
+        "name": "Debris Risk Analysis",
+        "status": "Calculated",
+        "data_used": risk_note
+    })
+
+    print(f"📊 Debris risk: {live_insights['debris_risk']}")
+    print(f"🎯 Recommended altitude adjustment: {live_insights['recommended_altitude_adjustment']:+d} km")
+
+    return live_insights
+
+
+def load_altitude_index():
+    """This worker's altitude index, over its catalog merged from the shared GP pulls"""
+    return get_altitude_index(get_catalog())
+
+
+async def get_live_insights():
+    """Live-data snapshot shared by all workers; one worker refreshes it when it expires"""
+    ttl_s = get_shared_state_settings().live_data_ttl_s
+    live_insights = await get_shared_state().get_or_compute("live_insights", fetch_and_analyze_live_data, ttl_s)
+    # The snapshot may come from another worker: load this worker's catalog
+    # (from the shared pulls, not Celestrak) so congestion checks have an index
+    await run_in_threadpool(load_altitude_index)
+    return live_insights
+
+
+def live_data_age_s(live_insights) -> float:
+    return (datetime.now() - datetime.fromisoformat(live_insights["timestamp"])).total_seconds()
+
+
+async def _live_stage(context):
+    return await get_live_insights()
+
+
+# Pipeline stage shared by the mission endpoints
+LIVE_STAGE = Stage("live", _live_stage, timeout_s=LIVE_DATA_TIMEOUT_S, optional=True, default=offline_insights)
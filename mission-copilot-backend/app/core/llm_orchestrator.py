@@ -1,10 +1,19 @@
 from typing import Dict, Any  # ← ADD THIS
 import json
-from app.core.config import settings  # ← ADD THIS
+from app.core.config import get_settings
+
+# Parameters used when the LLM is unavailable or skipped under load
+DEFAULT_PARAMS = {
+    "mission_type": "earth_observation",
+    "revisit_hours": 24.0,
+    "region": "",
+    "resolution_m": 5.0
+}
 
 def extract_mission_params(message: str) -> Dict[str, Any]:
     import google.generativeai as genai
     
+    settings = get_settings()
     genai.configure(api_key=settings.google_api_key)
     
     model = genai.GenerativeModel(
@@ -37,11 +46,6 @@ def extract_mission_params(message: str) -> Dict[str, Any]:
         params = json.loads(params_text)
     except Exception as e:
         print(f"Gemini error: {e}")
-        params = {
-            "mission_type": "earth_observation",
-            "revisit_hours": 24.0,
-            "region": "",
-            "resolution_m": 5.0
-        }
+        params = dict(DEFAULT_PARAMS)
     
     return params
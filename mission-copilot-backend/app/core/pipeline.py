@@ -0,0 +1,148 @@
+"""
+Dependency-driven stage runner for mission generation
+Each stage names the stages it needs; a stage starts as soon as those have
+finished, so independent stages overlap and a run takes as long as its
+critical path. Synchronous stages run in the threadpool.
+"""
+
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+import asyncio
+import inspect
+import time
+from starlette.concurrency import run_in_threadpool
+
+
+class Stage:
+    """
+    One step of a pipeline
+
+    Args:
+        name: Key of the stage's result in the run context
+        fn: Called with the context dict (inputs plus results of finished
+            stages); may be sync or async
+        deps: Names of stages (or inputs) that must be available first
+        timeout_s: Limit for this stage (None = no limit)
+        optional: On error or timeout use `default` instead of failing the run
+        default: Fallback value, or a callable returning a fresh one per run
+    """
+
+    def __init__(self, name: str, fn: Callable[[Dict[str, Any]], Any], deps: Iterable[str] = (),
+                 timeout_s: Optional[float] = None, optional: bool = False, default: Any = None):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+        self.timeout_s = timeout_s
+        self.optional = optional
+        self.default = default
+
+
+class PipelineResult:
+    def __init__(self, values: Dict[str, Any], timings_ms: Dict[str, float], errors: Dict[str, str], total_ms: float):
+        self.values = values
+        self.timings_ms = timings_ms
+        self.errors = errors
+        self.total_ms = total_ms
+
+    def __getitem__(self, name: str) -> Any:
+        return self.values[name]
+
+    def describe(self) -> str:
+        """One-line timing summary, e.g. "live 12ms, llm 2310ms (timeout) | total 2335ms" """
+        parts = [
+            f"{name} {ms:.0f}ms" + (f" ({self.errors[name]})" if name in self.errors else "")
+            for name, ms in self.timings_ms.items()
+        ]
+        return ", ".join(parts) + f" | total {self.total_ms:.0f}ms"
+
+
+class Pipeline:
+    def __init__(self, stages: Iterable[Stage], inputs: Iterable[str] = ()):
+        self.stages: Dict[str, Stage] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate stage: {stage.name}")
+            self.stages[stage.name] = stage
+        self.inputs = tuple(inputs)
+        self._check()
+
+    def _check(self):
+        """Reject unknown dependencies and cycles when the pipeline is built, not per request"""
+        known = set(self.stages) | set(self.inputs)
+        for stage in self.stages.values():
+            missing = [dep for dep in stage.deps if dep not in known]
+            if missing:
+                raise ValueError(f"Stage {stage.name} depends on unknown {missing}")
+
+        visiting, done = set(), set()
+
+        def visit(name: str, path: Tuple[str, ...]):
+            if name in done or name not in self.stages:
+                return
+            if name in visiting:
+                raise ValueError(f"Pipeline cycle: {' -> '.join(path + (name,))}")
+            visiting.add(name)
+            for dep in self.stages[name].deps:
+                visit(dep, path + (name,))
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.stages:
+            visit(name, ())
+
+    async def run(self, **inputs) -> PipelineResult:
+        """
+        Run every stage once dependencies allow
+
+        Raises:
+            The first exception of a non-optional stage; stages still running
+            are cancelled
+        """
+        missing = [name for name in self.inputs if name not in inputs]
+        if missing:
+            raise ValueError(f"Missing pipeline inputs: {missing}")
+
+        context: Dict[str, Any] = dict(inputs)
+        timings: Dict[str, float] = {}
+        errors: Dict[str, str] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+        started = time.perf_counter()
+
+        async def execute(stage: Stage):
+            deps = [tasks[dep] for dep in stage.deps if dep in tasks]
+            if deps:
+                await asyncio.gather(*deps)
+
+            began = time.perf_counter()
+            try:
+                if inspect.iscoroutinefunction(stage.fn):
+                    call = stage.fn(context)
+                else:
+                    call = run_in_threadpool(stage.fn, context)
+                value = await asyncio.wait_for(call, stage.timeout_s)
+            except Exception as e:
+                if not stage.optional:
+                    timings[stage.name] = (time.perf_counter() - began) * 1000
+                    errors[stage.name] = "timeout" if isinstance(e, asyncio.TimeoutError) else type(e).__name__
+                    raise
+                errors[stage.name] = "timeout" if isinstance(e, asyncio.TimeoutError) else f"{type(e).__name__}: {e}"
+                value = stage.default() if callable(stage.default) else stage.default
+            timings[stage.name] = (time.perf_counter() - began) * 1000
+            context[stage.name] = value
+
+        for stage in self.stages.values():
+            tasks[stage.name] = asyncio.ensure_future(execute(stage))
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+
+        return PipelineResult(
+            {name: context[name] for name in self.stages},
+            timings,
+            errors,
+            (time.perf_counter() - started) * 1000,
+        )
@@ -0,0 +1,45 @@
+"""
+Fast JSON responses built on orjson
+Mongo documents and mission payloads are serialized directly: datetimes,
+ObjectIds and numpy values are handled without a jsonable_encoder pass
+"""
+
+from decimal import Decimal
+from typing import Any
+import orjson
+import numpy as np
+from bson import ObjectId
+from starlette.responses import JSONResponse
+
+OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def default(obj: Any):
+    """Types orjson does not serialize natively"""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=default, option=OPTIONS)
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    Default response class for the app
+
+    Routes that return an instance directly (JSONResponse subclasses are
+    passed through untouched) skip FastAPI's response validation and
+    jsonable_encoder walk; plain dict returns still work and are rendered here.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,188 @@
+"""
+Rolling space-weather series (NOAA SWPC F10.7 solar flux and Kp index)
+Samples are kept in fixed-size ring buffers; a refresh appends only the
+samples newer than the last one held, and windowed statistics (81-day F10.7
+mean, 24 h Kp maximum) are maintained as samples arrive, so reading them is O(1)
+"""
+
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+import threading
+import numpy as np
+
+F107_URL = "https://services.swpc.noaa.gov/json/f107_cm_flux.json"
+KP_URL = "https://services.swpc.noaa.gov/json/planetary_k_index_1m.json"
+
+# Standard smoothing window for F10.7 in drag models
+F107_WINDOW_S = 81 * 86400
+KP_WINDOW_S = 24 * 3600
+
+
+class RollingWindow:
+    """
+    Ring buffer of (time, value) samples with a sliding-window mean and max
+
+    The window spans window_s up to the newest sample. Appends update a
+    running sum and a monotonic deque of candidate maxima (amortized O(1) per
+    sample). Once capacity is reached the oldest samples are overwritten even
+    if they are still inside the window.
+    """
+
+    def __init__(self, window_s: float, capacity: int):
+        self.window_s = window_s
+        self.capacity = capacity
+        self.times = np.zeros(capacity)
+        self.values = np.zeros(capacity)
+        self._appended = 0      # sample n lives in slot n % capacity
+        self._start = 0         # first sample inside the window
+        self._sum = 0.0
+        self._maxima: deque = deque()  # sample numbers with decreasing values
+
+    def __len__(self):
+        return self._appended - self._start
+
+    @property
+    def last_time(self) -> Optional[float]:
+        return float(self.times[(self._appended - 1) % self.capacity]) if self._appended else None
+
+    @property
+    def latest(self) -> Optional[float]:
+        return float(self.values[(self._appended - 1) % self.capacity]) if self._appended else None
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self._sum / len(self) if len(self) else None
+
+    @property
+    def max(self) -> Optional[float]:
+        return float(self.values[self._maxima[0] % self.capacity]) if self._maxima else None
+
+    @property
+    def covered_s(self) -> float:
+        """Time between the oldest and newest samples in the window"""
+        if not len(self):
+            return 0.0
+        return self.last_time - float(self.times[self._start % self.capacity])
+
+    def append(self, t: float, value: float) -> bool:
+        """Add a sample; samples not newer than the last one are ignored"""
+        if self._appended and t <= self.last_time:
+            return False
+
+        n = self._appended
+        if len(self) >= self.capacity:
+            self._evict()
+        slot = n % self.capacity
+        self.times[slot] = t
+        self.values[slot] = value
+        self._appended += 1
+        self._sum += value
+
+        while self._maxima and self.values[self._maxima[-1] % self.capacity] <= value:
+            self._maxima.pop()
+        self._maxima.append(n)
+
+        while self.times[self._start % self.capacity] <= t - self.window_s:
+            self._evict()
+
+        # Re-add the window once per lap so rounding in the running sum cannot build up
+        if self._appended % self.capacity == 0:
+            self._sum = float(self.values[np.arange(self._start, self._appended) % self.capacity].sum())
+        return True
+
+    def extend(self, samples: Iterable[Tuple[float, float]]) -> int:
+        return sum(self.append(t, value) for t, value in samples)
+
+    def _evict(self):
+        self._sum -= self.values[self._start % self.capacity]
+        if self._maxima and self._maxima[0] == self._start:
+            self._maxima.popleft()
+        self._start += 1
+
+
+def _timestamp(time_tag: str) -> float:
+    """SWPC time tags are UTC without an offset"""
+    return datetime.fromisoformat(time_tag.replace("Z", "")).replace(tzinfo=timezone.utc).timestamp()
+
+
+def _tail(records: List[Dict], field: str, after: Optional[float]) -> List[Tuple[float, float]]:
+    """
+    (time, value) of the records newer than `after`, oldest first
+
+    SWPC series are in time order, so this walks back from the end and stops
+    at the first sample already held instead of parsing the whole file.
+    """
+    samples = []
+    for rec in reversed(records):
+        try:
+            t = _timestamp(rec["time_tag"])
+            if after is not None and t <= after:
+                break
+            if rec.get("frequency", 2800) != 2800:
+                continue
+            samples.append((t, float(rec[field])))
+        except (KeyError, TypeError, ValueError):
+            continue
+    samples.reverse()
+    return samples
+
+
+class SpaceWeatherStore:
+    """F10.7 and Kp series refreshed with conditional GETs and tail-only appends"""
+
+    def __init__(self):
+        # F10.7 is reported a few times a day, Kp every minute
+        self.f107 = RollingWindow(F107_WINDOW_S, capacity=1024)
+        self.kp = RollingWindow(KP_WINDOW_S, capacity=2048)
+        self._validators: Dict[str, Dict[str, str]] = {}
+        self._lock = threading.Lock()
+
+    def _fetch(self, url: str) -> Optional[List[Dict]]:
+        """Parsed JSON series, or None when the server says it has not changed"""
+        import requests
+
+        headers = {}
+        validators = self._validators.get(url, {})
+        if "etag" in validators:
+            headers["If-None-Match"] = validators["etag"]
+        if "last_modified" in validators:
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+        response = requests.get(url, headers=headers, timeout=10)
+        if response.status_code == 304:
+            return None
+        response.raise_for_status()
+
+        data = response.json()
+        self._validators[url] = {
+            key: response.headers[header]
+            for key, header in (("etag", "ETag"), ("last_modified", "Last-Modified"))
+            if header in response.headers
+        }
+        return data
+
+    def _refresh(self, url: str, field: str, series: RollingWindow) -> int:
+        """Append the new samples of one series; returns how many were added"""
+        with self._lock:
+            records = self._fetch(url)
+            if not records:
+                return 0
+            return series.extend(_tail(records, field, series.last_time))
+
+    def refresh_f107(self) -> int:
+        return self._refresh(F107_URL, "flux", self.f107)
+
+    def refresh_kp(self) -> int:
+        return self._refresh(KP_URL, "kp_index", self.kp)
+
+    def stats(self) -> dict:
+        return {
+            "f107_samples": len(self.f107),
+            "f107_window_days": round(self.f107.covered_s / 86400, 1),
+            "kp_samples": len(self.kp),
+            "kp_window_hours": round(self.kp.covered_s / 3600, 1),
+        }
+
+
+space_weather = SpaceWeatherStore()
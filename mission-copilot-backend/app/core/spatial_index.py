@@ -0,0 +1,205 @@
+"""
+Spatial index over batch-propagated catalog positions
+Buckets sub-satellite points into a lat/lon grid so region, radius and
+nearest-object queries touch only a few contiguous slices of the catalog
+"""
+
+from typing import Callable, List, Optional, Tuple
+import math
+import threading
+import time
+import numpy as np
+
+from app.calculators.propagation import EARTH_RADIUS_KM, propagate_elements, ecef_to_geodetic
+from app.core.catalog import Catalog, get_catalog
+
+
+class SpatialIndex:
+    """Lat/lon bucket index over one snapshot of sub-satellite points"""
+
+    def __init__(self, position_km: np.ndarray, epoch_s: float, cell_deg: float = 2.0,
+                 previous: Optional["SpatialIndex"] = None):
+        self.epoch_s = epoch_s
+        self.cell_deg = cell_deg
+        self.n_lat = int(round(180.0 / cell_deg))
+        self.n_lon = int(round(360.0 / cell_deg))
+
+        lat, lon, alt = ecef_to_geodetic(position_km)
+        self.lat = lat.astype(np.float32)
+        self.lon = lon.astype(np.float32)
+        self.alt = alt.astype(np.float32)
+        self.unit = (position_km / np.linalg.norm(position_km, axis=-1, keepdims=True)).astype(np.float32)
+
+        cells = self._row(lat) * self.n_lon + self._col(lon)
+
+        # Objects keep most of their relative order between consecutive
+        # snapshots, so re-sorting the previous order is mostly merging runs
+        if previous is not None and len(previous.order) == len(cells):
+            order = previous.order[np.argsort(cells[previous.order], kind="stable")]
+        else:
+            order = np.argsort(cells, kind="stable")
+        self.order = order.astype(np.int32)
+        counts = np.bincount(cells, minlength=self.n_lat * self.n_lon)
+        self.offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int32)
+
+    def __len__(self):
+        return len(self.order)
+
+    def _row(self, lat):
+        return np.clip(np.floor((np.asarray(lat) + 90.0) / self.cell_deg).astype(np.int64), 0, self.n_lat - 1)
+
+    def _col(self, lon):
+        return np.mod(np.floor((np.asarray(lon) + 180.0) / self.cell_deg).astype(np.int64), self.n_lon)
+
+    def _gather(self, row_lo: int, row_hi: int, col_ranges: List[Tuple[int, int]]) -> np.ndarray:
+        """Concatenate the sorted slices of every (row, column range) bucket run"""
+        slices = []
+        for row in range(row_lo, row_hi + 1):
+            base = row * self.n_lon
+            for col_lo, col_hi in col_ranges:
+                lo, hi = self.offsets[base + col_lo], self.offsets[base + col_hi + 1]
+                if hi > lo:
+                    slices.append(self.order[lo:hi])
+        return np.concatenate(slices) if slices else np.zeros(0, dtype=np.int32)
+
+    def _col_ranges(self, lon_min: float, lon_max: float) -> List[Tuple[int, int]]:
+        """Column ranges covering [lon_min, lon_max], split at the antimeridian"""
+        if lon_max - lon_min >= 360.0:
+            return [(0, self.n_lon - 1)]
+        col_lo, col_hi = int(self._col(lon_min)), int(self._col(lon_max))
+        if col_lo <= col_hi:
+            return [(col_lo, col_hi)]
+        return [(col_lo, self.n_lon - 1), (0, col_hi)]
+
+    def query_region(self, lon_min: float, lon_max: float, lat_min: float, lat_max: float) -> np.ndarray:
+        """Indices of objects whose sub-satellite point lies in the box (lon_min > lon_max wraps)"""
+        span = (lon_max - lon_min) % 360.0 or 360.0
+        candidates = self._gather(int(self._row(lat_min)), int(self._row(lat_max)), self._col_ranges(lon_min, lon_min + span))
+
+        lat = self.lat[candidates]
+        rel_lon = np.mod(self.lon[candidates] - lon_min, 360.0)
+        keep = (lat >= lat_min) & (lat <= lat_max) & (rel_lon <= span)
+        return candidates[keep]
+
+    def query_radius(self, lat: float, lon: float, radius_km: float) -> np.ndarray:
+        """Indices of objects whose sub-satellite point is within radius_km (great circle)"""
+        radius = min(math.pi, radius_km / EARTH_RADIUS_KM)
+        radius_deg = math.degrees(radius)
+        lat_lo, lat_hi = lat - radius_deg, lat + radius_deg
+
+        if lat_lo <= -90.0 or lat_hi >= 90.0:
+            col_ranges = [(0, self.n_lon - 1)]
+        else:
+            half_width = math.degrees(math.asin(min(1.0, math.sin(radius) / math.cos(math.radians(lat)))))
+            col_ranges = self._col_ranges(lon - half_width, lon + half_width) if half_width < 180.0 else [(0, self.n_lon - 1)]
+
+        candidates = self._gather(int(self._row(max(-90.0, lat_lo))), int(self._row(min(90.0, lat_hi))), col_ranges)
+        center = _unit(lat, lon)
+        keep = self.unit[candidates] @ center >= math.cos(radius)
+        return candidates[keep]
+
+    def nearest(self, lat: float, lon: float, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The k objects with sub-satellite points closest to (lat, lon)
+
+        Returns:
+            (indices, ground distances in km), closest first
+        """
+        k = min(k, len(self))
+        radius_km = self.cell_deg * math.pi / 180.0 * EARTH_RADIUS_KM
+        while True:
+            candidates = self.query_radius(lat, lon, radius_km)
+            if len(candidates) >= k or radius_km >= math.pi * EARTH_RADIUS_KM:
+                break
+            radius_km *= 2
+
+        cos_angle = np.clip(self.unit[candidates] @ _unit(lat, lon), -1.0, 1.0)
+        distance = np.arccos(cos_angle) * EARTH_RADIUS_KM
+        best = np.argsort(distance)[:k]
+        return candidates[best], distance[best]
+
+
+def _unit(lat: float, lon: float) -> np.ndarray:
+    lat_r, lon_r = math.radians(lat), math.radians(lon)
+    return np.array([math.cos(lat_r) * math.cos(lon_r), math.cos(lat_r) * math.sin(lon_r), math.sin(lat_r)], dtype=np.float32)
+
+
+class PositionTimeline:
+    """
+    Spatial indexes at fixed steps from now to a horizon
+
+    Advancing the clock drops expired snapshots and only propagates the new
+    ones at the tail, each built incrementally from its predecessor.
+    """
+
+    def __init__(self, catalog: Catalog, step_s: float = 60.0, horizon_s: float = 3600.0, cell_deg: float = 2.0):
+        self.catalog = catalog
+        self.step_s = step_s
+        self.horizon_s = horizon_s
+        self.cell_deg = cell_deg
+        # Replaced, never mutated, so readers can hold on to a list while another thread advances
+        self.snapshots: List[SpatialIndex] = []
+        self._lock = threading.Lock()
+
+    def advance(self, now: Optional[float] = None) -> "PositionTimeline":
+        self._advance(time.time() if now is None else now)
+        return self
+
+    def _advance(self, now: float) -> List[SpatialIndex]:
+        """Advance to now and return the snapshot list that covers it"""
+        start = math.floor(now / self.step_s) * self.step_s
+        with self._lock:
+            snapshots = [s for s in self.snapshots if s.epoch_s >= start]
+
+            first = snapshots[-1].epoch_s + self.step_s if snapshots else start
+            new_times = np.arange(first, start + self.horizon_s + self.step_s / 2, self.step_s)
+            if new_times.size and len(self.catalog):
+                positions = propagate_elements(self.catalog, new_times)
+                previous = snapshots[-1] if snapshots else None
+                for t, position in zip(new_times, positions):
+                    previous = SpatialIndex(position, float(t), self.cell_deg, previous)
+                    snapshots.append(previous)
+            self.snapshots = snapshots
+        return snapshots
+
+    def at(self, t: Optional[float] = None) -> SpatialIndex:
+        """Snapshot closest to t (defaults to now)"""
+        t = time.time() if t is None else t
+        return min(self._advance(t), key=lambda s: abs(s.epoch_s - t))
+
+    def window(self, start: float, end: float) -> List[SpatialIndex]:
+        return [s for s in self._advance(start) if start - self.step_s / 2 <= s.epoch_s <= end + self.step_s / 2]
+
+    def first_seen(self, start: float, end: float, query: Callable[[SpatialIndex], np.ndarray]):
+        """
+        Run a query on every snapshot in [start, end]
+
+        Returns:
+            (indices, epoch_s of the first snapshot each object matched in)
+        """
+        hits, epochs = [], []
+        for snapshot in self.window(start, end):
+            found = query(snapshot)
+            hits.append(found)
+            epochs.append(np.full(len(found), snapshot.epoch_s))
+        if not hits:
+            return np.zeros(0, dtype=np.int32), np.zeros(0)
+
+        # Snapshots are in time order, so the first occurrence is the earliest
+        indices, first = np.unique(np.concatenate(hits), return_index=True)
+        return indices, np.concatenate(epochs)[first]
+
+
+_timeline: Optional[PositionTimeline] = None
+_timeline_lock = threading.Lock()
+
+
+def get_timeline() -> PositionTimeline:
+    """Timeline over the shared catalog, rebuilt when the catalog is replaced"""
+    global _timeline
+    catalog = get_catalog()
+    with _timeline_lock:
+        if _timeline is None or _timeline.catalog is not catalog:
+            _timeline = PositionTimeline(catalog)
+        timeline = _timeline
+    return timeline.advance()
@@ -1,270 +1,80 @@
-import google.generativeai as genai
-from fastapi import FastAPI, HTTPException
+from fastapi import APIRouter, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
+from typing import Optional
 import os
 from dotenv import load_dotenv
 import json
-import requests
+import hashlib
 from datetime import datetime
+from functools import lru_cache
 import time
 import math
 import random
+import threading
+
+from app.calculators.coverage import simulate_coverage, summarize_coverage, region_bounds
+from app.calculators.constellation_optimizer import (
+    optimize_constellation, shutdown_optimizer, SearchBudgetExceeded, MAX_SATELLITES, SEARCH_BUDGET_S
+)
+from app.calculators.passes import predict_passes, select_stations, summarize_passes
+from app.calculators.lifetime import (
+    decay_lifetime_years, get_lifetime_table, DEFAULT_BALLISTIC_COEFF_KG_M2, DISPOSAL_GUIDELINE_YEARS, NOMINAL_F107_SFU
+)
 
 # MongoDB imports
 from app.services.database import connect_to_mongodb, close_mongodb_connection, check_mongodb_health
-from app.routers import missions, chats
+from app.services.persistence_queue import mission_queue, persist_mission
+from app.services.shared_state import get_shared_state
+from app.services.admission import get_admission_controller, client_keys
+from app.core.config import get_database_settings, get_shared_state_settings
+from app.core.responses import ORJSONResponse
+from app.core.compression import CompressionMiddleware, body_cache
+from app.routers import missions, chats, catalog
+from app.core.catalog import catalog_store
+from app.core.space_weather import space_weather
+from app.core.altitude_index import current_altitude_index, SHELL_HALF_WIDTH_KM
+from app.core.live_data import LIVE_STAGE, get_live_insights, live_data_age_s
+from app.core.pipeline import Pipeline, Stage
 
 load_dotenv()  # Load .env file
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-# Add validation
-if not GEMINI_API_KEY:
-    raise ValueError("GEMINI_API_KEY not found in environment variables!")
+GEMINI_MODEL = 'gemini-2.0-flash-exp'
+
 
-# Configure Gemini
-genai.configure(api_key=GEMINI_API_KEY)
-client = genai.GenerativeModel('gemini-2.0-flash-exp')
+@lru_cache
+def get_gemini_client():
+    """Gemini model, created on first use so startup neither imports the SDK nor needs the key"""
+    if not GEMINI_API_KEY:
+        raise ValueError("GEMINI_API_KEY not found in environment variables!")
 
+    import google.generativeai as genai
 
-app = FastAPI(title="Mission Copilot - Live AI with Real Data")
-app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
+    genai.configure(api_key=GEMINI_API_KEY)
+    return genai.GenerativeModel(GEMINI_MODEL)
 
-# Register MongoDB routers
-app.include_router(missions.router)
-app.include_router(chats.router)
+
+router = APIRouter()
 
 
 # Database lifecycle events
-@app.on_event("startup")
 async def startup_db_client():
     """Connect to MongoDB on application startup"""
     await connect_to_mongodb()
+    mission_queue.start()
 
 
-@app.on_event("shutdown")
 async def shutdown_db_client():
     """Close MongoDB connection on application shutdown"""
+    await mission_queue.drain()
     await close_mongodb_connection()
+    shutdown_optimizer()
 
 
 class MissionRequest(BaseModel):
     userInput: str
-
-
-# ===== REAL LIVE DATA FUNCTIONS =====
-
-def fetch_and_analyze_live_data():
-    """
-    Fetch REAL live data from APIs and analyze it
-    Returns actionable insights for mission planning
-    """
-
-    live_insights = {
-        "timestamp": datetime.now().isoformat(),
-        "satellite_count": 0,
-        "debris_objects": 0,
-        "solar_flux": 0,
-        "kp_index": 0,
-        "crowded_altitudes": [],
-        "recommended_altitude_adjustment": 0,
-        "debris_risk": "unknown",
-        "solar_activity_level": "unknown",
-        "sources_status": []
-    }
-
-    print("📡 Fetching real-time space data...")
-
-    # ===== 1. CELESTRAK: Active Satellites & TLE Data =====
-    try:
-        print("🛰️  Fetching from Celestrak...")
-        response = requests.get(
-            "https://celestrak.org/NORAD/elements/gp.php?GROUP=active&FORMAT=json",
-            timeout=10
-        )
-
-        if response.status_code == 200:
-            satellites = response.json()
-            live_insights["satellite_count"] = len(satellites)
-
-            # Analyze altitude distribution
-            altitudes = []
-            print(f"   🔍 Analyzing satellite altitudes...")
-
-            for i, sat in enumerate(satellites[:500]):  # Sample first 500 for speed
-                try:
-                    # Try multiple field names (Celestrak API varies)
-                    apogee = None
-                    perigee = None
-
-                    # Try uppercase
-                    if 'APOGEE' in sat:
-                        apogee = float(sat['APOGEE'])
-                    if 'PERIGEE' in sat:
-                        perigee = float(sat['PERIGEE'])
-
-                    # Try lowercase
-                    if apogee is None and 'apogee' in sat:
-                        apogee = float(sat['apogee'])
-                    if perigee is None and 'perigee' in sat:
-                        perigee = float(sat['perigee'])
-
-                    # If still None, try calculating from MEAN_MOTION
-                    if apogee is None or perigee is None:
-                        if 'MEAN_MOTION' in sat:
-                            mean_motion = float(sat['MEAN_MOTION'])
-                            # Calculate semi-major axis from mean motion
-                            mu = 398600  # km^3/s^2
-                            n_per_second = mean_motion / 86400  # Convert to per second
-                            semi_major_axis = (mu / (2 * math.pi * n_per_second) ** 2) ** (1/3)
-                            avg_alt = semi_major_axis - 6371  # Earth radius
-                            if 200 < avg_alt < 2000:
-                                altitudes.append(avg_alt)
-                            continue
-
-                    # If we have apogee/perigee, use them
-                    if apogee is not None and perigee is not None:
-                        avg_alt = (apogee + perigee) / 2
-                        if 200 < avg_alt < 2000:  # Valid LEO range
-                            altitudes.append(avg_alt)
-
-                except Exception as e:
-                    # Debug first satellite to see structure
-                    if i == 0:
-                        print(f"   🔍 Sample satellite data: {list(sat.keys())[:10]}")
-                    continue
-
-            print(f"   ✅ Successfully analyzed {len(altitudes)} altitudes")
-
-            # Find congested altitude bands (50km bins)
-            altitude_bins = {}
-            for alt in altitudes:
-                bin_center = round(alt / 50) * 50  # Round to nearest 50km
-                altitude_bins[bin_center] = altitude_bins.get(bin_center, 0) + 1
-
-            # Mark crowded zones (>20 satellites in 50km band)
-            crowded = [alt for alt, count in altitude_bins.items() if count > 20]
-            live_insights["crowded_altitudes"] = sorted(crowded)
-
-            live_insights["sources_status"].append({
-                "name": "Celestrak - Active Satellites",
-                "status": "Live",
-                "data_used": f"Analyzed {len(altitudes)} orbital altitudes",
-                "satellites_tracked": len(satellites)
-            })
-
-            print(f"   ✅ Found {len(satellites)} active satellites")
-            print(f"   ✅ Crowded zones: {crowded}")
-
-        else:
-            live_insights["sources_status"].append({
-                "name": "Celestrak",
-                "status": "Offline",
-                "data_used": "Using default parameters"
-            })
-            print(f"   ⚠️ Celestrak offline (status {response.status_code})")
-
-    except Exception as e:
-        live_insights["sources_status"].append({
-            "name": "Celestrak",
-            "status": "Error",
-            "data_used": f"Error: {str(e)[:50]}"
-        })
-        print(f"   ❌ Celestrak error: {e}")
-
-
-    # ===== 2. NOAA SPACE WEATHER: Solar Activity =====
-    try:
-        print("☀️  Fetching from NOAA Space Weather...")
-
-        # Solar Flux (F10.7)
-        response = requests.get(
-            "https://services.swpc.noaa.gov/json/f107_cm_flux.json",
-            timeout=10
-        )
-
-        if response.status_code == 200:
-            data = response.json()
-            latest = data[-1]  # Most recent measurement
-            solar_flux = float(latest['flux'])
-            live_insights["solar_flux"] = solar_flux
-
-            # Kp Index (Geomagnetic Activity)
-            try:
-                kp_response = requests.get(
-                    "https://services.swpc.noaa.gov/json/planetary_k_index_1m.json",
-                    timeout=10
-                )
-
-                if kp_response.status_code == 200:
-                    kp_data = kp_response.json()
-                    latest_kp = kp_data[-1]
-                    live_insights["kp_index"] = float(latest_kp['kp_index'])
-            except:
-                live_insights["kp_index"] = 3  # Default moderate
-
-            # Analyze solar activity
-            if solar_flux > 150:
-                live_insights["solar_activity_level"] = "High"
-                live_insights["recommended_altitude_adjustment"] = +50
-                reasoning = "High solar activity increases atmospheric drag"
-            elif solar_flux < 80:
-                live_insights["solar_activity_level"] = "Low"
-                live_insights["recommended_altitude_adjustment"] = -30
-                reasoning = "Low solar activity allows lower orbits"
-            else:
-                live_insights["solar_activity_level"] = "Normal"
-                live_insights["recommended_altitude_adjustment"] = 0
-                reasoning = "Normal solar conditions"
-
-            live_insights["sources_status"].append({
-                "name": "NOAA Space Weather",
-                "status": "Live",
-                "data_used": f"Solar flux: {solar_flux} SFU",
-                "reasoning": reasoning
-            })
-
-            print(f"   ✅ Solar flux: {solar_flux} SFU ({live_insights['solar_activity_level']})")
-
-        else:
-            live_insights["sources_status"].append({
-                "name": "NOAA Space Weather",
-                "status": "Offline",
-                "data_used": "Using nominal solar conditions"
-            })
-            print(f"   ⚠️ NOAA offline (status {response.status_code})")
-
-    except Exception as e:
-        live_insights["sources_status"].append({
-            "name": "NOAA Space Weather",
-            "status": "Error",
-            "data_used": f"Error: {str(e)[:50]}"
-        })
-        print(f"   ❌ NOAA error: {e}")
-
-
-    # ===== 3. Calculate Debris Risk =====
-    if live_insights["satellite_count"] > 5000:
-        live_insights["debris_risk"] = "High"
-        live_insights["recommended_altitude_adjustment"] += 20
-        risk_note = f"High congestion: {live_insights['satellite_count']} active satellites"
-    elif live_insights["satellite_count"] > 3000:
-        live_insights["debris_risk"] = "Medium"
-        live_insights["recommended_altitude_adjustment"] += 10
-        risk_note = f"Moderate congestion: {live_insights['satellite_count']} active satellites"
-    else:
-        live_insights["debris_risk"] = "Low"
-        risk_note = "Low orbital congestion"
-
-    live_insights["sources_status"].append({
-        "name": "Debris Risk Analysis",
-        "status": "Calculated",
-        "data_used": risk_note
-    })
-
-    print(f"📊 Debris risk: {live_insights['debris_risk']}")
-    print(f"🎯 Recommended altitude adjustment: {live_insights['recommended_altitude_adjustment']:+d} km")
-
-    return live_insights
+    userId: str = "temp-user"
+    persist: Optional[bool] = None  # None = MONGODB_AUTO_PERSIST_MISSIONS setting
 
 
 def apply_live_data_to_mission(base_params, live_insights):
@@ -292,7 +102,9 @@ def apply_live_data_to_mission(base_params, live_insights):
             "live_data_summary": {
                 "active_satellites": live_insights["satellite_count"],
                 "solar_flux_sfu": live_insights["solar_flux"],
+                "solar_flux_81d_sfu": live_insights.get("solar_flux_81d"),
                 "kp_index": live_insights["kp_index"],
+                "kp_max_24h": live_insights.get("kp_max_24h"),
                 "debris_risk": live_insights["debris_risk"],
                 "crowded_altitudes_km": live_insights["crowded_altitudes"]
             }
@@ -305,22 +117,41 @@ def apply_live_data_to_mission(base_params, live_insights):
 
     # Avoid crowded zones
     avoidance_note = None
-    for crowded_alt in live_insights["crowded_altitudes"]:
-        if abs(adjusted_altitude - crowded_alt) < 30:
-            adjusted_altitude = crowded_alt + 50
-            avoidance_note = f"Adjusted +50km to avoid congestion at {crowded_alt}km"
-            break
-
-    # Calculate mission lifetime based on altitude and solar activity
-    if live_insights["solar_activity_level"] == "High":
-        lifetime_years = max(2, 5 - (600 - adjusted_altitude) / 100)
-        lifetime_note = "Reduced due to high solar drag"
-    elif live_insights["solar_activity_level"] == "Low":
-        lifetime_years = max(5, 8 - (600 - adjusted_altitude) / 80)
-        lifetime_note = "Extended due to low solar drag"
+    altitude_index = current_altitude_index()
+    if altitude_index is not None and altitude_index.size:
+        # Search for the nearest shell that few perigee-apogee intervals in
+        # the mission's inclination band cross (the whole catalog if unknown)
+        inclination = base_params.get("inclination_deg")
+        inclination = float(inclination) if isinstance(inclination, (int, float)) else None
+        if altitude_index.is_congested(adjusted_altitude, inclination_deg=inclination):
+            crowded_count = altitude_index.count_crossing(
+                adjusted_altitude - SHELL_HALF_WIDTH_KM, adjusted_altitude + SHELL_HALF_WIDTH_KM, inclination
+            )
+            clear_altitude = altitude_index.nearest_clear_shell(adjusted_altitude, inclination_deg=inclination)
+            if clear_altitude is not None:
+                avoidance_note = (
+                    f"Adjusted {clear_altitude - adjusted_altitude:+.0f}km to avoid congestion "
+                    f"({crowded_count} objects cross {adjusted_altitude:.0f}±{SHELL_HALF_WIDTH_KM:.0f}km)"
+                )
+                adjusted_altitude = clear_altitude
+            else:
+                avoidance_note = f"No uncongested shell nearby ({crowded_count} objects cross this shell)"
     else:
-        lifetime_years = max(3, 7 - (600 - adjusted_altitude) / 90)
-        lifetime_note = "Normal atmospheric conditions"
+        for crowded_alt in live_insights["crowded_altitudes"]:
+            if abs(adjusted_altitude - crowded_alt) < 30:
+                adjusted_altitude = crowded_alt + 50
+                avoidance_note = f"Adjusted +50km to avoid congestion at {crowded_alt}km"
+                break
+
+    # Drag lifetime from the precomputed decay tables, driven by the smoothed solar flux
+    f107 = live_insights.get("solar_flux_81d") or live_insights["solar_flux"] or NOMINAL_F107_SFU
+    lifetime_years = decay_lifetime_years(adjusted_altitude, f107, DEFAULT_BALLISTIC_COEFF_KG_M2)
+    lifetime_note = (
+        f"Drag decay from {adjusted_altitude:.0f}km at F10.7 {f107:.0f} SFU "
+        f"(ballistic coefficient {DEFAULT_BALLISTIC_COEFF_KG_M2:.0f} kg/m²)"
+    )
+    if lifetime_years > DISPOSAL_GUIDELINE_YEARS:
+        lifetime_note += f"; exceeds the {DISPOSAL_GUIDELINE_YEARS}-year disposal guideline, plan a deorbit maneuver"
 
     # Collision avoidance fuel budget
     if live_insights["debris_risk"] == "High":
@@ -345,7 +176,9 @@ def apply_live_data_to_mission(base_params, live_insights):
         "live_data_summary": {
             "active_satellites": live_insights["satellite_count"],
             "solar_flux_sfu": live_insights["solar_flux"],
+            "solar_flux_81d_sfu": live_insights.get("solar_flux_81d"),
             "kp_index": live_insights["kp_index"],
+            "kp_max_24h": live_insights.get("kp_max_24h"),
             "debris_risk": live_insights["debris_risk"],
             "crowded_altitudes_km": live_insights["crowded_altitudes"]
         }
@@ -361,11 +194,158 @@ def calculate_period(altitude_km):
     return round(period_seconds / 60, 1)  # Return in minutes
 
 
+def parse_revisit_hours(revisit):
+    """Convert a revisit label like "6 hours" or "2 days" to hours (None if continuous/unknown)"""
+    import re
+
+    match = re.search(r'(\d+(?:\.\d+)?)\s*(hour|hr|day)', str(revisit).lower())
+    if not match:
+        return None
+    value = float(match.group(1))
+    return value * 24 if match.group(2) == "day" else value
+
+
+# ===== MISSION PROFILES (rule-based fallback) =====
+MISSION_PROFILES = {
+    "agriculture": {
+        "name_prefix": "AgriWatch",
+        "altitude": 500,
+        "inclination": 98.2,
+        "orbit_type": "Sun-Synchronous Orbit (SSO)",
+        "satellites": 1,
+        "payload": "Multispectral Camera (RGB + NIR + Red Edge)",
+        "resolution": 3,
+        "swath": 50,
+        "revisit": "2 days",
+        "regions": ["Punjab", "Haryana", "Maharashtra", "Karnataka"],
+        "mission_desc": "Precision agriculture monitoring with crop health analysis"
+    },
+    "disaster": {
+        "name_prefix": "DisasterGuard",
+        "altitude": 800,
+        "inclination": 98,
+        "orbit_type": "Polar Orbit (SSO)",
+        "satellites": 12,
+        "payload": "SAR + Optical + Thermal Imaging",
+        "resolution": 5,
+        "swath": 100,
+        "revisit": "6 hours",
+        "regions": ["Global", "Asia-Pacific", "Americas", "Europe"],
+        "mission_desc": "Rapid disaster response with all-weather monitoring"
+    },
+    "marine": {
+        "name_prefix": "MarineWatch",
+        "altitude": 650,
+        "inclination": 98.2,
+        "orbit_type": "Sun-Synchronous Orbit (SSO)",
+        "satellites": 6,
+        "payload": "AIS Receiver + Multispectral Camera + SAR",
+        "resolution": 10,
+        "swath": 100,
+        "revisit": "12 hours",
+        "regions": ["Indian Ocean", "Pacific", "Atlantic"],
+        "mission_desc": "Illegal fishing detection with vessel tracking"
+    },
+    "forest": {
+        "name_prefix": "ForestGuard",
+        "altitude": 550,
+        "inclination": 97.8,
+        "orbit_type": "Sun-Synchronous Orbit (SSO)",
+        "satellites": 4,
+        "payload": "Thermal IR + Optical + Smoke Detector",
+        "resolution": 10,
+        "swath": 80,
+        "revisit": "4 hours",
+        "regions": ["Amazon", "California", "Australia", "Indonesia"],
+        "mission_desc": "Wildfire detection and forest monitoring"
+    },
+    "communication": {
+        "name_prefix": "CommSat",
+        "altitude": 35786,
+        "inclination": 0,
+        "orbit_type": "Geostationary Orbit (GEO)",
+        "satellites": 3,
+        "payload": "Ku-band Transponder (14/12 GHz)",
+        "resolution": None,
+        "swath": None,
+        "revisit": "Continuous",
+        "regions": ["Asia-Pacific", "Europe", "Americas"],
+        "mission_desc": "Broadband internet and telecommunication services"
+    },
+    "climate": {
+        "name_prefix": "ClimateWatch",
+        "altitude": 700,
+        "inclination": 98.5,
+        "orbit_type": "Sun-Synchronous Orbit (SSO)",
+        "satellites": 8,
+        "payload": "Hyperspectral Imager + CO2/CH4 Sensors",
+        "resolution": 50,
+        "swath": 200,
+        "revisit": "24 hours",
+        "regions": ["Global coverage"],
+        "mission_desc": "Greenhouse gas monitoring and climate change tracking"
+    }
+}
+
+DEFAULT_PROFILE = {
+    "name_prefix": "EarthObs",
+    "altitude": 550,
+    "inclination": 45,
+    "orbit_type": "Low Earth Orbit (LEO)",
+    "satellites": 6,
+    "payload": "Optical Camera",
+    "resolution": 10,
+    "swath": 75,
+    "revisit": "24 hours",
+    "regions": ["Global"],
+    "mission_desc": "General Earth observation mission"
+}
+
+
+def design_request(profile, altitude_specified=False, satellites_specified=False):
+    """Optimizer arguments sizing a profile's constellation, or None if it is not sized for revisit"""
+    revisit_hours = parse_revisit_hours(profile["revisit"])
+    if not (revisit_hours and profile["swath"] and profile["altitude"] < 2000):
+        return None
+    altitude = profile["altitude"]
+    region_lats = [region_bounds(region)[1][2:] for region in profile["regions"]]
+    return dict(
+        revisit_hours=revisit_hours,
+        lat_range=(min(lo for lo, _ in region_lats), max(hi for _, hi in region_lats)),
+        altitudes=(altitude,) if altitude_specified else (altitude - 50, altitude, altitude + 50),
+        inclination_deg=None if "SSO" in profile["orbit_type"] else profile["inclination"],
+        swath_km=profile["swath"],
+        fixed_total=profile["satellites"] if satellites_specified else None,
+    )
+
+
+def warm_profile_designs():
+    """Search the built-in profiles' designs without a budget, so fallback requests find them cached"""
+    for name, profile in [*MISSION_PROFILES.items(), ("general", DEFAULT_PROFILE)]:
+        request = design_request(profile)
+        if request is None:
+            continue
+        try:
+            optimize_constellation(**request, budget_s=None)
+        except Exception as e:
+            print(f"⚠️ Design warm-up stopped at {name}: {e}")
+            return
+    print("🧮 Mission profile designs precomputed")
+
+
+def start_design_warmup():
+    """Precompute profile designs in the background so startup is not delayed"""
+    threading.Thread(target=warm_profile_designs, name="design-warmup", daemon=True).start()
+
+
 # ===== ENHANCED FALLBACK =====
 
-def parse_mission_fallback(user_input):
+def parse_mission_fallback(user_input, degraded=False):
     """
     ENHANCED fallback with detailed mission type detection
+
+    Degraded requests (shed by admission control) only use precomputed
+    constellation designs and otherwise keep the profile's default Walker.
     """
     import re
 
@@ -373,88 +353,6 @@ def parse_mission_fallback(user_input):
 
     print(f"🔍 Analyzing query: {text[:100]}")
 
-    # ===== MISSION TYPE DETECTION =====
-    mission_profiles = {
-        "agriculture": {
-            "name_prefix": "AgriWatch",
-            "altitude": 500,
-            "inclination": 98.2,
-            "orbit_type": "Sun-Synchronous Orbit (SSO)",
-            "satellites": 1,
-            "payload": "Multispectral Camera (RGB + NIR + Red Edge)",
-            "resolution": 3,
-            "swath": 50,
-            "revisit": "2 days",
-            "regions": ["Punjab", "Haryana", "Maharashtra", "Karnataka"],
-            "mission_desc": "Precision agriculture monitoring with crop health analysis"
-        },
-        "disaster": {
-            "name_prefix": "DisasterGuard",
-            "altitude": 800,
-            "inclination": 98,
-            "orbit_type": "Polar Orbit (SSO)",
-            "satellites": 12,
-            "payload": "SAR + Optical + Thermal Imaging",
-            "resolution": 5,
-            "swath": 100,
-            "revisit": "6 hours",
-            "regions": ["Global", "Asia-Pacific", "Americas", "Europe"],
-            "mission_desc": "Rapid disaster response with all-weather monitoring"
-        },
-        "marine": {
-            "name_prefix": "MarineWatch",
-            "altitude": 650,
-            "inclination": 98.2,
-            "orbit_type": "Sun-Synchronous Orbit (SSO)",
-            "satellites": 6,
-            "payload": "AIS Receiver + Multispectral Camera + SAR",
-            "resolution": 10,
-            "swath": 100,
-            "revisit": "12 hours",
-            "regions": ["Indian Ocean", "Pacific", "Atlantic"],
-            "mission_desc": "Illegal fishing detection with vessel tracking"
-        },
-        "forest": {
-            "name_prefix": "ForestGuard",
-            "altitude": 550,
-            "inclination": 97.8,
-            "orbit_type": "Sun-Synchronous Orbit (SSO)",
-            "satellites": 4,
-            "payload": "Thermal IR + Optical + Smoke Detector",
-            "resolution": 10,
-            "swath": 80,
-            "revisit": "4 hours",
-            "regions": ["Amazon", "California", "Australia", "Indonesia"],
-            "mission_desc": "Wildfire detection and forest monitoring"
-        },
-        "communication": {
-            "name_prefix": "CommSat",
-            "altitude": 35786,
-            "inclination": 0,
-            "orbit_type": "Geostationary Orbit (GEO)",
-            "satellites": 3,
-            "payload": "Ku-band Transponder (14/12 GHz)",
-            "resolution": None,
-            "swath": None,
-            "revisit": "Continuous",
-            "regions": ["Asia-Pacific", "Europe", "Americas"],
-            "mission_desc": "Broadband internet and telecommunication services"
-        },
-        "climate": {
-            "name_prefix": "ClimateWatch",
-            "altitude": 700,
-            "inclination": 98.5,
-            "orbit_type": "Sun-Synchronous Orbit (SSO)",
-            "satellites": 8,
-            "payload": "Hyperspectral Imager + CO2/CH4 Sensors",
-            "resolution": 50,
-            "swath": 200,
-            "revisit": "24 hours",
-            "regions": ["Global coverage"],
-            "mission_desc": "Greenhouse gas monitoring and climate change tracking"
-        }
-    }
-
     # Detect mission type from keywords
     detected_type = "general"
 
@@ -475,38 +373,27 @@ def parse_mission_fallback(user_input):
 
     print(f"🎯 Detected mission type: {detected_type.upper()}")
 
-    # Get profile or use default
-    if detected_type in mission_profiles:
-        profile = mission_profiles[detected_type]
-    else:
-        profile = {
-            "name_prefix": "EarthObs",
-            "altitude": 550,
-            "inclination": 45,
-            "orbit_type": "Low Earth Orbit (LEO)",
-            "satellites": 6,
-            "payload": "Optical Camera",
-            "resolution": 10,
-            "swath": 75,
-            "revisit": "24 hours",
-            "regions": ["Global"],
-            "mission_desc": "General Earth observation mission"
-        }
+    # Get profile or use default (copied: the overrides below edit it)
+    profile = dict(MISSION_PROFILES.get(detected_type, DEFAULT_PROFILE))
 
     # Extract numbers from query
     numbers = re.findall(r'\d+', text)
 
     # Override satellites if specified
+    satellites_specified = False
     if "constellation" in text and numbers:
         try:
             profile["satellites"] = int(numbers[0])
+            satellites_specified = True
         except:
             pass
 
     # Override altitude if specified
+    altitude_specified = False
     for match in re.finditer(r'(\d+)\s*km', text):
         try:
             profile["altitude"] = int(match.group(1))
+            altitude_specified = True
         except:
             pass
 
@@ -519,6 +406,71 @@ def parse_mission_fallback(user_input):
 
     satellites = profile["satellites"]
     altitude = profile["altitude"]
+    inclination = profile["inclination"]
+    planes = max(1, satellites // 3)
+    phasing = 1 if satellites > 1 else 0
+
+    # Size the constellation for the requested revisit
+    revisit_hours = parse_revisit_hours(profile["revisit"])
+    request = design_request(profile, altitude_specified, satellites_specified)
+    # How the constellation was chosen: "profile" (not sized for revisit),
+    # "optimized", "not_minimal" (budget ran out), "not_optimized" or "infeasible"
+    design_status, design_note = "profile", None
+    if request is not None:
+        try:
+            design = optimize_constellation(**request, budget_s=0.0 if degraded else SEARCH_BUDGET_S)
+        except SearchBudgetExceeded:
+            design = None
+            design_status = "not_optimized"
+            design_note = (
+                f"Not optimized for {profile['revisit']} revisit (search budget exceeded); "
+                "showing the profile's default constellation"
+            )
+            print("⏱️ No constellation design within the search budget, keeping the profile's")
+        if design is None and design_status == "profile":
+            design_status = "infeasible"
+            design_note = (
+                f"No Walker constellation up to {MAX_SATELLITES} satellites meets {profile['revisit']} revisit "
+                "over these regions; the profile's default constellation shown misses that target"
+            )
+            print(f"⚠️ {design_note}")
+        if design:
+            design_status = "optimized" if design["minimal"] else "not_minimal"
+            if not design["minimal"]:
+                design_note = "Meets the revisit target; a smaller constellation may exist (search budget exceeded)"
+            satellites = design["satellites"]
+            planes = design["planes"]
+            phasing = design["phasing"]
+            altitude = design["altitude_km"]
+            inclination = design["inclination_deg"]
+            print(f"🧮 Optimized constellation: {design['configuration']} at {altitude}km")
+
+    # Simulate coverage over the profile's regions (at least a day, two revisit periods)
+    coverage = simulate_coverage(
+        altitude_km=altitude,
+        inclination_deg=inclination,
+        satellites=satellites,
+        planes=planes,
+        phasing=phasing,
+        swath_km=profile["swath"],
+        regions=profile["regions"],
+        duration_hours=max(24.0, 2 * (revisit_hours or 0.0)),
+    )
+    coverage_summary = summarize_coverage(coverage)
+
+    # Size the ground segment from predicted station passes
+    daily_volume_gb = satellites * 100 if profile["resolution"] else 50
+    downlink_mbps = 150
+    passes = predict_passes(
+        altitude_km=altitude,
+        inclination_deg=inclination,
+        satellites=satellites,
+        planes=planes,
+        phasing=phasing,
+        downlink_mbps=downlink_mbps,
+    )
+    ground_stations = select_stations(passes, daily_volume_gb)
+    pass_summary = summarize_passes(passes, ground_stations)
 
     # Generate mission name with random suffix
     mission_name = f"{profile['name_prefix']}-{random.randint(1, 99)}"
@@ -532,15 +484,22 @@ def parse_mission_fallback(user_input):
         "orbit": {
             "type": profile["orbit_type"],
             "altitude_km": altitude,
-            "inclination_deg": profile["inclination"],
+            "inclination_deg": inclination,
             "period_min": calculate_period(altitude)
         },
         "constellation": {
             "satellites": satellites,
-            "planes": max(1, satellites // 3),
-            "configuration": f"Walker {satellites}/{max(1, satellites // 3)}/1" if satellites > 1 else "Single satellite",
-            "coverage_percent": min(98, 70 + satellites * 3),
-            "revisit_time": profile["revisit"]
+            "planes": coverage["planes"],
+            "configuration": coverage["configuration"] if satellites > 1 else "Single satellite",
+            "coverage_percent": coverage_summary["coverage_percent"],
+            "mean_revisit_hours": coverage_summary["mean_revisit_hours"],
+            "max_revisit_hours": coverage_summary["max_revisit_hours"],
+            "coverage_by_region": {
+                name: stats["coverage_percent"] for name, stats in coverage["regions"].items()
+            },
+            "revisit_time": profile["revisit"],
+            "design_status": design_status,
+            "design_note": design_note
         },
         "payload": {
             "type": profile["payload"],
@@ -550,16 +509,20 @@ def parse_mission_fallback(user_input):
             "power_w": 50 if satellites == 1 else 150
         },
         "data": {
-            "daily_volume_gb": satellites * 100 if profile["resolution"] else 50,
-            "downlink_mbps": 150,
+            "daily_volume_gb": daily_volume_gb,
+            "downlink_mbps": downlink_mbps,
             "compression": "JPEG2000" if profile["resolution"] else "N/A",
             "storage_per_sat_gb": 500
         },
         "ground": {
-            "stations": min(6, max(2, len(profile["regions"]))),
+            "stations": len(ground_stations),
             "locations": profile["regions"],
-            "passes_per_day": 12 if altitude < 1000 else 3,
-            "contact_duration_min": 8
+            "station_names": ground_stations,
+            # Geostationary satellites hold one continuous contact
+            "passes_per_day": max(1, round(pass_summary["passes_per_day"])) if ground_stations else 0,
+            "contact_duration_min": pass_summary["avg_pass_duration_min"],
+            "contact_minutes_per_day": pass_summary["contact_minutes_per_day"],
+            "downlink_capacity_gb": pass_summary["capacity_GB_per_day"]
         },
         "launch": {
             "vehicle": "Falcon 9" if satellites > 8 else "PSLV" if altitude < 1000 else "Ariane 5",
@@ -581,6 +544,7 @@ def parse_mission_fallback(user_input):
 
 def call_gemini_with_retry(prompt, max_retries=3):
     """Call Gemini with exponential backoff and proper error handling"""
+    client = get_gemini_client()
     for attempt in range(max_retries):
         try:
             print(f"🤖 Gemini attempt {attempt + 1}/{max_retries}...")
@@ -624,27 +588,43 @@ def call_gemini_with_retry(prompt, max_retries=3):
     raise Exception("Failed after all retries")
 
 
+async def cached_gemini(prompt):
+    """Gemini response shared by all workers; concurrent identical prompts make one call"""
+    key = f"llm:{GEMINI_MODEL}:" + hashlib.sha256(prompt.encode()).hexdigest()
+    ttl_s = get_shared_state_settings().llm_cache_ttl_s
+    return await get_shared_state().get_or_compute(key, lambda: call_gemini_with_retry(prompt), ttl_s)
+
+
 # ===== MAIN API ENDPOINT =====
 
-@app.post("/api/generate-mission")
-async def generate_mission(request: MissionRequest):
-    try:
-        print(f"\n{'='*60}")
-        print(f"🚀 Mission request: {request.userInput[:100]}...")
-        print(f"{'='*60}\n")
+async def auto_persist(request: MissionRequest, mission_data: dict) -> dict:
+    """Hand the mission to the write-behind queue when auto-persist is on"""
+    enabled = request.persist if request.persist is not None else get_database_settings().auto_persist_missions
+    if enabled:
+        mission_data["mission_id"] = await persist_mission(request.userInput, mission_data, request.userId)
+    return mission_data
+
 
-        # ===== STEP 1: Fetch REAL Live Data =====
-        live_insights = fetch_and_analyze_live_data()
+@router.post("/api/generate-mission")
+async def generate_mission(request: MissionRequest, http_request: Request):
+    admission = get_admission_controller()
+    async with admission.admit(client_keys(http_request, request.userId)) as ticket:
+        return await run_mission_generation(request, degraded=ticket.degraded)
 
-        # ===== STEP 2: Try Gemini AI =====
-        prompt = f"""
+
+# ===== MISSION PIPELINE STAGES =====
+
+def build_mission_prompt(user_input, live_insights):
+    """Gemini prompt with the live-data context"""
+    return f"""
 You are an expert space mission architect with access to live orbital data.
 
-MISSION REQUEST: {request.userInput}
+MISSION REQUEST: {user_input}
 
 LIVE DATA CONTEXT (USE THIS IN YOUR ANALYSIS):
 - Active Satellites: {live_insights['satellite_count']} tracked
-- Solar Flux: {live_insights['solar_flux']} SFU ({live_insights['solar_activity_level']} activity)
+- Solar Flux: {live_insights['solar_flux']} SFU, 81-day mean {live_insights.get('solar_flux_81d', 'n/a')} SFU ({live_insights['solar_activity_level']} activity)
+- Geomagnetic Activity: max Kp {live_insights.get('kp_max_24h', 'n/a')} over 24h
 - Debris Risk: {live_insights['debris_risk']}
 - Crowded Altitudes: {live_insights['crowded_altitudes']} km
 - Recommended Altitude Adjustment: {live_insights['recommended_altitude_adjustment']:+d} km
@@ -705,97 +685,157 @@ Analyze this mission and return ONLY valid JSON (no markdown, no explanations) w
 IMPORTANT: Adjust altitude based on the live data context above. Avoid crowded altitudes.
 """
 
-        mission_data = None
-        gemini_used = False
 
-        try:
-            ai_response = call_gemini_with_retry(prompt)
-
-            # Clean markdown
-            if ai_response and isinstance(ai_response, str):
-                ai_response = ai_response.replace("```json", "").replace("```", "").strip()
-                start = ai_response.find('{')
-                end = ai_response.rfind('}')
-                if start != -1 and end != -1:
-                    ai_response = ai_response[start:end+1]
-
-            # Parse JSON
-            mission_data = json.loads(ai_response)
-            gemini_used = True
-            print("✅ Gemini analysis successful")
-
-        except Exception as gemini_error:
-            print(f"⚠️ Gemini failed: {gemini_error}")
-            print("🔄 Using intelligent fallback...")
-            mission_data = parse_mission_fallback(request.userInput)
-
-        # ===== STEP 3: Apply REAL Live Data to Mission =====
-        print("\n📊 Applying live data to mission parameters...")
-
-        if mission_data and "orbit" in mission_data:
-            live_params = apply_live_data_to_mission(
-                mission_data["orbit"],
-                live_insights
-            )
+def mode_stage(context):
+    """Skip Gemini when admission control shed the request or live data is stale"""
+    if context["degraded"] or get_admission_controller().is_stale(live_data_age_s(context["live"])):
+        print("🛑 Under load or live data stale: using rule-based analysis")
+        return "degraded"
+    return "llm"
 
-            # Update mission with live data
-            mission_data["orbit"]["altitude_km"] = live_params["adjusted_altitude_km"]
-            mission_data["orbit"]["altitude_reasoning"] = live_params["altitude_reasoning"]
-            mission_data["orbit"]["period_min"] = calculate_period(live_params["adjusted_altitude_km"])
 
-            mission_data["mission_lifetime"] = {
-                "expected_years": live_params["expected_lifetime_years"],
-                "reasoning": live_params["lifetime_reasoning"]
-            }
+async def llm_stage(context):
+    """Gemini analysis as a dict, or None when skipped or failed"""
+    if context["mode"] != "llm":
+        return None
 
-            mission_data["collision_avoidance"] = {
-                "fuel_budget_kg": live_params["collision_avoidance_fuel_kg"],
-                "reasoning": live_params["collision_reasoning"]
-            }
+    try:
+        ai_response = await cached_gemini(build_mission_prompt(context["request"].userInput, context["live"]))
+
+        # Clean markdown
+        if ai_response and isinstance(ai_response, str):
+            ai_response = ai_response.replace("```json", "").replace("```", "").strip()
+            start = ai_response.find('{')
+            end = ai_response.rfind('}')
+            if start != -1 and end != -1:
+                ai_response = ai_response[start:end+1]
+
+        # Parse JSON
+        mission_data = json.loads(ai_response)
+        print("✅ Gemini analysis successful")
+        return mission_data
 
-            mission_data["live_data_summary"] = live_params["live_data_summary"]
+    except Exception as gemini_error:
+        print(f"⚠️ Gemini failed: {gemini_error}")
+        return None
 
-        # Add live data sources
-        mission_data["live_data_sources"] = live_insights["sources_status"]
-        mission_data["live_data_timestamp"] = live_insights["timestamp"]
 
-        # Add data source badge
-        mission_data["live_data_sources"].insert(0, {
-            "name": "Gemini 2.5 Flash" if gemini_used else "Smart Parser",
-            "status": "Live" if gemini_used else "Fallback",
-            "note": "AI Mission Analysis" if gemini_used else "Rule-based analysis"
-        })
+def fallback_stage(context):
+    """Rule-based analysis started right away when the request is already degraded"""
+    return parse_mission_fallback(context["request"].userInput, degraded=True) if context["degraded"] else None
+
+
+def analysis_stage(context):
+    """Gemini's mission when available, otherwise the rule-based one"""
+    if context["llm"] is not None:
+        return context["llm"]
+    if context["fallback"] is not None:
+        return context["fallback"]
+    print("🔄 Using intelligent fallback...")
+    return parse_mission_fallback(context["request"].userInput)
+
+
+def post_adjust_stage(context):
+    """Apply live data to the mission and attach the data sources"""
+    mission_data = context["analysis"]
+    live_insights = context["live"]
+    gemini_used = context["llm"] is not None
+    degraded = context["mode"] == "degraded"
+
+    # ===== STEP 3: Apply REAL Live Data to Mission =====
+    print("\n📊 Applying live data to mission parameters...")
+
+    if mission_data and "orbit" in mission_data:
+        live_params = apply_live_data_to_mission(
+            mission_data["orbit"],
+            live_insights
+        )
+
+        # Update mission with live data
+        mission_data["orbit"]["altitude_km"] = live_params["adjusted_altitude_km"]
+        mission_data["orbit"]["altitude_reasoning"] = live_params["altitude_reasoning"]
+        mission_data["orbit"]["period_min"] = calculate_period(live_params["adjusted_altitude_km"])
+
+        mission_data["mission_lifetime"] = {
+            "expected_years": live_params["expected_lifetime_years"],
+            "reasoning": live_params["lifetime_reasoning"]
+        }
+
+        mission_data["collision_avoidance"] = {
+            "fuel_budget_kg": live_params["collision_avoidance_fuel_kg"],
+            "reasoning": live_params["collision_reasoning"]
+        }
+
+        mission_data["live_data_summary"] = live_params["live_data_summary"]
+
+    # Add live data sources
+    mission_data["live_data_sources"] = live_insights["sources_status"]
+    mission_data["live_data_timestamp"] = live_insights["timestamp"]
+
+    # Add data source badge
+    mission_data["live_data_sources"].insert(0, {
+        "name": "Gemini 2.5 Flash" if gemini_used else "Smart Parser",
+        "status": "Live" if gemini_used else "Fallback",
+        "note": "AI Mission Analysis" if gemini_used else "Rule-based analysis (degraded mode)" if degraded else "Rule-based analysis"
+    })
+
+    return mission_data
+
+
+MISSION_PIPELINE = Pipeline(
+    [
+        LIVE_STAGE,
+        Stage("mode", mode_stage, deps=["live"]),
+        Stage("llm", llm_stage, deps=["live", "mode"], timeout_s=60.0, optional=True),
+        Stage("fallback", fallback_stage, timeout_s=60.0),
+        Stage("analysis", analysis_stage, deps=["llm", "fallback"], timeout_s=60.0),
+        Stage("mission", post_adjust_stage, deps=["analysis", "live", "mode"]),
+    ],
+    inputs=["request", "degraded"],
+)
+
+
+async def run_mission_generation(request: MissionRequest, degraded: bool = False):
+    """Generate a mission; degraded requests skip Gemini and use the rule-based parser"""
+    try:
+        print(f"\n{'='*60}")
+        print(f"🚀 Mission request: {request.userInput[:100]}...")
+        print(f"{'='*60}\n")
+
+        result = await MISSION_PIPELINE.run(request=request, degraded=degraded)
+        mission_data = result["mission"]
 
         print(f"\n{'='*60}")
         print(f"✅ Mission generated: {mission_data.get('mission_name', 'Unknown')}")
         print(f"✅ Altitude: {mission_data['orbit']['altitude_km']} km (adjusted from live data)")
         print(f"✅ Lifetime: {mission_data.get('mission_lifetime', {}).get('expected_years', 'N/A')} years")
+        print(f"⏱️ Pipeline: {result.describe()}")
         print(f"{'='*60}\n")
 
-        return mission_data
-
-    except json.JSONDecodeError as e:
-        print(f"❌ JSON Parse Error: {e}")
-        mission_data = parse_mission_fallback(request.userInput)
-        mission_data["live_data_sources"] = [
-            {"name": "Fallback Parser", "status": "Active", "note": "JSON parse failed"}
-        ]
-        return mission_data
+        return ORJSONResponse(await auto_persist(request, mission_data))
 
+    # Gemini and JSON failures never reach here: llm_stage returns None and
+    # analysis_stage falls back to the rule-based parser
     except Exception as e:
         print(f"❌ Critical Error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Mission generation failed: {str(e)}")
 
 
-@app.get("/health")
+@router.get("/health")
 async def health():
-    live_insights = fetch_and_analyze_live_data()
+    live_insights = await get_live_insights()
     mongodb_health = await check_mongodb_health()
     
     return {
         "status": "live",
-        "gemini": "connected" if GEMINI_API_KEY != "YOUR_ACTUAL_KEY_HERE" else "no API key",
+        "gemini": "connected" if GEMINI_API_KEY and GEMINI_API_KEY != "YOUR_ACTUAL_KEY_HERE" else "no API key",
         "mongodb": mongodb_health["status"],
+        "mission_write_behind": mission_queue.stats(),
+        "compression_cache": body_cache.stats(),
+        "shared_state": get_shared_state().stats(),
+        "admission": get_admission_controller().stats(),
+        "catalog": catalog_store.stats(),
+        "space_weather": space_weather.stats(),
         "celestrak": live_insights["sources_status"][0]["status"] if live_insights["sources_status"] else "unknown",
         "active_satellites": live_insights["satellite_count"],
         "solar_flux": live_insights["solar_flux"],
@@ -804,11 +844,50 @@ async def health():
     }
 
 
-@app.get("/")
+@router.get("/")
 async def root():
     return {"message": "🚀 Mission Copilot - AI + REAL Live Data", "version": "2.0 - Live Data Integrated"}
 
 
-@app.get("/test-models")
+@router.get("/test-models")
 async def test_models():
-    return {"active_model": "gemini-2.5-flash", "status": "available"}
\ No newline at end of file
+    return {"active_model": "gemini-2.5-flash", "status": "available"}
+
+
+def create_app() -> FastAPI:
+    """Build the application: middleware, routers and database lifecycle"""
+    app = FastAPI(title="Mission Copilot - Live AI with Real Data", default_response_class=ORJSONResponse)
+    app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
+    # Compression levels per route as (gzip level, brotli quality): cached chat and
+    # mission reads are compressed once so they can afford more effort, streamed
+    # exports and frequently refreshed catalog queries stay cheap
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=1024,
+        route_levels={
+            "/api/chats": (6, 6),
+            "/api/missions": (6, 6),
+            "/api/chats/export": (1, 1),
+            "/api/missions/export": (1, 1),
+            "/api/catalog": (4, 4),
+        },
+        cache=body_cache,
+    )
+
+    # Register MongoDB routers
+    app.include_router(missions.router)
+    app.include_router(chats.router)
+
+    # Live catalog queries
+    app.include_router(catalog.router)
+
+    app.include_router(router)
+
+    app.add_event_handler("startup", startup_db_client)
+    app.add_event_handler("startup", get_lifetime_table)
+    app.add_event_handler("startup", start_design_warmup)
+    app.add_event_handler("shutdown", shutdown_db_client)
+    return app
+
+
+app = create_app()
@@ -0,0 +1,123 @@
+"""
+API Router for live catalog queries
+Answers "which objects are over region X now / in the next hour" from the spatial index
+"""
+
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+from datetime import datetime, timezone
+import time
+import numpy as np
+
+from app.calculators.coverage import REGION_BOUNDS, resolve_region
+from app.core.spatial_index import SpatialIndex, get_timeline
+
+router = APIRouter(prefix="/api/catalog", tags=["catalog"])
+
+
+def serialize_objects(timeline, snapshot: SpatialIndex, indices, seen_at=None, distances=None, limit: int = 100):
+    """Convert index hits to JSON-serializable dicts"""
+    catalog = timeline.catalog
+    objects = []
+    for n, i in enumerate(indices[:limit]):
+        obj = {
+            "norad_id": int(catalog.norad_id[i]),
+            "name": catalog.names[i],
+            "lat": round(float(snapshot.lat[i]), 3),
+            "lon": round(float(snapshot.lon[i]), 3),
+            "alt_km": round(float(snapshot.alt[i]), 1),
+        }
+        if seen_at is not None:
+            obj["first_seen"] = _iso(seen_at[n])
+        if distances is not None:
+            obj["distance_km"] = round(float(distances[n]), 1)
+        objects.append(obj)
+
+    return {
+        "count": int(len(indices)),
+        "snapshot": _iso(snapshot.epoch_s),
+        "catalog_size": len(catalog),
+        "objects": objects,
+    }
+
+
+def _iso(epoch_s: float) -> str:
+    return datetime.fromtimestamp(float(epoch_s), tz=timezone.utc).isoformat()
+
+
+def _query_window(query, within_minutes: int, limit: int):
+    timeline = get_timeline()
+    if not len(timeline.catalog):
+        raise HTTPException(status_code=503, detail="Satellite catalog is not available")
+
+    now = time.time()
+    snapshot = timeline.at(now)
+    if within_minutes <= 0:
+        return serialize_objects(timeline, snapshot, query(snapshot), limit=limit)
+
+    indices, seen_at = timeline.first_seen(now, now + within_minutes * 60, query)
+    order = np.argsort(seen_at, kind="stable")
+    return serialize_objects(timeline, snapshot, indices[order], seen_at=seen_at[order], limit=limit)
+
+
+@router.get("/region")
+def objects_over_region(
+    region: Optional[str] = None,
+    lon_min: Optional[float] = None,
+    lon_max: Optional[float] = None,
+    lat_min: Optional[float] = None,
+    lat_max: Optional[float] = None,
+    within_minutes: int = Query(0, ge=0, le=60),
+    limit: int = Query(100, ge=1, le=5000),
+):
+    """
+    Catalog objects whose ground track is inside a region
+
+    Args:
+        region: Named region (e.g. "India"), or pass an explicit bounding box
+        within_minutes: 0 for now, otherwise any time in the next N minutes
+        limit: Maximum number of objects to list
+
+    Returns:
+        Matching objects with their current sub-satellite point
+    """
+    if None not in (lon_min, lon_max, lat_min, lat_max):
+        bbox = (lon_min, lon_max, lat_min, lat_max)
+    elif region:
+        bbox = tuple(REGION_BOUNDS[resolve_region(region)])
+    else:
+        raise HTTPException(status_code=400, detail="Provide a region name or a full bounding box")
+
+    return _query_window(lambda snapshot: snapshot.query_region(*bbox), within_minutes, limit)
+
+
+@router.get("/nearby")
+def objects_nearby(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(500.0, gt=0),
+    within_minutes: int = Query(0, ge=0, le=60),
+    limit: int = Query(100, ge=1, le=5000),
+):
+    """
+    Catalog objects whose sub-satellite point is within radius_km of a location
+    """
+    return _query_window(lambda snapshot: snapshot.query_radius(lat, lon, radius_km), within_minutes, limit)
+
+
+@router.get("/nearest")
+def nearest_objects(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    k: int = Query(5, ge=1, le=100),
+):
+    """
+    The k catalog objects currently closest (over the ground) to a location
+    """
+    timeline = get_timeline()
+    if not len(timeline.catalog):
+        raise HTTPException(status_code=503, detail="Satellite catalog is not available")
+
+    snapshot = timeline.at()
+    indices, distances = snapshot.nearest(lat, lon, k)
+    return serialize_objects(timeline, snapshot, indices, distances=distances, limit=k)
@@ -1,42 +1,98 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 from app.schemas.mission import ChatRequest, MissionConceptResponse, LiveDataSource
 from app.calculators.estimators import (
     estimate_orbit, estimate_constellation, estimate_data, estimate_ground
 )
-from app.core.llm_orchestrator import extract_mission_params
-from app.core.data_orchestrator import fetch_celestrak_tle, calculate_coverage  # ← NEW
+from app.calculators.constellation_optimizer import SEARCH_BUDGET_S
+from app.core.llm_orchestrator import extract_mission_params, DEFAULT_PARAMS
+from app.core.data_orchestrator import calculate_coverage  # ← NEW
+from app.core.catalog import Catalog, get_catalog
+from app.core.live_data import LIVE_STAGE
+from app.core.pipeline import Pipeline, Stage
+from app.services.admission import get_admission_controller, client_keys
 
 router = APIRouter()
 
+
+def params_stage(context):
+    # LLM extracts parameters (defaults when shedding load)
+    if context["degraded"]:
+        return dict(DEFAULT_PARAMS)
+    return extract_mission_params(context["message"])
+
+
+def satellites_stage(context):
+    # Shared GP catalog, merged from Celestrak only when stale
+    return get_catalog()
+
+
+def constellation_stage(context):
+    params = context["params"]
+    region = params.get("region") or "global"
+    # Shed requests only use designs already searched
+    budget_s = 0.0 if context["degraded"] else SEARCH_BUDGET_S
+    return estimate_constellation(context["orbit"], float(params.get("revisit_hours") or 24.0), region, budget_s=budget_s)
+
+
+def coverage_stage(context):
+    return calculate_coverage(context["orbit"], context["constellation"], context["params"].get("region") or "global")
+
+
+# Live data and the LLM run alongside each other; ground and coverage both
+# wait only for the constellation
+CHAT_PIPELINE = Pipeline(
+    [
+        Stage("params", params_stage, timeout_s=30.0, optional=True, default=lambda: dict(DEFAULT_PARAMS)),
+        Stage("satellites", satellites_stage, timeout_s=15.0, optional=True, default=Catalog.empty),
+        LIVE_STAGE,
+        Stage("orbit", lambda context: estimate_orbit(context["params"]["mission_type"]), deps=["params"]),
+        Stage("constellation", constellation_stage, deps=["orbit", "params"], timeout_s=60.0),
+        Stage("data", lambda context: estimate_data()),
+        Stage("ground", lambda context: estimate_ground(context["orbit"], context["constellation"], context["data"].daily_volume_GB),
+              deps=["orbit", "constellation", "data"], timeout_s=30.0),
+        Stage("coverage", coverage_stage, deps=["orbit", "constellation", "params"], timeout_s=60.0),
+    ],
+    inputs=["message", "degraded"],
+)
+
+
 @router.post("/chat", response_model=MissionConceptResponse)
-async def chat_endpoint(request: ChatRequest) -> MissionConceptResponse:
-    # 1. LLM extracts parameters
-    params = extract_mission_params(request.message)
+async def chat_endpoint(request: ChatRequest, http_request: Request) -> MissionConceptResponse:
+    async with get_admission_controller().admit(client_keys(http_request)) as ticket:
+        result = await CHAT_PIPELINE.run(message=request.message, degraded=ticket.degraded)
     
-    # 2. Your existing estimators
-    orbit = estimate_orbit(params["mission_type"])
-    constellation = estimate_constellation(orbit.period_minutes)
-    data_info = estimate_data()
-    ground = estimate_ground(data_info.daily_volume_GB)
-    
-    # 3. NEW: Live satellite data
-    satellites = await fetch_celestrak_tle("active")
-    coverage = calculate_coverage(satellites, params.get("region", "global"))
+    params, satellites, coverage, live = result["params"], result["satellites"], result["coverage"], result["live"]
+    print(f"⏱️ Chat pipeline: {result.describe()}")
     
     summary = (
         f"Analyzed: {params['mission_type']} mission at {params['revisit_hours']}h revisit. "
-        f"Coverage: {coverage['percentage']:.1f}% from {len(satellites)} live satellites."
+        f"Coverage: {coverage['percentage']:.1f}% of {coverage['region']} "
+        f"(mean revisit {coverage['mean_revisit_hours']}h), {len(satellites)} live satellites tracked."
     )
     
+    if ticket.degraded:
+        extractor = LiveDataSource(name="gemini_extractor", status="skipped", note="Defaults used, service under load")
+    elif "params" in result.errors:
+        extractor = LiveDataSource(name="gemini_extractor", status="fallback", note=f"Defaults used ({result.errors['params']})")
+    else:
+        extractor = LiveDataSource(name="gemini_extractor", status="success", note=f"Parsed: {params}")
+    
+    if "satellites" in result.errors:
+        celestrak = LiveDataSource(name="celestrak_tle", status="offline", note=f"No satellites ({result.errors['satellites']})")
+    else:
+        celestrak = LiveDataSource(name="celestrak_tle", status="success", note=f"{len(satellites)} satellites")
+    
     return MissionConceptResponse(
         summary=summary,
-        orbit=orbit,
-        constellation=constellation,
-        data=data_info,
-        ground=ground,
+        orbit=result["orbit"],
+        constellation=result["constellation"],
+        data=result["data"],
+        ground=result["ground"],
         live_data_sources=[
-            LiveDataSource(name="gemini_extractor", status="success", note=f"Parsed: {params}"),
-            LiveDataSource(name="celestrak_tle", status="success", note=f"{len(satellites)} satellites"),
-            LiveDataSource(name="coverage_sim", status="success", note=f"{coverage['percentage']:.1f}% coverage"),
+            extractor,
+            celestrak,
+            LiveDataSource(name="live_snapshot", status="success" if live["satellite_count"] else "offline",
+                           note=f"{live['satellite_count']} active satellites, debris risk {live['debris_risk']}"),
+            LiveDataSource(name="coverage_sim", status="success", note=f"{coverage['configuration']}: {coverage['percentage']:.1f}% coverage"),
         ],
     )
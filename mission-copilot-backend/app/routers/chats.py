@@ -3,11 +3,20 @@ API Router for Chat CRUD operations
 Handles saving, retrieving, and deleting chats from MongoDB
 """
 
-from fastapi import APIRouter, HTTPException, Depends, Body
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Body, Request
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
 from app.services.database import get_database
+from app.services import chat_messages
+from app.services import pagination
+from app.services.cache import chat_cache
+from app.services import ndjson
+from app.core.responses import ORJSONResponse
+from app.schemas.chat import ChatSync
 
 router = APIRouter(prefix="/api/chats", tags=["chats"])
 
@@ -16,26 +25,78 @@ def serialize_chat(chat):
     """Convert MongoDB document to JSON-serializable dict"""
     if chat:
         chat["id"] = str(chat.pop("_id"))
+        chat.setdefault("version", 0)
         return chat
     return None
 
 
+def chat_filter(chat_id: str) -> dict:
+    """Match a chat by MongoDB _id or by chatId in a single query"""
+    if ObjectId.is_valid(chat_id):
+        return {"$or": [{"_id": ObjectId(chat_id)}, {"chatId": chat_id}]}
+    return {"chatId": chat_id}
+
+
+def version_filter(version: int) -> dict:
+    """Match a chat at the given version (chats saved before versioning are version 0)"""
+    if version == 0:
+        return {"$or": [{"version": 0}, {"version": {"$exists": False}}]}
+    return {"version": version}
+
+
+# Chat header fields returned by list responses (messages are paged separately)
+SUMMARY_PROJECTION = {
+    "chatId": 1,
+    "userId": 1,
+    "name": 1,
+    "createdAt": 1,
+    "updatedAt": 1,
+    # Chats saved before messageCount existed still embed their messages
+    "messageCount": {"$ifNull": ["$messageCount", {"$size": {"$ifNull": ["$messages", []]}}]},
+    "version": {"$ifNull": ["$version", 0]}
+}
+
+
+def version_conflict(current: int) -> HTTPException:
+    return HTTPException(
+        status_code=409,
+        detail={"message": "Chat was changed by another save; reload it and retry", "version": current}
+    )
+
+
+async def message_page(db, chat: dict, limit: int = chat_messages.DEFAULT_PAGE_SIZE, before: Optional[int] = None) -> dict:
+    """One page of a chat's messages, {"messages", "nextBefore"}; pops an embedded messages array"""
+    if "messageCount" not in chat:
+        # Chat saved before messages moved out of the chat document
+        messages = chat.pop("messages", [])
+        chat["messageCount"] = len(messages)
+        end = len(messages) if before is None else max(0, min(before, len(messages)))
+        start = max(0, end - max(1, min(limit, chat_messages.MAX_PAGE_SIZE)))
+        return {"messages": messages[start:end], "nextBefore": start if start > 0 else None}
+    return await chat_messages.fetch_page(db, chat["chatId"], limit, before)
+
+
 @router.post("", status_code=201)
 async def create_chat(
     chatId: str,
     name: str,
-    messages: List[dict] = [],
+    messages: List[dict] = Body([], embed=True),
     userId: str = "temp-user",
+    repair: bool = False,
     db = Depends(get_database)
 ):
     """
     Create or update a chat in MongoDB
     
+    Messages already stored are assumed unchanged, so only the ones past the
+    stored count are written; a repair save rewrites all of them.
+    
     Args:
         chatId: Unique chat identifier
         name: Chat name/title
-        messages: List of chat messages
+        messages: List of chat messages, sent as the body {"messages": [...]}
         userId: User ID (default: temp-user)
+        repair: Rewrite every message, e.g. after a conflicting delta save
     
     Returns:
         Created/updated chat with ID
@@ -47,47 +108,62 @@ async def create_chat(
         )
     
     try:
-        # Check if chat already exists
-        existing_chat = await db.chats.find_one({"chatId": chatId})
-        
-        if existing_chat:
-            # Update existing chat
-            result = await db.chats.update_one(
-                {"chatId": chatId},
-                {
-                    "$set": {
-                        "name": name,
-                        "messages": messages,
-                        "updatedAt": datetime.utcnow()
-                    }
+        # Messages go first and the version bump last, so a save that fails
+        # part-way never leaves a new version pointing at old messages
+        stored = await db.chats.find_one({"chatId": chatId}, {"messageCount": 1})
+        stored = stored.get("messageCount") if stored else 0
+        
+        # Write the messages past the stored count (all of them for a repair
+        # or a chat saved before messages moved out of the chat document)
+        # and drop the ones past the new end
+        first = 0 if repair or stored is None else min(stored, len(messages))
+        await chat_messages.write_messages(db, chatId, messages[first:], first_seq=first)
+        if stored is None or len(messages) < stored:
+            await chat_messages.truncate_messages(db, chatId, len(messages))
+        
+        # Upsert the header in one atomic round-trip (the pre-image gives id,
+        # owner and version)
+        now = datetime.utcnow()
+        new_id = ObjectId()
+        previous = await db.chats.find_one_and_update(
+            {"chatId": chatId},
+            {
+                "$set": {
+                    "name": name,
+                    "messageCount": len(messages),
+                    "updatedAt": now
+                },
+                "$inc": {"version": 1},
+                "$unset": {"messages": ""},
+                "$setOnInsert": {
+                    "_id": new_id,
+                    "userId": userId,
+                    "createdAt": now
                 }
-            )
-            
-            updated_chat = await db.chats.find_one({"chatId": chatId})
-            return serialize_chat(updated_chat)
-        else:
-            # Create new chat
-            chat_doc = {
-                "chatId": chatId,
-                "userId": userId,
-                "name": name,
-                "messages": messages,
-                "createdAt": datetime.utcnow(),
-                "updatedAt": datetime.utcnow()
-            }
-            
-            result = await db.chats.insert_one(chat_doc)
-            
-            chat_doc["id"] = str(result.inserted_id)
-            chat_doc.pop("_id", None)
-            
-            return chat_doc
+            },
+            upsert=True,
+            return_document=ReturnDocument.BEFORE
+        )
+        version = (previous.get("version", 0) if previous else 0) + 1
+        await chat_cache.publish(chatId, version=version)
+        
+        return {
+            "id": str(previous["_id"]) if previous else str(new_id),
+            "chatId": chatId,
+            "userId": previous.get("userId", userId) if previous else userId,
+            "name": name,
+            "messages": messages,
+            "messageCount": len(messages),
+            "version": version,
+            "createdAt": previous.get("createdAt", now) if previous else now,
+            "updatedAt": now
+        }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create/update chat: {str(e)}")
 
 
-@router.get("", response_model=List[dict])
+@router.get("")
 async def get_all_chats(
     userId: str = "temp-user",
     limit: int = 50,
@@ -101,7 +177,7 @@ async def get_all_chats(
         limit: Maximum number of chats to return (default: 50)
     
     Returns:
-        List of chats
+        List of chat headers with messageCount (messages via GET /{chat_id}/messages)
     """
     if db is None:
         raise HTTPException(
@@ -110,15 +186,176 @@ async def get_all_chats(
         )
     
     try:
-        cursor = db.chats.find({"userId": userId}).sort("updatedAt", -1).limit(limit)
+        cursor = db.chats.find({"userId": userId}, SUMMARY_PROJECTION).sort("updatedAt", -1).limit(limit)
         chats = await cursor.to_list(length=limit)
         
-        return [serialize_chat(chat) for chat in chats]
+        return ORJSONResponse([serialize_chat(chat) for chat in chats])
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch chats: {str(e)}")
 
 
+@router.get("/summary")
+async def get_chat_summaries(
+    userId: str = "temp-user",
+    limit: int = pagination.DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    db = Depends(get_database)
+):
+    """
+    List chat summaries for a user, most recently updated first
+    
+    Args:
+        userId: User ID to filter chats
+        limit: Chats per page (max 100)
+        cursor: nextCursor from the previous page
+    
+    Returns:
+        {"items": [{id, chatId, name, createdAt, updatedAt, messageCount}], "nextCursor"}
+    """
+    if db is None:
+        raise HTTPException(
+            status_code=503,
+            detail="MongoDB is not connected. Please configure MONGODB_URI in .env file."
+        )
+    
+    try:
+        chats, next_cursor = await pagination.fetch_page(
+            db.chats,
+            {"userId": userId},
+            "updatedAt",
+            SUMMARY_PROJECTION,
+            cursor,
+            limit
+        )
+        
+        return ORJSONResponse({"items": [serialize_chat(chat) for chat in chats], "nextCursor": next_cursor})
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch chats: {str(e)}")
+
+
+@router.get("/export")
+async def export_chats(
+    userId: str = "temp-user",
+    db = Depends(get_database)
+):
+    """
+    Stream every chat of a user as NDJSON
+    
+    Each chat is one {"type": "chat"} line followed by one {"type": "message"}
+    line per message, so memory stays constant however long the chats are.
+    
+    Args:
+        userId: User whose chats to export
+    """
+    if db is None:
+        raise HTTPException(
+            status_code=503,
+            detail="MongoDB is not connected. Please configure MONGODB_URI in .env file."
+        )
+    
+    async def messages_of(chat, legacy):
+        if legacy is not None and "messageCount" not in chat:
+            # Chat saved before messages moved out of the chat document
+            for seq, message in enumerate(legacy):
+                yield {"seq": seq, "message": message}
+            return
+        cursor = db[chat_messages.COLLECTION].find(
+            {"chatId": chat["chatId"]}, {"_id": 0, "seq": 1, "message": 1}
+        ).sort("seq", 1).batch_size(ndjson.EXPORT_BATCH_SIZE)
+        async for doc in cursor:
+            await chat_messages.unpack_messages(db, [doc["message"]])
+            yield doc
+    
+    async def lines():
+        cursor = db.chats.find({"userId": userId}).sort("_id", 1).batch_size(ndjson.EXPORT_BATCH_SIZE)
+        async for chat in cursor:
+            legacy = chat.pop("messages", None)
+            yield ndjson.encode({"type": "chat", **chat, "messageCount": chat.get("messageCount", len(legacy or []))})
+            async for doc in messages_of(chat, legacy):
+                yield ndjson.encode({"type": "message", "chatId": chat["chatId"], **doc})
+    
+    return StreamingResponse(
+        lines(),
+        media_type=ndjson.MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="chats-{userId}.ndjson"'}
+    )
+
+
+@router.post("/import")
+async def import_chats(
+    request: Request,
+    userId: Optional[str] = None,
+    db = Depends(get_database)
+):
+    """
+    Import chats from a streamed NDJSON upload (the export format)
+    
+    Chats are upserted by chatId and messages by (chatId, seq) in batched
+    unordered bulk writes, so re-importing the same file is harmless. Chat
+    lines with an embedded messages array are also accepted.
+    
+    Args:
+        userId: Assign every imported chat to this user (default: keep the exported userId)
+    
+    Returns:
+        Counts of imported chats and messages and skipped lines
+    """
+    if db is None:
+        raise HTTPException(
+            status_code=503,
+            detail="MongoDB is not connected. Please configure MONGODB_URI in .env file."
+        )
+    
+    chats = messages = skipped = 0
+    try:
+        async for docs, malformed in ndjson.iter_batches(request.stream()):
+            skipped += malformed
+            chat_ops, message_docs, chat_ids = [], [], set()
+            
+            for doc in docs:
+                kind = doc.pop("type", "chat")
+                if kind == "message" and "chatId" in doc and "seq" in doc:
+                    message_docs.append({"chatId": doc["chatId"], "seq": doc["seq"], "message": doc.get("message", {})})
+                elif kind == "chat" and "chatId" in doc:
+                    embedded = doc.pop("messages", None)
+                    if embedded is not None:
+                        doc["messageCount"] = len(embedded)
+                        message_docs.extend(
+                            {"chatId": doc["chatId"], "seq": seq, "message": message}
+                            for seq, message in enumerate(embedded)
+                        )
+                    doc.pop("id", None)
+                    on_insert = {"_id": doc.pop("_id")} if "_id" in doc else {}
+                    if userId:
+                        doc["userId"] = userId
+                    doc.setdefault("messageCount", 0)
+                    chat_ops.append(UpdateOne(
+                        {"chatId": doc["chatId"]},
+                        {"$set": doc, "$setOnInsert": on_insert} if on_insert else {"$set": doc},
+                        upsert=True
+                    ))
+                    chat_ids.add(doc["chatId"])
+                else:
+                    skipped += 1
+            
+            if chat_ops:
+                await db.chats.bulk_write(chat_ops, ordered=False)
+            await chat_messages.upsert_messages(db, message_docs)
+            chats += len(chat_ops)
+            messages += len(message_docs)
+            for chat_id in chat_ids:
+                await chat_cache.publish(chat_id)
+        
+        return {"chats": chats, "messages": messages, "skipped": skipped}
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to import chats after {chats} chats: {str(e)}")
+
+
 @router.get("/{chat_id}")
 async def get_chat(
     chat_id: str,
@@ -131,7 +368,7 @@ async def get_chat(
         chat_id: Chat ID or chatId
     
     Returns:
-        Chat document
+        Chat document with its latest page of messages and nextBefore for older ones
     """
     if db is None:
         raise HTTPException(
@@ -140,19 +377,20 @@ async def get_chat(
         )
     
     try:
-        # Try to find by MongoDB _id first
-        chat = None
-        if ObjectId.is_valid(chat_id):
-            chat = await db.chats.find_one({"_id": ObjectId(chat_id)})
+        cached = await chat_cache.fetch(chat_id)
+        if cached is not None:
+            return ORJSONResponse(cached)
         
-        # If not found, try by chatId
-        if not chat:
-            chat = await db.chats.find_one({"chatId": chat_id})
+        version = chat_cache.version
+        chat = await db.chats.find_one(chat_filter(chat_id))
         
         if not chat:
             raise HTTPException(status_code=404, detail="Chat not found")
         
-        return serialize_chat(chat)
+        chat.update(await message_page(db, chat))
+        chat = serialize_chat(chat)
+        chat_cache.put([chat["id"], chat["chatId"]], chat, version)
+        return ORJSONResponse(chat)
         
     except HTTPException:
         raise
@@ -160,6 +398,118 @@ async def get_chat(
         raise HTTPException(status_code=500, detail=f"Failed to fetch chat: {str(e)}")
 
 
+@router.patch("/{chat_id}")
+async def sync_chat(
+    chat_id: str,
+    changes: ChatSync,
+    db = Depends(get_database)
+):
+    """
+    Delta save: apply only the messages that are new or edited since baseVersion
+    
+    Every save bumps the chat's version. The version check and bump are one
+    atomic update, so a client saving on top of an outdated version gets 409
+    with the current version instead of overwriting newer messages.
+    
+    Args:
+        chat_id: Chat ID or chatId (created when baseVersion is 0 and it does not exist)
+        changes: baseVersion, optional new name, and {seq, message} changes
+    
+    Returns:
+        {"id", "chatId", "version", "messageCount", "updatedAt"}
+    """
+    if db is None:
+        raise HTTPException(
+            status_code=503,
+            detail="MongoDB is not connected. Please configure MONGODB_URI in .env file."
+        )
+    
+    try:
+        # The last change for a position wins
+        latest = {change.seq: change.message for change in changes.messages}
+        chat = await db.chats.find_one(
+            chat_filter(chat_id), {"chatId": 1, "userId": 1, "version": 1, "messageCount": 1, "messages": 1}
+        )
+        
+        if chat is None and changes.baseVersion != 0:
+            raise HTTPException(status_code=404, detail="Chat not found")
+        if chat is not None and chat.get("version", 0) != changes.baseVersion:
+            raise version_conflict(chat.get("version", 0))
+        
+        # Chats saved before messages moved out of the chat document
+        legacy = chat.get("messages") if chat is not None and "messageCount" not in chat else None
+        stored = chat.get("messageCount", len(legacy or [])) if chat is not None else 0
+        
+        # New messages must extend the chat without gaps
+        message_count = stored
+        for seq in sorted(latest):
+            if seq > message_count:
+                raise HTTPException(status_code=422, detail=f"Message {seq} leaves a gap (chat has {message_count} messages)")
+            if seq == message_count:
+                message_count += 1
+        
+        now = datetime.utcnow()
+        if chat is None:
+            chat = {
+                "_id": ObjectId(),
+                "chatId": chat_id,
+                "userId": changes.userId,
+                "name": changes.name or "New Chat",
+                "messageCount": message_count,
+                "version": 1,
+                "createdAt": now,
+                "updatedAt": now
+            }
+            try:
+                await db.chats.insert_one(chat)
+            except DuplicateKeyError:
+                # Another save created it first
+                current = await db.chats.find_one({"chatId": chat_id}, {"version": 1})
+                raise version_conflict(current.get("version", 0) if current else 0)
+        else:
+            update = {
+                "$set": {"messageCount": message_count, "updatedAt": now},
+                "$inc": {"version": 1}
+            }
+            if changes.name is not None:
+                update["$set"]["name"] = changes.name
+            if legacy is not None:
+                update["$unset"] = {"messages": ""}
+            
+            updated = await db.chats.find_one_and_update(
+                {"_id": chat["_id"], **version_filter(changes.baseVersion)},
+                update,
+                projection={"version": 1},
+                return_document=ReturnDocument.AFTER
+            )
+            if updated is None:
+                current = await db.chats.find_one({"_id": chat["_id"]}, {"version": 1})
+                raise version_conflict(current.get("version", 0) if current else 0)
+            chat["version"] = updated["version"]
+        
+        # Only the changed messages are written, each as its own document
+        if legacy:
+            await chat_messages.write_messages(db, chat["chatId"], legacy)
+        await chat_messages.upsert_messages(db, [
+            {"chatId": chat["chatId"], "seq": seq, "message": message}
+            for seq, message in sorted(latest.items())
+        ])
+        await chat_cache.publish(chat["chatId"], str(chat["_id"]), version=chat["version"])
+        
+        return {
+            "id": str(chat["_id"]),
+            "chatId": chat["chatId"],
+            "version": chat["version"],
+            "messageCount": message_count,
+            "updatedAt": now
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to sync chat: {str(e)}")
+
+
 @router.delete("/{chat_id}")
 async def delete_chat(
     chat_id: str,
@@ -181,18 +531,14 @@ async def delete_chat(
         )
     
     try:
-        # Try to delete by MongoDB _id first
-        result = None
-        if ObjectId.is_valid(chat_id):
-            result = await db.chats.delete_one({"_id": ObjectId(chat_id)})
+        chat = await db.chats.find_one_and_delete(chat_filter(chat_id), projection={"chatId": 1})
         
-        # If not found, try by chatId
-        if not result or result.deleted_count == 0:
-            result = await db.chats.delete_one({"chatId": chat_id})
-        
-        if result.deleted_count == 0:
+        if not chat:
             raise HTTPException(status_code=404, detail="Chat not found")
         
+        await chat_messages.delete_messages(db, chat["chatId"])
+        await chat_cache.publish(chat["chatId"], str(chat["_id"]))
+        
         return {"message": "Chat deleted successfully", "id": chat_id}
         
     except HTTPException:
@@ -215,7 +561,8 @@ async def add_message_to_chat(
         message: Message object to add
     
     Returns:
-        Updated chat
+        Updated chat with all its messages (PATCH /{chat_id} saves a delta
+        without returning the history)
     """
     if db is None:
         raise HTTPException(
@@ -224,33 +571,77 @@ async def add_message_to_chat(
         )
     
     try:
-        # Try to find by MongoDB _id first
-        chat = None
-        if ObjectId.is_valid(chat_id):
-            chat = await db.chats.find_one({"_id": ObjectId(chat_id)})
-        
-        # If not found, try by chatId
-        if not chat:
-            chat = await db.chats.find_one({"chatId": chat_id})
+        # Reserve the next sequence number atomically
+        chat = await db.chats.find_one_and_update(
+            chat_filter(chat_id),
+            {"$inc": {"messageCount": 1}},
+            projection={"chatId": 1, "messageCount": 1, "messages": 1},
+            return_document=ReturnDocument.AFTER
+        )
         
         if not chat:
             raise HTTPException(status_code=404, detail="Chat not found")
         
-        # Add message to chat
-        result = await db.chats.update_one(
-            {"_id": chat["_id"]},
-            {
-                "$push": {"messages": message},
-                "$set": {"updatedAt": datetime.utcnow()}
-            }
-        )
+        if "messages" in chat:
+            # Chat saved before messages moved out of the chat document
+            messages = chat["messages"] + [message]
+            await chat_messages.write_messages(db, chat["chatId"], messages)
+            update = {"$set": {"messageCount": len(messages)}, "$unset": {"messages": ""}}
+        else:
+            await chat_messages.insert_message(db, chat["chatId"], chat["messageCount"] - 1, message)
+            messages = None
+            update = {}
         
-        # Fetch updated chat
-        updated_chat = await db.chats.find_one({"_id": chat["_id"]})
+        # Bump the version once the message is stored
+        update.setdefault("$set", {})["updatedAt"] = datetime.utcnow()
+        update["$inc"] = {"version": 1}
+        updated_chat = await db.chats.find_one_and_update(
+            {"_id": chat["_id"]}, update, return_document=ReturnDocument.AFTER
+        )
+        await chat_cache.publish(updated_chat["chatId"], str(updated_chat["_id"]), version=updated_chat["version"])
         
+        updated_chat["messages"] = messages if messages is not None else await chat_messages.load_messages(db, updated_chat["chatId"])
         return serialize_chat(updated_chat)
         
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to add message: {str(e)}")
+
+
+@router.get("/{chat_id}/messages")
+async def get_chat_messages(
+    chat_id: str,
+    limit: int = chat_messages.DEFAULT_PAGE_SIZE,
+    before: Optional[int] = None,
+    db = Depends(get_database)
+):
+    """
+    Get one page of a chat's messages, newest page first
+    
+    Args:
+        chat_id: Chat ID or chatId
+        limit: Messages per page (max 200)
+        before: Cursor from a previous page's nextBefore
+    
+    Returns:
+        {"chatId", "messages" (oldest first), "nextBefore"}
+    """
+    if db is None:
+        raise HTTPException(
+            status_code=503,
+            detail="MongoDB is not connected. Please configure MONGODB_URI in .env file."
+        )
+    
+    try:
+        chat = await db.chats.find_one(chat_filter(chat_id), {"chatId": 1, "messageCount": 1, "messages": 1})
+        
+        if not chat:
+            raise HTTPException(status_code=404, detail="Chat not found")
+        
+        return ORJSONResponse({"chatId": chat["chatId"], **await message_page(db, chat, limit, before)})
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch messages: {str(e)}")
@@ -3,11 +3,17 @@ API Router for Mission CRUD operations
 Handles saving, retrieving, and deleting missions from MongoDB
 """
 
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
+from typing import Optional
 from datetime import datetime
 from bson import ObjectId
 from app.services.database import get_database
+from app.services import pagination
+from app.services.cache import mission_cache
+from app.services import ndjson
+from app.services import payloads
+from app.core.responses import ORJSONResponse
 
 router = APIRouter(prefix="/api/missions", tags=["missions"])
 
@@ -42,15 +48,18 @@ async def create_mission(
         mission_doc = {
             "userId": userId,
             "query": query,
+            "mission_name": data.get("mission_name"),
             "data": data,
             "createdAt": datetime.utcnow(),
             "updatedAt": datetime.utcnow()
         }
         
-        result = await db.missions.insert_one(mission_doc)
+        # The payload is stored once by content hash; the mission keeps the hash
+        stored_doc = dict(mission_doc)
+        await payloads.externalize(db, [stored_doc], "data", "dataRef")
+        result = await db.missions.insert_one(stored_doc)
         
         mission_doc["id"] = str(result.inserted_id)
-        mission_doc.pop("_id", None)
         
         return mission_doc
         
@@ -58,7 +67,7 @@ async def create_mission(
         raise HTTPException(status_code=500, detail=f"Failed to create mission: {str(e)}")
 
 
-@router.get("", response_model=List[dict])
+@router.get("")
 async def get_all_missions(
     userId: str = "temp-user",
     limit: int = 50,
@@ -83,13 +92,131 @@ async def get_all_missions(
     try:
         cursor = db.missions.find({"userId": userId}).sort("createdAt", -1).limit(limit)
         missions = await cursor.to_list(length=limit)
+        await payloads.resolve(db, missions, "data", "dataRef")
         
-        return [serialize_mission(mission) for mission in missions]
+        return ORJSONResponse([serialize_mission(mission) for mission in missions])
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch missions: {str(e)}")
 
 
+@router.get("/summary")
+async def get_mission_summaries(
+    userId: str = "temp-user",
+    limit: int = pagination.DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    db = Depends(get_database)
+):
+    """
+    List mission summaries for a user, newest first
+    
+    Args:
+        userId: User ID to filter missions
+        limit: Missions per page (max 100)
+        cursor: nextCursor from the previous page
+    
+    Returns:
+        {"items": [{id, query, mission_name, createdAt, updatedAt}], "nextCursor"}
+    """
+    if db is None:
+        raise HTTPException(
+            status_code=503,
+            detail="MongoDB is not connected. Please configure MONGODB_URI in .env file."
+        )
+    
+    try:
+        missions, next_cursor = await pagination.fetch_page(
+            db.missions,
+            {"userId": userId},
+            "createdAt",
+            {"query": 1, "createdAt": 1, "updatedAt": 1, "mission_name": {"$ifNull": ["$mission_name", "$data.mission_name"]}},
+            cursor,
+            limit
+        )
+        
+        return ORJSONResponse({"items": [serialize_mission(mission) for mission in missions], "nextCursor": next_cursor})
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch missions: {str(e)}")
+
+
+@router.get("/export")
+async def export_missions(
+    userId: str = "temp-user",
+    db = Depends(get_database)
+):
+    """
+    Stream every mission of a user as NDJSON, one mission per line
+    
+    Args:
+        userId: User whose missions to export
+    """
+    if db is None:
+        raise HTTPException(
+            status_code=503,
+            detail="MongoDB is not connected. Please configure MONGODB_URI in .env file."
+        )
+    
+    async def lines():
+        cursor = db.missions.find({"userId": userId}).sort("_id", 1).batch_size(ndjson.EXPORT_BATCH_SIZE)
+        async for mission in cursor:
+            await payloads.resolve(db, [mission], "data", "dataRef")
+            yield ndjson.encode(mission)
+    
+    return StreamingResponse(
+        lines(),
+        media_type=ndjson.MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="missions-{userId}.ndjson"'}
+    )
+
+
+@router.post("/import")
+async def import_missions(
+    request: Request,
+    userId: Optional[str] = None,
+    db = Depends(get_database)
+):
+    """
+    Import missions from a streamed NDJSON upload (the export format)
+    
+    Missions are written with batched unordered insert_many; ones whose _id
+    already exists are counted as duplicates, so re-importing is harmless.
+    
+    Args:
+        userId: Assign every imported mission to this user (default: keep the exported userId)
+    
+    Returns:
+        Counts of inserted, duplicate and skipped lines
+    """
+    if db is None:
+        raise HTTPException(
+            status_code=503,
+            detail="MongoDB is not connected. Please configure MONGODB_URI in .env file."
+        )
+    
+    inserted = duplicates = skipped = 0
+    try:
+        async for docs, malformed in ndjson.iter_batches(request.stream()):
+            skipped += malformed
+            for doc in docs:
+                doc.pop("id", None)
+                if userId:
+                    doc["userId"] = userId
+                if isinstance(doc.get("data"), dict):
+                    doc.setdefault("mission_name", doc["data"].get("mission_name"))
+            await payloads.externalize(db, docs, "data", "dataRef")
+            added, existing = await ndjson.insert_batch(db.missions, docs)
+            inserted += added
+            duplicates += existing
+        
+        return {"inserted": inserted, "duplicates": duplicates, "skipped": skipped}
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to import missions after {inserted} missions: {str(e)}")
+
+
 @router.get("/{mission_id}")
 async def get_mission(
     mission_id: str,
@@ -114,12 +241,20 @@ async def get_mission(
         if not ObjectId.is_valid(mission_id):
             raise HTTPException(status_code=400, detail="Invalid mission ID format")
         
+        cached = await mission_cache.fetch(mission_id)
+        if cached is not None:
+            return ORJSONResponse(cached)
+        
+        version = mission_cache.version
         mission = await db.missions.find_one({"_id": ObjectId(mission_id)})
         
         if not mission:
             raise HTTPException(status_code=404, detail="Mission not found")
         
-        return serialize_mission(mission)
+        await payloads.resolve(db, [mission], "data", "dataRef")
+        mission = serialize_mission(mission)
+        mission_cache.put([mission["id"]], mission, version)
+        return ORJSONResponse(mission)
         
     except HTTPException:
         raise
@@ -152,6 +287,7 @@ async def delete_mission(
             raise HTTPException(status_code=400, detail="Invalid mission ID format")
         
         result = await db.missions.delete_one({"_id": ObjectId(mission_id)})
+        await mission_cache.publish(mission_id)
         
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Mission not found")
@@ -64,3 +64,17 @@ class ChatUpdate(BaseModel):
 class MessageAdd(BaseModel):
     """Schema for adding a message to a chat"""
     message: ChatMessage
+
+
+class MessageChange(BaseModel):
+    """A new or edited message at its position in the chat"""
+    seq: int = Field(..., ge=0, description="Position of the message (0 = first)")
+    message: Dict[str, Any] = Field(..., description="Full message object")
+
+
+class ChatSync(BaseModel):
+    """Schema for a delta save: only the messages that changed since baseVersion"""
+    baseVersion: int = Field(..., ge=0, description="Chat version the changes are based on (0 = new chat)")
+    name: Optional[str] = Field(None, description="New chat name, if renamed")
+    messages: List[MessageChange] = Field(default=[], description="New or edited messages")
+    userId: str = Field(default="temp-user", description="Owner when the chat is created")
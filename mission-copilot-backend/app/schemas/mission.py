@@ -19,6 +19,7 @@ class ConstellationInfo(BaseModel):
     configuration: str
     phasing_deg: float
     coverage_note: str
+    planes: int = 1
 
 
 class DataInfo(BaseModel):
@@ -31,6 +32,9 @@ class GroundInfo(BaseModel):
     passes_per_day: int
     stations_needed: int
     avg_pass_duration_min: float
+    contact_minutes_per_day: float = 0.0
+    downlink_capacity_GB: float = 0.0
+    stations: List[str] = []
 
 
 class LiveDataSource(BaseModel):
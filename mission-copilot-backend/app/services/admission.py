@@ -0,0 +1,173 @@
+"""
+Admission control for LLM-bound endpoints
+Per-client token buckets cap request rates, a fixed number of slots bounds
+concurrent LLM work, and a bounded wait queue with a deadline sheds load:
+past one depth requests are served by the rule-based fallback, and once the
+waiting plus fallback requests reach another they are rejected at once with
+429 and Retry-After
+"""
+
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Iterable, Optional
+import asyncio
+import math
+import time
+from fastapi import HTTPException, Request
+
+from app.core.config import AdmissionSettings, get_admission_settings
+
+# userId sent by clients that are not signed in; those are limited by IP only
+ANONYMOUS_USER = "temp-user"
+
+
+class TokenBuckets:
+    """Token bucket per client key, least recently used keys evicted past max_keys"""
+
+    def __init__(self, rate_per_s: float, burst: int, max_keys: int = 10000):
+        self.rate_per_s = rate_per_s
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+
+    def _level(self, key: str, now: float) -> float:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return float(self.burst)
+        tokens, updated = bucket
+        return min(float(self.burst), tokens + (now - updated) * self.rate_per_s)
+
+    def take(self, keys: Iterable[str]) -> float:
+        """
+        Take one token from every key's bucket, or none if any is empty
+
+        Returns:
+            0 when admitted, otherwise seconds until all buckets have a token
+        """
+        now = time.monotonic()
+        keys = list(keys)
+        levels = [self._level(key, now) for key in keys]
+        wait = max((1.0 - level) / self.rate_per_s for level in levels) if levels else 0.0
+        if wait > 0:
+            return wait
+
+        for key, level in zip(keys, levels):
+            self._buckets[key] = [level - 1.0, now]
+            self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return 0.0
+
+
+class Ticket:
+    """Outcome of admission; degraded requests must not call the LLM"""
+
+    def __init__(self, degraded: bool):
+        self.degraded = degraded
+
+
+class AdmissionController:
+    def __init__(self, settings: AdmissionSettings):
+        self.settings = settings
+        self.buckets = TokenBuckets(settings.rate_per_minute / 60.0, settings.burst, settings.max_tracked_clients)
+        self._slots = asyncio.Semaphore(settings.max_concurrent)
+        self.waiting = 0
+        self.active = 0
+        # Fallback requests in progress; they count toward max_queue
+        self.degrading = 0
+        # Moving average of how long an admitted request holds its slot
+        self.service_time_s = 5.0
+        self.admitted = 0
+        self.degraded = 0
+        self.rejected = 0
+
+    def _reject(self, retry_after_s: float, detail: str):
+        self.rejected += 1
+        raise HTTPException(
+            status_code=429,
+            detail=detail,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after_s)))},
+        )
+
+    def _expected_wait_s(self) -> float:
+        return self.service_time_s * (self.waiting + 1) / self.settings.max_concurrent
+
+    @asynccontextmanager
+    async def admit(self, keys: Iterable[str]) -> AsyncIterator[Ticket]:
+        """
+        Hold an LLM slot for the duration of the block
+
+        Raises:
+            HTTPException 429: client over its rate, queue and fallbacks at
+                max_queue, or no slot freed up within queue_timeout_s
+        """
+        wait = self.buckets.take(keys)
+        if wait > 0:
+            self._reject(wait, "Too many requests, please slow down")
+
+        if not self._slots.locked():
+            # A slot is free, so this returns without waiting
+            await self._slots.acquire()
+        else:
+            if self.waiting + self.degrading >= self.settings.max_queue:
+                self._reject(self._expected_wait_s(), "Service is busy, please retry shortly")
+
+            if self.waiting >= self.settings.degrade_queue_depth:
+                # Deep queue: answer now without the LLM instead of queueing
+                self.degraded += 1
+                self.degrading += 1
+                try:
+                    yield Ticket(degraded=True)
+                finally:
+                    self.degrading -= 1
+                return
+
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.settings.queue_timeout_s)
+            except asyncio.TimeoutError:
+                self._reject(self._expected_wait_s(), "Service is busy, please retry shortly")
+            finally:
+                self.waiting -= 1
+
+        self.admitted += 1
+        self.active += 1
+        started = time.monotonic()
+        try:
+            yield Ticket(degraded=False)
+        finally:
+            self.active -= 1
+            self._slots.release()
+            self.service_time_s = 0.8 * self.service_time_s + 0.2 * (time.monotonic() - started)
+
+    def is_stale(self, snapshot_age_s: float) -> bool:
+        """Live data too old to trust for LLM analysis"""
+        return snapshot_age_s > self.settings.max_snapshot_age_s
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "waiting": self.waiting,
+            "degrading": self.degrading,
+            "admitted": self.admitted,
+            "degraded": self.degraded,
+            "rejected": self.rejected,
+        }
+
+
+def client_keys(request: Request, user_id: Optional[str] = None) -> list:
+    """Bucket keys for a request: the client IP, plus the userId when signed in"""
+    keys = [f"ip:{request.client.host if request.client else 'unknown'}"]
+    if user_id and user_id != ANONYMOUS_USER:
+        keys.append(f"user:{user_id}")
+    return keys
+
+
+_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    global _controller
+    if _controller is None:
+        _controller = AdmissionController(get_admission_settings())
+    return _controller
@@ -0,0 +1,158 @@
+"""
+In-process read-through cache for Planexa documents
+LRU with a TTL and a byte budget; entries are stored BSON-encoded, so every
+hit returns a fresh copy and sizes are exact. Caches of mutable documents
+publish version stamps through the shared state, so a write handled by one
+worker also invalidates the copies cached by the others.
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+import threading
+import time
+import uuid
+import bson
+
+from app.services.shared_state import get_shared_state
+
+DEFAULT_TTL_S = 300.0
+DEFAULT_MAX_ENTRIES = 2048
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class DocumentCache:
+    """
+    LRU document cache where one entry can be reached under several keys
+    (e.g. a chat's _id and its chatId); invalidating any key drops the entry
+
+    Args:
+        shared_name: Namespace for version stamps in the shared state (None =
+            this process only, for immutable documents)
+        stamp_field: Document field naming its stamp, given to publish()
+    """
+
+    def __init__(self, ttl_s: float = DEFAULT_TTL_S, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_bytes: int = DEFAULT_MAX_BYTES, shared_name: Optional[str] = None,
+                 stamp_field: str = "id"):
+        self.ttl_s = ttl_s
+        self.shared_name = shared_name
+        self.stamp_field = stamp_field
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[float, bytes, Tuple[str, ...]]]" = OrderedDict()
+        self._aliases: Dict[str, str] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # Bumped by every invalidation; a fill that started before one is discarded
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            primary = self._aliases.get(key)
+            entry = self._entries.get(primary) if primary else None
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._drop(primary)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(primary)
+            self.hits += 1
+            data = entry[1]
+        return bson.decode(data)
+
+    def put(self, keys: Iterable[str], doc: dict, version: int):
+        """
+        Store doc under every key
+
+        Args:
+            version: Value of self.version read before the database query;
+                the fill is skipped if anything was invalidated since
+        """
+        keys = tuple(dict.fromkeys(k for k in keys if k))
+        if not keys:
+            return
+        data = bson.encode(doc)
+        if len(data) > self.max_bytes:
+            return
+
+        with self._lock:
+            if version != self.version:
+                return
+            for key in keys:
+                if key in self._aliases:
+                    self._drop(self._aliases[key])
+            primary = keys[0]
+            self._entries[primary] = (time.monotonic() + self.ttl_s, data, keys)
+            for key in keys:
+                self._aliases[key] = primary
+            self._bytes += len(data)
+
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(self, *keys: str):
+        """Drop the entries reachable under any of the keys"""
+        with self._lock:
+            self.version += 1
+            for key in keys:
+                primary = self._aliases.get(key)
+                if primary is not None:
+                    self._drop(primary)
+
+    def _stamp_key(self, name: Any) -> str:
+        return f"cache-stamp:{self.shared_name}:{name}"
+
+    async def fetch(self, key: str) -> Optional[dict]:
+        """
+        Like get(), but a miss if any worker published a stamp for the
+        document other than the version it holds
+
+        A stamp outlives every entry filled before it was published, so an
+        entry without a stamp in the shared state has not been written since.
+        """
+        doc = self.get(key)
+        if doc is None or self.shared_name is None:
+            return doc
+        stamp = await get_shared_state().get(self._stamp_key(doc.get(self.stamp_field)))
+        if stamp is not None and stamp != doc.get("version"):
+            self.invalidate(key)
+            return None
+        return doc
+
+    async def publish(self, name: str, *aliases: str, version: Optional[int] = None):
+        """
+        Invalidate a written document here and in every other worker
+
+        Args:
+            name: The document's stamp_field value
+            aliases: Other keys it is cached under in this process
+            version: Its version after the write; None (e.g. deleted, or
+                unknown) makes every worker miss until the stamp expires
+        """
+        self.invalidate(name, *aliases)
+        if self.shared_name is not None:
+            stamp = version if version is not None else f"changed-{uuid.uuid4().hex}"
+            await get_shared_state().set(self._stamp_key(name), stamp, 2 * self.ttl_s)
+
+    def clear(self):
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+            self._aliases.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "bytes": self._bytes, "hits": self.hits, "misses": self.misses}
+
+    def _drop(self, primary: str):
+        _, data, keys = self._entries.pop(primary)
+        self._bytes -= len(data)
+        for key in keys:
+            if self._aliases.get(key) == primary:
+                del self._aliases[key]
+
+
+chat_cache = DocumentCache(shared_name="chats", stamp_field="chatId")
+mission_cache = DocumentCache(shared_name="missions", stamp_field="id")
@@ -0,0 +1,115 @@
+"""
+Chat message storage for Planexa
+Stores each chat message as its own document keyed by (chatId, seq) so saves
+and page loads touch only the messages involved, not the whole history.
+Mission payloads inside messages are kept in the payload store by hash.
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+
+from app.services import payloads
+
+COLLECTION = "chat_messages"
+
+# Messages returned by one page when no limit is given
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+# Message field holding a generated mission, and its stored form
+MISSION_FIELD = "missionData"
+MISSION_REF_FIELD = "missionDataRef"
+
+
+async def pack_messages(db, messages: List[dict]) -> List[dict]:
+    """Copies of the messages with mission payloads replaced by their hash"""
+    packed = [dict(message) if isinstance(message, dict) else message for message in messages]
+    await payloads.externalize(db, packed, MISSION_FIELD, MISSION_REF_FIELD)
+    return packed
+
+
+async def unpack_messages(db, messages: List[dict]) -> List[dict]:
+    """Restore mission payloads referenced by hash, in place"""
+    await payloads.resolve(db, messages, MISSION_FIELD, MISSION_REF_FIELD)
+    return messages
+
+
+async def upsert_messages(db, docs: List[dict]):
+    """
+    Upsert {"chatId", "seq", "message"} documents in one unordered bulk write
+
+    Upserts keyed by (chatId, seq) make retried or concurrent saves idempotent.
+    """
+    if not docs:
+        return
+    packed = await pack_messages(db, [doc["message"] for doc in docs])
+    await db[COLLECTION].bulk_write(
+        [
+            UpdateOne(
+                {"chatId": doc["chatId"], "seq": doc["seq"]},
+                {"$set": {"message": message}, "$setOnInsert": {"createdAt": datetime.utcnow()}},
+                upsert=True,
+            )
+            for doc, message in zip(docs, packed)
+        ],
+        ordered=False,
+    )
+
+
+async def write_messages(db, chat_id: str, messages: List[dict], first_seq: int = 0):
+    """Upsert messages at consecutive sequence numbers starting at first_seq"""
+    await upsert_messages(db, [
+        {"chatId": chat_id, "seq": first_seq + i, "message": message}
+        for i, message in enumerate(messages)
+    ])
+
+
+async def insert_message(db, chat_id: str, seq: int, message: dict):
+    """Store one message at a sequence number already reserved on the chat"""
+    packed = await pack_messages(db, [message])
+    await db[COLLECTION].insert_one({"chatId": chat_id, "seq": seq, "message": packed[0], "createdAt": datetime.utcnow()})
+
+
+async def fetch_page(db, chat_id: str, limit: int = DEFAULT_PAGE_SIZE, before: Optional[int] = None) -> Dict:
+    """
+    Latest messages of a chat, paging backwards from a sequence number
+
+    Args:
+        limit: Messages per page (capped at MAX_PAGE_SIZE)
+        before: Only return messages with seq < before (None = newest)
+
+    Returns:
+        {"messages": oldest-first list, "nextBefore": cursor for the previous page or None}
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    query = {"chatId": chat_id}
+    if before is not None:
+        query["seq"] = {"$lt": before}
+
+    # Fetch one extra document to learn whether an older page exists
+    cursor = db[COLLECTION].find(query, {"_id": 0, "seq": 1, "message": 1}).sort("seq", DESCENDING).limit(limit + 1)
+    docs = await cursor.to_list(length=limit + 1)
+    has_more = len(docs) > limit
+    docs = docs[:limit][::-1]
+
+    return {
+        "messages": await unpack_messages(db, [doc["message"] for doc in docs]),
+        "nextBefore": docs[0]["seq"] if has_more and docs else None,
+    }
+
+
+async def load_messages(db, chat_id: str) -> List[dict]:
+    """Every message of a chat, oldest first"""
+    cursor = db[COLLECTION].find({"chatId": chat_id}, {"_id": 0, "message": 1}).sort("seq", ASCENDING)
+    return await unpack_messages(db, [doc["message"] async for doc in cursor])
+
+
+async def truncate_messages(db, chat_id: str, count: int):
+    """Delete the messages at sequence numbers count and above"""
+    await db[COLLECTION].delete_many({"chatId": chat_id, "seq": {"$gte": count}})
+
+
+async def delete_messages(db, chat_id: str):
+    await db[COLLECTION].delete_many({"chatId": chat_id})
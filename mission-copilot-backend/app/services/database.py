@@ -3,12 +3,16 @@ MongoDB database service for Planexa
 Handles async database connections and operations using Motor
 """
 
-from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo.errors import ConnectionFailure
-import os
+from typing import Optional
+import asyncio
 from dotenv import load_dotenv
 import logging
 
+from app.core.config import DatabaseSettings, get_database_settings
+from app.services.indexes import ensure_indexes
+from app.services.pagination import backfill_timestamps
+
 load_dotenv()
 
 # Configure logging
@@ -16,48 +20,99 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # MongoDB configuration
-MONGODB_URI = os.getenv("MONGODB_URI", "")
-MONGODB_DB_NAME = os.getenv("MONGODB_DB_NAME", "planexa")
+database_settings = get_database_settings()
+MONGODB_URI = database_settings.uri
+MONGODB_DB_NAME = database_settings.db_name
 
 # Global database client
-client: AsyncIOMotorClient = None
+client = None  # AsyncIOMotorClient, imported on first connect
 db = None
 
+# Background task retrying a failed connection
+_reconnect_task: Optional[asyncio.Task] = None
+
+
+def client_options(settings: DatabaseSettings) -> dict:
+    """Motor client keyword arguments from the database settings"""
+    return {
+        "maxPoolSize": settings.max_pool_size,
+        "minPoolSize": settings.min_pool_size,
+        "maxIdleTimeMS": settings.max_idle_time_ms,
+        "serverSelectionTimeoutMS": settings.server_selection_timeout_ms,
+        "connectTimeoutMS": settings.connect_timeout_ms,
+        "socketTimeoutMS": settings.socket_timeout_ms,
+        "compressors": settings.compressors,
+        "zlibCompressionLevel": settings.zlib_compression_level,
+    }
+
+
+async def _open_client(settings: DatabaseSettings):
+    """Connect, verify and pre-warm a new client, then make it the shared one"""
+    global client, db
+    
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    new_client = AsyncIOMotorClient(settings.uri, **client_options(settings))
+    try:
+        # Verify connection
+        await new_client.admin.command('ping')
+        
+        # Concurrent pings each check out their own connection, so the pool
+        # holds minPoolSize open sockets before the first request arrives
+        await asyncio.gather(*(new_client.admin.command('ping') for _ in range(settings.min_pool_size)))
+    except Exception:
+        new_client.close()
+        raise
+    
+    client = new_client
+    db = client[settings.db_name]
+    logger.info(f"✅ Connected to MongoDB database: {settings.db_name} (pool {settings.min_pool_size}-{settings.max_pool_size})")
+    
+    # Create indexes for better performance
+    await create_indexes()
+    await backfill_sort_fields()
+
+
+async def _reconnect_loop(settings: DatabaseSettings):
+    """Retry the connection with exponential backoff until it succeeds"""
+    delay = settings.reconnect_interval_s
+    while db is None:
+        await asyncio.sleep(delay)
+        try:
+            await _open_client(settings)
+            logger.info("✅ MongoDB connection restored")
+        except Exception as e:
+            delay = min(settings.reconnect_max_interval_s, delay * 2)
+            logger.warning(f"⚠️ MongoDB reconnect failed, retrying in {delay:g}s: {e}")
+
 
 async def connect_to_mongodb():
     """
     Connect to MongoDB Atlas
-    Called on application startup
+    Called on application startup; on failure keeps retrying in the background
     """
-    global client, db
+    global _reconnect_task
     
-    if not MONGODB_URI:
+    if not database_settings.uri:
         logger.warning("⚠️ MONGODB_URI not set in environment variables")
         logger.warning("⚠️ MongoDB features will be disabled")
         return None
     
     try:
         logger.info("📡 Connecting to MongoDB Atlas...")
-        client = AsyncIOMotorClient(MONGODB_URI)
-        
-        # Verify connection
-        await client.admin.command('ping')
-        
-        db = client[MONGODB_DB_NAME]
-        logger.info(f"✅ Connected to MongoDB database: {MONGODB_DB_NAME}")
-        
-        # Create indexes for better performance
-        await create_indexes()
-        
+        await _open_client(database_settings)
         return db
         
     except ConnectionFailure as e:
         logger.error(f"❌ MongoDB connection failed: {e}")
         logger.error("❌ Please check your MONGODB_URI in .env file")
-        return None
     except Exception as e:
         logger.error(f"❌ Unexpected error connecting to MongoDB: {e}")
-        return None
+    
+    if _reconnect_task is None or _reconnect_task.done():
+        logger.info("🔁 Retrying MongoDB connection in the background")
+        _reconnect_task = asyncio.create_task(_reconnect_loop(database_settings))
+    return None
 
 
 async def close_mongodb_connection():
@@ -65,7 +120,11 @@ async def close_mongodb_connection():
     Close MongoDB connection
     Called on application shutdown
     """
-    global client
+    global _reconnect_task
+    
+    if _reconnect_task is not None:
+        _reconnect_task.cancel()
+        _reconnect_task = None
     
     if client:
         logger.info("🔌 Closing MongoDB connection...")
@@ -76,22 +135,25 @@ async def close_mongodb_connection():
 async def create_indexes():
     """
     Create database indexes for better query performance
+    (declared in app.services.indexes)
     """
     try:
-        # Missions collection indexes
-        await db.missions.create_index("userId")
-        await db.missions.create_index("createdAt")
-        
-        # Chats collection indexes
-        await db.chats.create_index("userId")
-        await db.chats.create_index("chatId")
-        await db.chats.create_index("updatedAt")
-        
+        await ensure_indexes(db)
         logger.info("✅ Database indexes created")
     except Exception as e:
         logger.warning(f"⚠️ Could not create indexes: {e}")
 
 
+async def backfill_sort_fields():
+    """Give legacy documents the timestamps keyset pagination sorts on"""
+    try:
+        updated = await backfill_timestamps(db)
+        if updated:
+            logger.info(f"✅ Backfilled timestamps on {updated} legacy documents")
+    except Exception as e:
+        logger.warning(f"⚠️ Could not backfill timestamps: {e}")
+
+
 def get_database():
     """
     Get database instance
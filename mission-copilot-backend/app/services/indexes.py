@@ -0,0 +1,157 @@
+"""
+Index management for Planexa
+Declares the indexes each router query relies on, applies them idempotently
+at startup, and can verify with explain() that every registered query shape
+is served by an index without an in-memory sort
+
+Usage:
+    python -m app.services.indexes          # apply indexes
+    python -m app.services.indexes --check  # apply, then explain every query shape
+"""
+
+from datetime import datetime
+from typing import Dict, List
+import asyncio
+import logging
+import sys
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+# Indexes per collection, named so re-applying them is a no-op
+INDEXES: Dict[str, List[IndexModel]] = {
+    "chats": [
+        IndexModel([("chatId", ASCENDING)], name="chatId_unique", unique=True),
+        IndexModel([("userId", ASCENDING), ("updatedAt", DESCENDING), ("_id", DESCENDING)], name="user_updated"),
+    ],
+    "chat_messages": [
+        IndexModel([("chatId", ASCENDING), ("seq", ASCENDING)], name="chat_seq_unique", unique=True),
+    ],
+    "missions": [
+        IndexModel([("userId", ASCENDING), ("createdAt", DESCENDING), ("_id", DESCENDING)], name="user_created"),
+    ],
+}
+
+# Earlier single-field indexes now covered by the compound ones above
+RETIRED_INDEXES: Dict[str, List[str]] = {
+    "chats": ["userId_1", "chatId_1", "updatedAt_1"],
+    "chat_messages": ["chatId_1_seq_1"],
+    "missions": ["userId_1", "createdAt_1"],
+}
+
+
+def query_shapes() -> List[Dict]:
+    """
+    Representative query for each filter/sort the routers issue
+
+    Values are placeholders; only the shape matters to the planner.
+    """
+    now = datetime.utcnow()
+    oid = ObjectId()
+    keyset = lambda field: {"$or": [{field: {"$lt": now}}, {field: now, "_id": {"$lt": oid}}]}
+    return [
+        {"name": "chats by chatId", "collection": "chats", "filter": {"chatId": "x"}},
+        {"name": "chats by _id or chatId", "collection": "chats",
+         "filter": {"$or": [{"_id": oid}, {"chatId": str(oid)}]}},
+        {"name": "chat list", "collection": "chats", "filter": {"userId": "u"}, "sort": {"updatedAt": -1}},
+        {"name": "chat summary page", "collection": "chats", "filter": {"userId": "u", **keyset("updatedAt")},
+         "sort": {"updatedAt": -1, "_id": -1}},
+        {"name": "message page", "collection": "chat_messages", "filter": {"chatId": "x", "seq": {"$lt": 100}},
+         "sort": {"seq": -1}},
+        {"name": "messages for chats", "collection": "chat_messages", "filter": {"chatId": {"$in": ["x", "y"]}},
+         "sort": {"chatId": 1, "seq": 1}},
+        {"name": "mission list", "collection": "missions", "filter": {"userId": "u"}, "sort": {"createdAt": -1}},
+        {"name": "mission summary page", "collection": "missions", "filter": {"userId": "u", **keyset("createdAt")},
+         "sort": {"createdAt": -1, "_id": -1}},
+    ]
+
+
+async def ensure_indexes(db):
+    """
+    Create every declared index and drop retired ones
+
+    An existing index with the same name but different keys or options is
+    rebuilt; creating an already-identical index is a no-op on the server.
+    """
+    for collection, models in INDEXES.items():
+        existing = await db[collection].index_information()
+
+        for name in RETIRED_INDEXES.get(collection, []):
+            if name in existing:
+                await db[collection].drop_index(name)
+                logger.info(f"🗑️ Dropped retired index {collection}.{name}")
+
+        for model in models:
+            spec = model.document
+            current = existing.get(spec["name"])
+            if current and (list(current["key"]) != list(spec["key"].items())
+                            or current.get("unique", False) != spec.get("unique", False)):
+                await db[collection].drop_index(spec["name"])
+                logger.info(f"🔁 Rebuilding index {collection}.{spec['name']}")
+
+            try:
+                await db[collection].create_indexes([model])
+            except OperationFailure as e:
+                # e.g. duplicate chatIds left by older non-atomic saves block a unique index
+                logger.warning(f"⚠️ Could not create index {collection}.{spec['name']}: {e}")
+
+
+def _plan_stages(plan: Dict) -> List[str]:
+    """Stage names of a winning plan tree (classic and slot-based engines)"""
+    stages = [plan.get("stage", "")]
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            stages += _plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        stages += _plan_stages(child)
+    return stages
+
+
+async def check_query_plans(db) -> List[Dict]:
+    """
+    Explain every registered query shape
+
+    Returns:
+        One entry per shape with its plan stages and a list of problems
+        (COLLSCAN or an in-memory SORT); empty problems means index-only access
+    """
+    report = []
+    for shape in query_shapes():
+        command = {"find": shape["collection"], "filter": shape["filter"], "limit": 50}
+        if "sort" in shape:
+            command["sort"] = shape["sort"]
+        explain = await db.command("explain", command, verbosity="queryPlanner")
+        stages = _plan_stages(explain["queryPlanner"]["winningPlan"])
+
+        problems = []
+        if "COLLSCAN" in stages:
+            problems.append("COLLSCAN")
+        if "SORT" in stages:
+            problems.append("in-memory SORT")
+        report.append({"name": shape["name"], "collection": shape["collection"], "stages": stages, "problems": problems})
+    return report
+
+
+async def _main(check: bool) -> int:
+    from app.services import database
+
+    db = await database.connect_to_mongodb()
+    if db is None:
+        return 1
+    try:
+        if not check:
+            return 0
+        failures = 0
+        for entry in await check_query_plans(db):
+            status = "❌ " + ", ".join(entry["problems"]) if entry["problems"] else "✅"
+            print(f"{status} {entry['name']}: {' <- '.join(entry['stages'])}")
+            failures += bool(entry["problems"])
+        return 1 if failures else 0
+    finally:
+        await database.close_mongodb_connection()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(_main("--check" in sys.argv)))
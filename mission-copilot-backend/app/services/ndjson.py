@@ -0,0 +1,82 @@
+"""
+NDJSON streaming helpers for bulk export and import
+Documents are written as MongoDB Extended JSON (relaxed) so ObjectIds and
+dates survive a round trip
+"""
+
+from typing import AsyncIterator, List, Tuple
+from bson import json_util
+from bson.json_util import RELAXED_JSON_OPTIONS
+from pymongo.errors import BulkWriteError
+
+MEDIA_TYPE = "application/x-ndjson"
+
+# Documents per insert_many/bulk_write call
+IMPORT_BATCH_SIZE = 1000
+
+# Cursor batch size for exports (documents per getMore)
+EXPORT_BATCH_SIZE = 1000
+
+DUPLICATE_KEY = 11000
+
+
+def encode(doc: dict) -> bytes:
+    return json_util.dumps(doc, json_options=RELAXED_JSON_OPTIONS).encode() + b"\n"
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Split a streamed body into lines without holding more than one partial line"""
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if pending.strip():
+        yield pending
+
+
+async def iter_batches(chunks: AsyncIterator[bytes], size: int = IMPORT_BATCH_SIZE) -> AsyncIterator[Tuple[List[dict], int]]:
+    """
+    Parse NDJSON lines into batches of documents
+
+    Yields:
+        (documents, malformed line count) per batch
+    """
+    batch, malformed = [], 0
+    async for line in iter_lines(chunks):
+        try:
+            doc = json_util.loads(line)
+        except ValueError:
+            malformed += 1
+            continue
+        if not isinstance(doc, dict):
+            malformed += 1
+            continue
+        batch.append(doc)
+        if len(batch) >= size:
+            yield batch, malformed
+            batch, malformed = [], 0
+    if batch or malformed:
+        yield batch, malformed
+
+
+async def insert_batch(collection, docs: List[dict]) -> Tuple[int, int]:
+    """
+    Unordered insert_many that treats duplicate keys as already imported
+
+    Returns:
+        (inserted, duplicates)
+    """
+    if not docs:
+        return 0, 0
+    try:
+        result = await collection.insert_many(docs, ordered=False)
+        return len(result.inserted_ids), 0
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        if any(err.get("code") != DUPLICATE_KEY for err in errors):
+            raise
+        return e.details.get("nInserted", 0), len(errors)
+
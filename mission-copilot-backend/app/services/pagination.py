@@ -0,0 +1,109 @@
+"""
+Keyset (seek) pagination helpers for Planexa list endpoints
+Pages are ordered by a timestamp field then _id, both descending, and the
+position is carried in an opaque cursor so each page is one index seek
+"""
+
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+import base64
+import json
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException
+from pymongo import UpdateOne
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Timestamp field each paged collection is ordered by
+PAGED_FIELDS = {"chats": "updatedAt", "missions": "createdAt"}
+
+
+def sort_timestamp(doc: dict, field: str) -> datetime:
+    """
+    The doc's timestamp as a naive UTC datetime
+
+    Legacy documents may store it as an ISO string or not at all; those fall
+    back to the parsed string, then to their _id's generation time.
+    """
+    value = doc.get(field)
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            value = None
+    if not isinstance(value, datetime):
+        value = doc["_id"].generation_time
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+async def backfill_timestamps(db, batch_size: int = 500) -> int:
+    """
+    Store a real datetime on documents whose sort field is missing or not a date
+
+    MongoDB orders and compares values by BSON type, so such documents sort
+    after every dated one and no cursor seek reaches them. Returns the
+    number of documents updated.
+    """
+    updated = 0
+    for name, field in PAGED_FIELDS.items():
+        ops = []
+        async for doc in db[name].find({field: {"$not": {"$type": "date"}}}, {field: 1}):
+            ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {field: sort_timestamp(doc, field)}}))
+            if len(ops) >= batch_size:
+                updated += (await db[name].bulk_write(ops, ordered=False)).modified_count
+                ops = []
+        if ops:
+            updated += (await db[name].bulk_write(ops, ordered=False)).modified_count
+    return updated
+
+
+def encode_cursor(doc: dict, field: str) -> str:
+    """Opaque cursor pointing just past doc in (field, _id) descending order"""
+    payload = json.dumps({"t": sort_timestamp(doc, field).isoformat(), "id": str(doc["_id"])}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """Parse a cursor from encode_cursor, raising 400 if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["t"]), ObjectId(payload["id"])
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def keyset_query(base: dict, field: str, cursor: Optional[str]) -> dict:
+    """Add the seek condition for the page after cursor to a base filter"""
+    if not cursor:
+        return base
+    timestamp, last_id = decode_cursor(cursor)
+    return {
+        **base,
+        "$or": [
+            {field: {"$lt": timestamp}},
+            {field: timestamp, "_id": {"$lt": last_id}},
+        ],
+    }
+
+
+async def fetch_page(collection, base: dict, field: str, projection: dict,
+                     cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE) -> Tuple[List[dict], Optional[str]]:
+    """
+    One page of documents newest first
+
+    Returns:
+        (documents, cursor for the next page or None)
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    query = keyset_query(base, field, cursor)
+    # Fetch one extra document to learn whether another page exists
+    docs = await collection.find(query, projection).sort([(field, -1), ("_id", -1)]).limit(limit + 1).to_list(length=limit + 1)
+    if len(docs) > limit:
+        docs = docs[:limit]
+        return docs, encode_cursor(docs[-1], field)
+    return docs, None
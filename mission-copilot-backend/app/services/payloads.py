@@ -0,0 +1,135 @@
+"""
+Content-addressed storage for mission payloads
+Each distinct payload is stored once, compressed, under the SHA-256 of its
+canonical JSON; missions and chat messages keep only the hash
+"""
+
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterable, List
+import hashlib
+import zlib
+from bson import Binary, json_util
+from bson.json_util import RELAXED_JSON_OPTIONS
+from pymongo import UpdateOne
+
+from app.services.cache import DocumentCache
+
+try:
+    import zstandard
+except ImportError:  # optional: fall back to zlib
+    zstandard = None
+
+COLLECTION = "mission_payloads"
+
+ZSTD_LEVEL = 3
+ZLIB_LEVEL = 6
+
+# Payloads are immutable, so decoded ones can be cached for a long time
+payload_cache = DocumentCache(ttl_s=3600.0, max_bytes=32 * 1024 * 1024)
+
+# Hashes known to be stored already, so repeated saves skip the round-trip
+_MAX_KNOWN = 10000
+_known: "OrderedDict[str, None]" = OrderedDict()
+
+
+def canonical_bytes(data) -> bytes:
+    """Key-sorted compact Extended JSON, identical for equal payloads"""
+    return json_util.dumps(data, sort_keys=True, separators=(",", ":"), json_options=RELAXED_JSON_OPTIONS).encode()
+
+
+def payload_hash(data) -> str:
+    return hashlib.sha256(canonical_bytes(data)).hexdigest()
+
+
+def compress(raw: bytes):
+    """(codec, compressed bytes) using zstd when installed, else zlib"""
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    return "zlib", zlib.compress(raw, ZLIB_LEVEL)
+
+
+def decompress(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Payload is zstd-compressed but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == "zlib":
+        return zlib.decompress(data)
+    raise ValueError(f"Unknown payload codec: {codec}")
+
+
+def _remember(digest: str):
+    _known[digest] = None
+    _known.move_to_end(digest)
+    if len(_known) > _MAX_KNOWN:
+        _known.popitem(last=False)
+
+
+async def store_payloads(db, payloads: Iterable) -> List[str]:
+    """
+    Store payloads that are not stored yet and return their hashes
+
+    Upserts with $setOnInsert only, so saving an existing payload changes nothing.
+    """
+    digests, ops = [], {}
+    for data in payloads:
+        raw = canonical_bytes(data)
+        digest = hashlib.sha256(raw).hexdigest()
+        digests.append(digest)
+        if digest in _known or digest in ops:
+            continue
+        codec, packed = compress(raw)
+        ops[digest] = UpdateOne(
+            {"_id": digest},
+            {"$setOnInsert": {"codec": codec, "data": Binary(packed), "size": len(raw), "createdAt": datetime.utcnow()}},
+            upsert=True,
+        )
+
+    if ops:
+        await db[COLLECTION].bulk_write(list(ops.values()), ordered=False)
+        for digest in ops:
+            _remember(digest)
+    return digests
+
+
+async def load_payloads(db, digests: Iterable[str]) -> Dict[str, object]:
+    """Decoded payloads by hash (missing hashes are left out)"""
+    found, missing = {}, []
+    for digest in dict.fromkeys(digests):
+        cached = payload_cache.get(digest)
+        if cached is not None:
+            found[digest] = cached["v"]
+        else:
+            missing.append(digest)
+
+    if missing:
+        version = payload_cache.version
+        async for doc in db[COLLECTION].find({"_id": {"$in": missing}}):
+            data = json_util.loads(decompress(doc["codec"], doc["data"]))
+            found[doc["_id"]] = data
+            payload_cache.put([doc["_id"]], {"v": data}, version)
+            _remember(doc["_id"])
+    return found
+
+
+async def externalize(db, docs: List[dict], field: str, ref_field: str):
+    """Replace doc[field] with doc[ref_field] = payload hash, in place"""
+    holders = [doc for doc in docs if isinstance(doc, dict) and doc.get(field) is not None]
+    if not holders:
+        return
+    digests = await store_payloads(db, [doc[field] for doc in holders])
+    for doc, digest in zip(holders, digests):
+        del doc[field]
+        doc[ref_field] = digest
+
+
+async def resolve(db, docs: List[dict], field: str, ref_field: str):
+    """Replace doc[ref_field] with the payload as doc[field], in place"""
+    holders = [doc for doc in docs if isinstance(doc, dict) and ref_field in doc]
+    if not holders:
+        return
+    payloads = await load_payloads(db, [doc[ref_field] for doc in holders])
+    for doc in holders:
+        digest = doc.pop(ref_field)
+        doc[field] = payloads.get(digest)
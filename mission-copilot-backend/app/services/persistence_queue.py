@@ -0,0 +1,169 @@
+"""
+Write-behind persistence for generated missions
+Requests hand finished documents to an in-process queue and return at once;
+a background task writes them in batches with insert_many
+"""
+
+from datetime import datetime
+from typing import Awaitable, Callable, List, Optional
+import asyncio
+import logging
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+from app.core.config import get_database_settings
+from app.services import database, payloads
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_KEY = 11000
+
+
+class WriteBehindQueue:
+    """
+    Bounded async queue flushed by size or age
+
+    A batch is written once it holds max_batch documents or its oldest
+    document has waited flush_interval_s. When max_pending documents are
+    waiting, enqueue blocks for up to enqueue_timeout_s and then writes the
+    document itself, so a slow database pushes back on callers instead of
+    growing memory.
+    """
+
+    def __init__(self, collection: str, prepare: Optional[Callable[[object, List[dict]], Awaitable[None]]] = None,
+                 max_batch: int = 100, flush_interval_s: float = 1.0, max_pending: int = 1000,
+                 enqueue_timeout_s: float = 0.5, max_retries: int = 3):
+        self.collection = collection
+        self.prepare = prepare
+        self.max_batch = max_batch
+        self.flush_interval_s = flush_interval_s
+        self.max_pending = max_pending
+        self.enqueue_timeout_s = enqueue_timeout_s
+        self.max_retries = max_retries
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.written = 0
+        self.dropped = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        if not self.running:
+            self._queue = asyncio.Queue(maxsize=self.max_pending)
+            self._task = asyncio.create_task(self._run())
+
+    async def enqueue(self, doc: dict):
+        """Queue a document for writing (gives it an _id so callers can reference it)"""
+        doc.setdefault("_id", ObjectId())
+        if not self.running:
+            await self._write([doc])
+            return
+        try:
+            await asyncio.wait_for(self._queue.put(doc), self.enqueue_timeout_s)
+        except asyncio.TimeoutError:
+            logger.warning(f"⚠️ {self.collection} write-behind queue full, writing inline")
+            await self._write([doc])
+
+    async def drain(self):
+        """Flush everything queued and stop the background task (application shutdown)"""
+        if not self.running:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval_s
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                await self._write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _write(self, docs: List[dict]):
+        """insert_many with retries; duplicate _ids from a retried batch count as written"""
+        delay = 0.5
+        for attempt in range(self.max_retries + 1):
+            db = database.get_database()
+            try:
+                if db is None:
+                    raise RuntimeError("MongoDB is not connected")
+                if self.prepare is not None:
+                    await self.prepare(db, docs)
+                await db[self.collection].insert_many(docs, ordered=False)
+                self.written += len(docs)
+                return
+            except BulkWriteError as e:
+                errors = e.details.get("writeErrors", [])
+                if all(err.get("code") == DUPLICATE_KEY for err in errors):
+                    self.written += len(docs)
+                    return
+                failure = e
+            except Exception as e:
+                failure = e
+
+            if attempt < self.max_retries:
+                await asyncio.sleep(delay)
+                delay *= 2
+
+        self.dropped += len(docs)
+        logger.error(f"❌ Dropped {len(docs)} {self.collection} documents after {self.max_retries} retries: {failure}")
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "pending": self._queue.qsize() if self._queue else 0,
+            "written": self.written,
+            "dropped": self.dropped,
+        }
+
+
+async def _prepare_missions(db, docs: List[dict]):
+    await payloads.externalize(db, docs, "data", "dataRef")
+
+
+def _mission_queue() -> WriteBehindQueue:
+    settings = get_database_settings()
+    return WriteBehindQueue(
+        "missions",
+        prepare=_prepare_missions,
+        max_batch=settings.write_behind_batch_size,
+        flush_interval_s=settings.write_behind_flush_interval_s,
+        max_pending=settings.write_behind_max_pending,
+    )
+
+
+mission_queue = _mission_queue()
+
+
+async def persist_mission(query: str, data: dict, userId: str = "temp-user") -> str:
+    """Queue a generated mission in the shape create_mission stores; returns its id"""
+    now = datetime.utcnow()
+    doc = {
+        "userId": userId,
+        "query": query,
+        "mission_name": data.get("mission_name"),
+        "data": dict(data),
+        "createdAt": now,
+        "updatedAt": now,
+    }
+    await mission_queue.enqueue(doc)
+    return str(doc["_id"])
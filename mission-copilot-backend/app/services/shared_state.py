@@ -0,0 +1,292 @@
+"""
+State shared by all workers on a host
+Values (live-data snapshot, LLM responses) are stored once for every
+uvicorn/gunicorn worker, and single-flight locks make sure only one worker
+recomputes an expired value while the others wait for its result.
+
+Backends:
+    file  - one memory-mapped file per key in a tmpfs directory (/dev/shm when
+            available) with fcntl locks; no extra services needed
+    redis - a local Redis-compatible server (needs the optional redis package)
+"""
+
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional, Union
+import asyncio
+import fcntl
+import hashlib
+import inspect
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import time
+import uuid
+import weakref
+import orjson
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import SharedStateSettings, get_shared_state_settings
+
+logger = logging.getLogger(__name__)
+
+# Value files start with their expiry time (unix seconds, little-endian double)
+_HEADER = struct.Struct("<d")
+
+# Expired value files are swept after this many writes
+PRUNE_EVERY = 64
+
+
+# Marks a bytes value stored as-is; JSON text never starts with a NUL
+_RAW = b"\x00"
+
+
+def _encode(value: Any) -> bytes:
+    """orjson for plain values; bytes (e.g. packed arrays) are stored raw"""
+    if isinstance(value, bytes):
+        return _RAW + value
+    return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+
+def _decode(data: bytes) -> Any:
+    if data[:1] == _RAW:
+        return data[1:]
+    return orjson.loads(data)
+
+
+class FileBackend:
+    """Values and locks as files in a tmpfs directory shared by every worker"""
+
+    name = "file"
+
+    def __init__(self, directory: str = "", max_files: int = 4096):
+        if not directory:
+            base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+            directory = os.path.join(base, "planexa-shared")
+        self.directory = Path(directory)
+        self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        self.max_files = max_files
+        self._writes = 0
+        self._locks = {}
+
+    def _path(self, key: str, suffix: str) -> Path:
+        return self.directory / (hashlib.sha256(key.encode()).hexdigest()[:32] + suffix)
+
+    async def get(self, key: str) -> Optional[Any]:
+        try:
+            with open(self._path(key, ".val"), "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                (expires_at,) = _HEADER.unpack_from(data)
+                if expires_at < time.time():
+                    return None
+                return _decode(data[_HEADER.size:])
+        except (FileNotFoundError, ValueError, struct.error):
+            return None
+
+    async def set(self, key: str, value: Any, ttl_s: float):
+        path = self._path(key, ".val")
+        # Write then rename, so readers never map a partial file
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(time.time() + ttl_s))
+            f.write(_encode(value))
+        os.replace(tmp, path)
+
+        self._writes += 1
+        if self._writes % PRUNE_EVERY == 0:
+            self._prune()
+
+    async def try_lock(self, key: str, ttl_s: float) -> Optional[str]:
+        # flock is released by the kernel if the holder dies, so ttl_s is not needed
+        fd = os.open(self._path(key, ".lock"), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return None
+        token = uuid.uuid4().hex
+        self._locks[token] = fd
+        return token
+
+    async def unlock(self, key: str, token: str):
+        fd = self._locks.pop(token, None)
+        if fd is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def _prune(self):
+        """Delete expired values, then the oldest ones beyond max_files"""
+        now = time.time()
+        live = []
+        for path in self.directory.glob("*.val"):
+            try:
+                with open(path, "rb") as f:
+                    (expires_at,) = _HEADER.unpack(f.read(_HEADER.size))
+                if expires_at < now:
+                    path.unlink()
+                else:
+                    live.append((path.stat().st_mtime, path))
+            except (FileNotFoundError, struct.error):
+                continue
+        for _, path in sorted(live)[:max(0, len(live) - self.max_files)]:
+            path.unlink(missing_ok=True)
+
+
+class RedisBackend:
+    """Values and locks in a Redis-compatible server (SET NX PX locks)"""
+
+    name = "redis"
+
+    # Deletes the lock only if this worker still owns it
+    _UNLOCK = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+
+    def __init__(self, url: str, prefix: str = "planexa:"):
+        import redis.asyncio as redis
+
+        self.redis = redis.from_url(url)
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[Any]:
+        data = await self.redis.get(self.prefix + key)
+        return _decode(data) if data is not None else None
+
+    async def set(self, key: str, value: Any, ttl_s: float):
+        await self.redis.set(self.prefix + key, _encode(value), px=max(1, int(ttl_s * 1000)))
+
+    async def try_lock(self, key: str, ttl_s: float) -> Optional[str]:
+        token = uuid.uuid4().hex
+        acquired = await self.redis.set(f"{self.prefix}lock:{key}", token, nx=True, px=max(1, int(ttl_s * 1000)))
+        return token if acquired else None
+
+    async def unlock(self, key: str, token: str):
+        await self.redis.eval(self._UNLOCK, 1, f"{self.prefix}lock:{key}", token)
+
+
+class SharedState:
+    """
+    Shared key-value store with single-flight recomputation
+
+    Backend errors never fail a request: the value is computed locally instead.
+    """
+
+    def __init__(self, backend, lock_timeout_s: float = 30.0):
+        self.backend = backend
+        self.lock_timeout_s = lock_timeout_s
+        self._local_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        self.hits = 0
+        self.computed = 0
+        self.errors = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        try:
+            return await self.backend.get(key)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"⚠️ Shared state read failed for {key}: {e}")
+            return None
+
+    async def set(self, key: str, value: Any, ttl_s: float):
+        try:
+            await self.backend.set(key, value, ttl_s)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"⚠️ Shared state write failed for {key}: {e}")
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Union[Any, Awaitable[Any]]], ttl_s: float) -> Any:
+        """
+        Cached value for key, or compute and share it
+
+        Only one caller across all workers runs compute for an expired key;
+        the rest wait (up to lock_timeout_s) and reuse its result. Synchronous
+        compute functions run in the threadpool.
+        """
+        value = await self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        # Collapse callers inside this worker before competing with other workers
+        local_lock = self._local_locks.get(key)
+        if local_lock is None:
+            local_lock = self._local_locks[key] = asyncio.Lock()
+
+        async with local_lock:
+            value = await self.get(key)
+            if value is not None:
+                self.hits += 1
+                return value
+
+            token, value = await self._acquire(key)
+            try:
+                if value is not None:
+                    self.hits += 1
+                    return value
+                if inspect.iscoroutinefunction(compute):
+                    value = await compute()
+                else:
+                    value = await run_in_threadpool(compute)
+                self.computed += 1
+                if value is not None:
+                    await self.set(key, value, ttl_s)
+                return value
+            finally:
+                if token is not None:
+                    try:
+                        await self.backend.unlock(key, token)
+                    except Exception as e:
+                        logger.warning(f"⚠️ Shared state unlock failed for {key}: {e}")
+
+    async def _acquire(self, key: str):
+        """
+        Wait for the key's lock or for another worker to publish the value
+
+        Returns:
+            (lock token or None, value or None); (None, None) after
+            lock_timeout_s, in which case the caller computes without the lock
+        """
+        deadline = time.monotonic() + self.lock_timeout_s
+        delay = 0.02
+        while True:
+            try:
+                token = await self.backend.try_lock(key, self.lock_timeout_s)
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"⚠️ Shared state lock failed for {key}: {e}")
+                return None, None
+            if token is not None:
+                # The previous holder may have published just before releasing
+                return token, await self.get(key)
+
+            value = await self.get(key)
+            if value is not None or time.monotonic() >= deadline:
+                return None, value
+            await asyncio.sleep(delay)
+            delay = min(0.25, delay * 2)
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend.name,
+            "hits": self.hits,
+            "computed": self.computed,
+            "errors": self.errors,
+        }
+
+
+def create_shared_state(settings: SharedStateSettings) -> SharedState:
+    if settings.backend == "redis" or (settings.backend == "auto" and settings.redis_url):
+        try:
+            return SharedState(RedisBackend(settings.redis_url), settings.lock_timeout_s)
+        except ImportError:
+            logger.warning("⚠️ redis package not installed, sharing state through files instead")
+    return SharedState(FileBackend(settings.directory), settings.lock_timeout_s)
+
+
+_shared_state: Optional[SharedState] = None
+
+
+def get_shared_state() -> SharedState:
+    """Process-wide SharedState, created on first use"""
+    global _shared_state
+    if _shared_state is None:
+        _shared_state = create_shared_state(get_shared_state_settings())
+    return _shared_state
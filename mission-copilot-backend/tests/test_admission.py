@@ -0,0 +1,84 @@
+"""
+Admission control under load
+With every LLM slot busy, requests queue, then get the fallback, then a 429;
+fallbacks in progress count toward the bound
+"""
+
+import asyncio
+from contextlib import AsyncExitStack
+
+import pytest
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from app.core.config import AdmissionSettings
+from app.services.admission import AdmissionController
+
+
+def _controller(**overrides) -> AdmissionController:
+    settings = dict(rate_per_minute=6000.0, burst=100, max_concurrent=1, queue_timeout_s=5.0,
+                    degrade_queue_depth=1, max_queue=3)
+    settings.update(overrides)
+    return AdmissionController(AdmissionSettings(**settings))
+
+
+def test_sheds_load_in_stages():
+    async def scenario():
+        controller = _controller()
+        release = asyncio.Event()
+        tickets = []
+
+        async def hold(key):
+            async with controller.admit([key]) as ticket:
+                tickets.append(ticket.degraded)
+                await release.wait()
+
+        async with AsyncExitStack() as stack:
+            # One request holds the only slot, one waits for it
+            tasks = [asyncio.ensure_future(hold("a")), asyncio.ensure_future(hold("b"))]
+            await asyncio.sleep(0)
+
+            # The queue is at degrade_queue_depth: the next two get the fallback
+            for key in ("c", "d"):
+                ticket = await stack.enter_async_context(controller.admit([key]))
+                tickets.append(ticket.degraded)
+
+            # One waiting plus two fallbacks reach max_queue
+            with pytest.raises(HTTPException) as rejected:
+                async with controller.admit(["e"]):
+                    pass
+
+            stats = controller.stats()
+            release.set()
+            await asyncio.gather(*tasks)
+        return tickets, rejected.value, stats, controller.stats()
+
+    tickets, rejected, during, after = asyncio.run(scenario())
+    assert tickets == [False, True, True, False]
+    assert rejected.status_code == 429
+    assert int(rejected.headers["Retry-After"]) >= 1
+    assert during["waiting"] == 1 and during["degrading"] == 2
+    assert after["degrading"] == 0 and after["active"] == 0
+    assert after["admitted"] == 2 and after["degraded"] == 2 and after["rejected"] == 1
+
+
+def test_rate_limit_per_client():
+    async def scenario():
+        controller = _controller(rate_per_minute=1.0, burst=2, max_concurrent=4)
+        outcomes = []
+        for _ in range(3):
+            try:
+                async with controller.admit(["ip:1"]):
+                    outcomes.append("ok")
+            except HTTPException as e:
+                outcomes.append(e.status_code)
+        async with controller.admit(["ip:2"]):
+            outcomes.append("other client ok")
+        return outcomes
+
+    assert asyncio.run(scenario()) == ["ok", "ok", 429, "other client ok"]
+
+
+def test_degrade_depth_must_be_below_max_queue():
+    with pytest.raises(ValidationError):
+        AdmissionSettings(degrade_queue_depth=8, max_queue=8)
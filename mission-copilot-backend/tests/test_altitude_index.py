@@ -0,0 +1,101 @@
+"""
+Altitude-interval congestion screening
+Shell counts must match brute force overall and per inclination band, stay
+exact across catalog deltas, and candidate orbits are screened against the
+objects in their own band
+"""
+
+import numpy as np
+import pytest
+
+from app import main
+from app.calculators.propagation import EARTH_RADIUS_KM, MU_KM3_S2
+from app.core.altitude_index import INCLINATION_BANDS, AltitudeIndex
+from app.core.catalog import Catalog, CatalogStore
+from app.core.live_data import empty_insights
+
+N_SHELL = 1000
+N_SPREAD = 1000
+
+
+def _catalog(norad_id, perigee_km, apogee_km, inclination_deg, epoch_s=0.0) -> Catalog:
+    a = (perigee_km + apogee_km) / 2 + EARTH_RADIUS_KM
+    zeros = np.zeros(len(norad_id))
+    return Catalog(
+        np.asarray(norad_id, dtype=np.int64),
+        [f"OBJ-{i}" for i in norad_id],
+        zeros + epoch_s,
+        np.sqrt(MU_KM3_S2 / a ** 3),
+        (apogee_km - perigee_km) / (2 * a),
+        np.radians(inclination_deg),
+        zeros, zeros, zeros,
+    )
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    rng = np.random.default_rng(3)
+    # A dense 53 degree shell around 550 km, and sun-synchronous objects spread thinly over LEO
+    perigee = np.concatenate([rng.uniform(540, 560, N_SHELL), rng.uniform(300, 2000, N_SPREAD)])
+    apogee = perigee + np.concatenate([np.zeros(N_SHELL), rng.uniform(0, 20, N_SPREAD)])
+    inclination = np.concatenate([np.full(N_SHELL, 53.0), np.full(N_SPREAD, 97.6)])
+    return _catalog(np.arange(1, N_SHELL + N_SPREAD + 1), perigee, apogee, inclination)
+
+
+def _brute(catalog, lo, hi, inclination_deg=None):
+    crossing = (catalog.perigee_km <= hi) & (catalog.apogee_km >= lo)
+    if inclination_deg is not None:
+        band = np.searchsorted(INCLINATION_BANDS, np.degrees(catalog.inclination), side="right")
+        crossing &= band == np.searchsorted(INCLINATION_BANDS, inclination_deg, side="right")
+    return int(crossing.sum())
+
+
+def _assert_counts_match(index, catalog):
+    for lo in np.arange(200.0, 2100.0, 37.0):
+        for inclination in (None, 10.0, 53.0, 97.6):
+            assert index.count_crossing(lo, lo + 50, inclination) == _brute(catalog, lo, lo + 50, inclination)
+
+
+def test_count_crossing_matches_brute_force(catalog):
+    _assert_counts_match(AltitudeIndex(catalog), catalog)
+
+
+def test_congestion_is_screened_per_band(catalog):
+    index = AltitudeIndex(catalog)
+    assert index.is_congested(550.0)
+    assert index.is_congested(550.0, inclination_deg=53.0)
+    assert not index.is_congested(550.0, inclination_deg=97.6)
+
+    assert index.nearest_clear_shell(550.0, inclination_deg=97.6) == 550.0
+    # Upward first, to a shell that only the top of the 540-560 km band still reaches
+    clear = index.nearest_clear_shell(550.0, inclination_deg=53.0)
+    assert 575.0 < clear <= 590.0
+    assert not index.is_congested(clear, inclination_deg=53.0)
+
+
+def test_delta_keeps_counts_exact(catalog):
+    store = CatalogStore()
+    store.ingest(catalog, "active")
+    index = AltitudeIndex(store.catalog)
+
+    # Raise part of the shell, drop some sun-synchronous objects and add new ones
+    moved = np.arange(1, 301)
+    raised = _catalog(moved, np.full(300, 800.0), np.full(300, 820.0), np.full(300, 53.0), epoch_s=1.0)
+    kept = catalog.take(np.arange(300, len(catalog) - 200))
+    added = _catalog(np.arange(5001, 5051), np.full(50, 400.0), np.full(50, 450.0), np.full(50, 10.0), epoch_s=1.0)
+    delta = store.ingest(Catalog.concat(Catalog.concat(raised, kept), added), "active")
+
+    updated = index.apply(delta)
+    assert updated.size == len(store.catalog)
+    _assert_counts_match(updated, store.catalog)
+
+
+def test_mission_orbit_uses_its_inclination_band(catalog, monkeypatch):
+    monkeypatch.setattr(main, "current_altitude_index", lambda: AltitudeIndex(catalog))
+    live_insights = empty_insights()
+
+    sso = main.apply_live_data_to_mission({"altitude_km": 550, "inclination_deg": 97.6}, live_insights)
+    assert sso["adjusted_altitude_km"] == 550
+
+    shell = main.apply_live_data_to_mission({"altitude_km": 550, "inclination_deg": 53.0}, live_insights)
+    assert shell["adjusted_altitude_km"] > 575
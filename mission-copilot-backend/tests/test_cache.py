@@ -0,0 +1,65 @@
+"""
+Document cache invalidation across workers
+Each DocumentCache stands in for one worker's copy; they share version
+stamps through a file-backed shared state, as workers on one host do
+"""
+
+import asyncio
+
+import pytest
+
+from app.services import shared_state
+from app.services.cache import DocumentCache
+
+
+@pytest.fixture(autouse=True)
+def isolated_shared_state(tmp_path, monkeypatch):
+    monkeypatch.setattr(shared_state, "_shared_state", shared_state.SharedState(shared_state.FileBackend(str(tmp_path))))
+
+
+def _workers():
+    return [DocumentCache(shared_name="chats", stamp_field="chatId") for _ in range(2)]
+
+
+def _chat(version):
+    return {"id": "64b0c0ffee", "chatId": "c1", "version": version, "messages": []}
+
+
+def test_write_on_one_worker_invalidates_the_others():
+    async def scenario():
+        a, b = _workers()
+        b.put(["64b0c0ffee", "c1"], _chat(1), b.version)
+        before = await b.fetch("64b0c0ffee")
+
+        await a.publish("c1", version=2)
+        after = await b.fetch("64b0c0ffee")
+
+        # Refilled with the current version, the entry is served again
+        b.put(["64b0c0ffee", "c1"], _chat(2), b.version)
+        refilled = await b.fetch("c1")
+        return before, after, refilled
+
+    before, after, refilled = asyncio.run(scenario())
+    assert before["version"] == 1
+    assert after is None
+    assert refilled["version"] == 2
+
+
+def test_publish_without_version_misses_everywhere():
+    async def scenario():
+        a, b = _workers()
+        b.put(["c1"], _chat(3), b.version)
+        await a.publish("c1")  # e.g. deleted
+        return await b.fetch("c1")
+
+    assert asyncio.run(scenario()) is None
+
+
+def test_local_cache_ignores_shared_state():
+    async def scenario():
+        cache = DocumentCache()
+        cache.put(["k"], {"id": "k", "value": 1}, cache.version)
+        await DocumentCache(shared_name=None).publish("k")
+        return await cache.fetch("k")
+
+    assert asyncio.run(scenario())["value"] == 1
@@ -0,0 +1,185 @@
+"""
+GP catalog ingest
+The stream parser must build the same catalog as parsing the whole body,
+merges must keep only advanced epochs, and a refresh must reach Celestrak
+once however many workers ask for it
+"""
+
+import asyncio
+import json
+
+import numpy as np
+import pytest
+from starlette.concurrency import run_in_threadpool
+
+from app.core import altitude_index
+from app.core import catalog as catalog_module
+from app.core import live_data
+from app.core.catalog import Catalog, CatalogStore, GPStreamParser, _ELEMENT_FIELDS
+from app.services import shared_state
+
+
+def _record(norad_id, day=1, name=None, mean_motion=15.1):
+    return {
+        "OBJECT_NAME": name or f"SAT-{norad_id}",
+        "EPOCH": f"2024-05-{day:02d}T06:12:34.567890",
+        "MEAN_MOTION": mean_motion,
+        "ECCENTRICITY": 0.0012,
+        "INCLINATION": 51.6 + norad_id % 40,
+        "RA_OF_ASC_NODE": 10.0 * (norad_id % 36),
+        "ARG_OF_PERICENTER": 90.0,
+        "MEAN_ANOMALY": 270.0,
+        "NORAD_CAT_ID": norad_id,
+    }
+
+
+def _stream(body: bytes, chunk_size: int) -> Catalog:
+    parser = GPStreamParser()
+    for start in range(0, len(body), chunk_size):
+        parser.feed(body[start:start + chunk_size])
+    return parser.finish()
+
+
+def _assert_same(a: Catalog, b: Catalog):
+    assert np.array_equal(a.norad_id, b.norad_id)
+    assert a.names == b.names
+    for field in _ELEMENT_FIELDS:
+        assert np.array_equal(getattr(a, field), getattr(b, field)), field
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+@pytest.mark.parametrize("chunk_size", [7, 4096, 300_000])
+def test_stream_parser_matches_whole_body(indent, chunk_size):
+    records = [_record(i, day=1 + i % 28) for i in range(1, 3000)]
+    # Braces and quotes inside strings must not cut a record
+    records[100]["OBJECT_NAME"] = 'BRACE } { "Q"'
+    records[2000]["OBJECT_NAME"] = "}" * 300
+    # Malformed records are skipped, as by from_gp
+    records[500]["MEAN_MOTION"] = None
+    del records[1500]["EPOCH"]
+
+    body = json.dumps(records, indent=indent).encode()
+    _assert_same(_stream(body, chunk_size), Catalog.from_gp(records))
+
+
+def test_stream_parser_keeps_latest_epoch_per_object():
+    records = [_record(5, day=1), _record(5, day=9, mean_motion=15.2), _record(3)] * 500
+    parsed = _stream(json.dumps(records).encode(), 3000)
+    assert parsed.norad_id.tolist() == [3, 5]
+    assert parsed.mean_motion[1] == pytest.approx(15.2 * 2 * np.pi / 86400.0)
+
+
+@pytest.mark.parametrize("body", [b"[]", b"  [ ]  ", b"\n[\n]\n"])
+def test_stream_parser_accepts_empty_array(body):
+    assert len(_stream(body, 1)) == 0
+
+
+@pytest.mark.parametrize("body", [b"", b"No GP data found", b'{"error": 1}', b'[{"NORAD_CAT_ID": 1}'])
+def test_stream_parser_rejects_non_gp_bodies(body):
+    with pytest.raises(ValueError):
+        _stream(body, 3)
+
+
+def test_ingest_merges_by_norad_id():
+    store = CatalogStore()
+    first = store.ingest(Catalog.from_gp([_record(1), _record(2), _record(3)]), "active")
+    assert first.added.tolist() == [1, 2, 3]
+
+    # 1 unchanged, 2 advanced, 3 re-listed with an older epoch, 4 new, and the group dropped nothing
+    delta = store.ingest(Catalog.from_gp([_record(1), _record(2, day=5), _record(3, day=1), _record(4)]), "active")
+    assert delta.added.tolist() == [4]
+    assert delta.updated.tolist() == [2]
+    assert delta.removed.tolist() == []
+    assert store.catalog.norad_id.tolist() == [1, 2, 3, 4]
+    assert store.version == 2
+
+    # Nothing changed: no new catalog, no version bump
+    unchanged = store.catalog
+    assert len(store.ingest(Catalog.from_gp([_record(1), _record(2, day=5), _record(3), _record(4)]), "active")) == 0
+    assert store.catalog is unchanged and store.version == 2
+
+
+def test_ingest_removes_objects_no_group_lists():
+    store = CatalogStore()
+    store.ingest(Catalog.from_gp([_record(1), _record(2), _record(3)]), "active")
+    store.ingest(Catalog.from_gp([_record(3), _record(9)]), "debris")
+
+    # 2 is gone; 3 left "active" but "debris" still lists it
+    delta = store.ingest(Catalog.from_gp([_record(1)]), "active")
+    assert delta.removed.tolist() == [2]
+    assert store.catalog.norad_id.tolist() == [1, 3, 9]
+    assert store.group_size("active") == 1
+
+
+@pytest.mark.parametrize("size", [0, 1, 199])
+def test_packed_catalog_round_trips_through_shared_state(tmp_path, size):
+    state = shared_state.SharedState(shared_state.FileBackend(str(tmp_path)))
+    original = Catalog.from_gp([_record(i, day=1 + i % 28) for i in range(1, size + 1)])
+
+    async def scenario():
+        await state.set("pull", original.to_bytes(pulled_at=12.5), 60.0)
+        return await state.get("pull")
+
+    catalog, meta = Catalog.from_bytes(asyncio.run(scenario()))
+    _assert_same(catalog, original)
+    assert meta == {"pulled_at": 12.5}
+    # The arrays are views of the stored bytes, not parsed copies
+    assert not catalog.epoch_s.flags.owndata and catalog.epoch_s.dtype == np.float64
+
+
+def test_json_values_still_round_trip(tmp_path):
+    state = shared_state.SharedState(shared_state.FileBackend(str(tmp_path)))
+
+    async def scenario():
+        await state.set("json", {"satellites": np.arange(3)}, 60.0)
+        return await state.get("json")
+
+    assert asyncio.run(scenario()) == {"satellites": [0, 1, 2]}
+
+
+@pytest.fixture
+def shared(tmp_path, monkeypatch):
+    monkeypatch.setattr(shared_state, "_shared_state", shared_state.SharedState(shared_state.FileBackend(str(tmp_path))))
+
+
+def test_refresh_fetches_once_for_all_workers(shared, monkeypatch):
+    fetched = []
+
+    def fetch_group(group):
+        fetched.append(group)
+        return Catalog.from_gp([_record(i) for i in range(1, 50)])
+
+    monkeypatch.setattr(catalog_module, "fetch_group", fetch_group)
+    workers = [CatalogStore() for _ in range(3)]
+
+    async def scenario():
+        # Sync callers run in the threadpool, as the routes and pipeline stages do
+        await asyncio.gather(*(run_in_threadpool(store.refresh_if_stale, 600.0) for store in workers))
+        return await asyncio.gather(*(run_in_threadpool(store.refresh_if_stale, 600.0) for store in workers))
+
+    catalogs = asyncio.run(scenario())
+    assert fetched == ["active"]
+    for store, catalog in zip(workers, catalogs):
+        assert store.catalog is catalog and store.version == 1
+        _assert_same(catalog, catalogs[0])
+
+
+def _no_compute():
+    raise AssertionError("snapshot recomputed")
+
+
+def test_snapshot_reader_builds_altitude_index(shared, monkeypatch):
+    monkeypatch.setattr(catalog_module, "fetch_group", lambda group: Catalog.from_gp([_record(i) for i in range(1, 50)]))
+    # This worker has no catalog or index yet, and another worker already shared the snapshot
+    monkeypatch.setattr(catalog_module, "catalog_store", CatalogStore())
+    monkeypatch.setattr(altitude_index, "_index", None)
+    monkeypatch.setattr(live_data, "fetch_and_analyze_live_data", _no_compute)
+
+    async def scenario():
+        await shared_state.get_shared_state().set("live_insights", live_data.empty_insights(), 60.0)
+        await live_data.get_live_insights()
+
+    asyncio.run(scenario())
+    index = altitude_index.current_altitude_index()
+    assert index is not None and index.size == 49
+    assert index.catalog is catalog_module.catalog_store.catalog
@@ -0,0 +1,225 @@
+"""
+Chat storage round-trips
+Full saves append past the stored messages (a repair save replaces them),
+delta saves are checked against the chat version, and reads return a page
+of messages rather than the whole history; the routes are called directly against an in-memory Motor
+stand-in, so no MongoDB server is needed
+"""
+
+import asyncio
+from urllib.parse import urlencode
+
+import orjson
+import pytest
+from fastapi import FastAPI, HTTPException
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+from app.routers import chats
+from app.schemas.chat import ChatSync
+from app.services import shared_state
+from app.services.cache import chat_cache
+from app.services.database import get_database
+
+
+def _messages(*contents):
+    return [{"id": f"m{i}", "role": "user", "content": content} for i, content in enumerate(contents)]
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(shared_state, "_shared_state", shared_state.SharedState(shared_state.FileBackend(str(tmp_path))))
+    chat_cache.clear()
+    return mongomock_motor.AsyncMongoMockClient()["planexa-test"]
+
+
+async def _read(db, chat_id):
+    response = await chats.get_chat(chat_id, db=db)
+    return orjson.loads(response.body)
+
+
+def test_full_save_replaces_messages(db):
+    async def scenario():
+        await chats.create_chat("c1", "Chat", _messages("m0", "m1", "m2", "m3", "m4"), db=db)
+        await _read(db, "c1")  # fills the read cache
+
+        # Shorter, with message 1 edited
+        saved = await chats.create_chat("c1", "Chat", _messages("m0", "edited", "m2"), repair=True, db=db)
+        return saved, await _read(db, "c1")
+
+    saved, chat = _run(scenario())
+    assert saved["messageCount"] == 3
+    assert [m["content"] for m in chat["messages"]] == ["m0", "edited", "m2"]
+    assert chat["messageCount"] == 3
+    assert chat["version"] == 2
+
+
+def test_full_save_can_grow_again_after_shrinking(db):
+    async def scenario():
+        await chats.create_chat("c1", "Chat", _messages("a", "b", "c", "d"), db=db)
+        await chats.create_chat("c1", "Chat", _messages("a"), db=db)
+        await chats.create_chat("c1", "Chat", _messages("a", "x"), db=db)
+        return await _read(db, "c1")
+
+    chat = _run(scenario())
+    assert [m["content"] for m in chat["messages"]] == ["a", "x"]
+    assert chat["messageCount"] == 2
+
+
+def test_full_save_writes_only_new_messages(db, monkeypatch):
+    written = []
+    write_messages = chats.chat_messages.write_messages
+
+    async def spy(db, chat_id, messages, first_seq=0):
+        written.append((first_seq, len(messages)))
+        await write_messages(db, chat_id, messages, first_seq)
+
+    monkeypatch.setattr(chats.chat_messages, "write_messages", spy)
+
+    async def scenario():
+        await chats.create_chat("c1", "Chat", _messages(*"abc"), db=db)
+        await chats.create_chat("c1", "Chat", _messages(*"abcde"), db=db)
+        return await _read(db, "c1")
+
+    chat = _run(scenario())
+    assert written == [(0, 3), (3, 2)]
+    assert [m["content"] for m in chat["messages"]] == list("abcde")
+
+
+def test_reads_return_one_page_of_messages(db):
+    page = chats.chat_messages.DEFAULT_PAGE_SIZE
+    contents = [str(n) for n in range(page + 5)]
+
+    async def scenario():
+        await chats.create_chat("c1", "Chat", _messages(*contents), db=db)
+        await db.chats.insert_one({"chatId": "legacy", "userId": "temp-user", "name": "Old", "messages": _messages(*contents)})
+        return await _read(db, "c1"), await _read(db, "legacy")
+
+    for chat in _run(scenario()):
+        assert [m["content"] for m in chat["messages"]] == contents[5:]
+        assert chat["nextBefore"] == 5 and chat["messageCount"] == page + 5
+    # Listing projects the header fields only
+    assert "messages" not in chats.SUMMARY_PROJECTION
+
+
+def test_failed_full_save_keeps_the_version(db, monkeypatch):
+    async def broken(*args, **kwargs):
+        raise RuntimeError("connection reset")
+
+    async def scenario():
+        await chats.create_chat("c1", "Chat", _messages("a"), db=db)
+        monkeypatch.setattr(chats.chat_messages, "write_messages", broken)
+        with pytest.raises(HTTPException):
+            await chats.create_chat("c1", "Renamed", _messages("a", "b"), db=db)
+        return await _read(db, "c1")
+
+    chat = _run(scenario())
+    # The header still describes the stored messages
+    assert (chat["version"], chat["name"], chat["messageCount"]) == (1, "Chat", 1)
+    assert [m["content"] for m in chat["messages"]] == ["a"]
+
+
+def test_add_message_returns_the_chat_with_messages(db):
+    async def scenario():
+        await chats.create_chat("c1", "Chat", _messages("a", "b"), db=db)
+        await db.chats.insert_one({"chatId": "legacy", "userId": "temp-user", "name": "Old", "messages": _messages("x")})
+        added = await chats.add_message_to_chat("c1", {"id": "m2", "content": "c"}, db=db)
+        legacy = await chats.add_message_to_chat("legacy", {"id": "m1", "content": "y"}, db=db)
+        return added, legacy, await _read(db, "c1")
+
+    added, legacy, chat = _run(scenario())
+    assert [m["content"] for m in added["messages"]] == ["a", "b", "c"]
+    assert (added["messageCount"], added["version"]) == (3, 2)
+    assert [m["content"] for m in legacy["messages"]] == ["x", "y"] and legacy["messageCount"] == 2
+    assert [m["content"] for m in chat["messages"]] == ["a", "b", "c"] and chat["version"] == 2
+
+
+def _changes(base_version, messages, first=0):
+    return ChatSync(
+        baseVersion=base_version,
+        messages=[{"seq": first + i, "message": message} for i, message in enumerate(messages)],
+    )
+
+
+def test_delta_sync_conflict_then_full_save(db):
+    async def scenario():
+        created = await chats.sync_chat("c1", _changes(0, _messages("a", "b", "c")), db=db)
+        # Another client appends on top of the same version
+        await chats.sync_chat("c1", _changes(created["version"], _messages("other"), first=3), db=db)
+
+        with pytest.raises(HTTPException) as conflict:
+            await chats.sync_chat("c1", _changes(created["version"], [{"id": "m1", "content": "edited"}], first=1), db=db)
+
+        # The client falls back to a repair save of its own copy, one message shorter
+        saved = await chats.create_chat("c1", "Chat", _messages("a", "edited"), repair=True, db=db)
+        return conflict.value, saved, await _read(db, "c1")
+
+    conflict, saved, chat = _run(scenario())
+    assert conflict.status_code == 409
+    assert conflict.detail["version"] == 2
+    assert saved["version"] == 3
+    assert [m["content"] for m in chat["messages"]] == ["a", "edited"]
+    assert chat["messageCount"] == 2
+
+
+def test_delta_sync_rejects_gaps(db):
+    async def scenario():
+        created = await chats.sync_chat("c1", _changes(0, _messages("a")), db=db)
+        await chats.sync_chat("c1", _changes(created["version"], _messages("z"), first=3), db=db)
+
+    with pytest.raises(HTTPException) as gap:
+        _run(scenario())
+    assert gap.value.status_code == 422
+
+
+async def _request(app, method, path, query=None, body=None):
+    """One request through the ASGI app, as the frontend's axios call sends it"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method, "scheme": "http",
+        "path": path, "raw_path": path.encode(), "root_path": "", "query_string": urlencode(query or {}).encode(),
+        "headers": [(b"content-type", b"application/json")], "server": ("test", 80), "client": ("test", 1),
+    }
+    incoming = [{"type": "http.request", "body": orjson.dumps(body) if body is not None else b"", "more_body": False}]
+    sent = []
+
+    async def receive():
+        return incoming.pop(0) if incoming else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    return sent[0]["status"], orjson.loads(b"".join(m.get("body", b"") for m in sent[1:]))
+
+
+def test_conflict_fallback_over_http_keeps_the_history(db):
+    app = FastAPI()
+    app.include_router(chats.router)
+    app.dependency_overrides[get_database] = lambda: db
+    history = _messages("a", "b", "c")
+
+    async def scenario():
+        status, created = await _request(app, "PATCH", "/api/chats/c1", body={
+            "baseVersion": 0, "messages": [{"seq": seq, "message": m} for seq, m in enumerate(history)]
+        })
+        assert status == 200
+        # Another client saves first, so this delta is rejected ...
+        await _request(app, "PATCH", "/api/chats/c1", body={"baseVersion": created["version"], "messages": []})
+        status, _ = await _request(app, "PATCH", "/api/chats/c1", body={
+            "baseVersion": created["version"], "messages": [{"seq": 3, "message": {"id": "m3", "content": "d"}}]
+        })
+        assert status == 409
+        # ... and hybridStorage falls back to saveChat, which posts {messages} as the body
+        status, _ = await _request(app, "POST", "/api/chats", {"chatId": "c1", "name": "Chat", "repair": "true"},
+                                   {"messages": history + [{"id": "m3", "content": "d"}]})
+        assert status == 201
+        return await _request(app, "GET", "/api/chats/c1")
+
+    status, chat = _run(scenario())
+    assert status == 200
+    assert [m["content"] for m in chat["messages"]] == ["a", "b", "c", "d"]
+    assert chat["messageCount"] == 4
@@ -0,0 +1,99 @@
+"""
+Walker constellation search
+The design found must meet its targets with no smaller feasible count,
+repeated requests must be served from the bounded result cache, and a search
+cut short by its budget keeps its progress
+"""
+
+import pytest
+
+from app.calculators import constellation_optimizer as optimizer
+
+TARGET = dict(revisit_hours=12.0, lat_range=(-40.0, 40.0), altitudes=(550.0,), inclination_deg=53.0, swath_km=300.0,
+              budget_s=None)
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    optimizer._cache.clear()
+    yield
+    optimizer.shutdown_optimizer()
+
+
+def test_design_meets_targets_and_is_minimal():
+    design = optimizer.optimize_constellation(**TARGET)
+    assert design is not None
+    assert design["revisit_hours"] <= TARGET["revisit_hours"]
+    assert design["coverage_percent"] >= 90.0
+    assert design["satellites"] % design["planes"] == 0
+    assert design["minimal"]
+
+    # The cache records that every smaller count was searched and infeasible
+    (entry,) = optimizer._cache.values()
+    assert entry == ({k: v for k, v in design.items() if k != "minimal"}, design["satellites"] - 1)
+
+
+def _no_search(*args, **kwargs):
+    raise AssertionError("unexpected search")
+
+
+def test_repeated_request_is_cached(monkeypatch):
+    first = optimizer.optimize_constellation(**TARGET)
+    monkeypatch.setattr(optimizer, "_search", _no_search)
+    assert optimizer.optimize_constellation(**TARGET) == first
+
+
+def test_unreachable_band_is_rejected_without_search(monkeypatch):
+    monkeypatch.setattr(optimizer, "_search", _no_search)
+    design = optimizer.optimize_constellation(12.0, lat_range=(70.0, 80.0), altitudes=(550.0,), inclination_deg=30.0)
+    assert design is None
+
+
+def test_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(optimizer, "_MAX_CACHED", 4)
+    for i in range(10):
+        optimizer._store(("key", i), (None, i))
+    assert list(optimizer._cache) == [("key", i) for i in range(6, 10)]
+    assert optimizer._cached(("key", 0)) is None
+    assert optimizer._cached(("key", 6)) == (None, 6)
+
+
+def test_cached_design_is_served_within_a_zero_budget():
+    with pytest.raises(optimizer.SearchBudgetExceeded):
+        optimizer.optimize_constellation(**dict(TARGET, budget_s=0.0))
+
+    first = optimizer.optimize_constellation(**TARGET)
+    assert optimizer.optimize_constellation(**dict(TARGET, budget_s=0.0)) == first
+
+
+def _levels(rounds):
+    """Stand-in search rounds: 8 or more satellites meet the targets; the budget runs out after `rounds` rounds"""
+    calls = []
+
+    def evaluate_levels(probes, *args, **kwargs):
+        calls.append(dict(probes))
+        if len(calls) > rounds:
+            raise optimizer.SearchBudgetExceeded()
+        return {alt: {"satellites": total, "revisit_hours": 10.0, "altitude_km": alt} if total >= 8 else None
+                for alt, total in probes.items()}
+
+    return evaluate_levels, calls
+
+
+def test_budget_returns_best_design_so_far_and_keeps_progress(monkeypatch):
+    evaluate_levels, calls = _levels(rounds=2)
+    monkeypatch.setattr(optimizer, "_evaluate_levels", evaluate_levels)
+
+    # 4 satellites fail, 8 pass, and the budget runs out in the round trying 6
+    design = optimizer.optimize_constellation(**dict(TARGET, budget_s=60.0))
+    assert [probe[550.0] for probe in calls] == [4, 8, 6]
+    assert design["satellites"] == 8 and not design["minimal"]
+    (entry,) = optimizer._cache.values()
+    assert entry == (None, 4)
+
+    # The next request resumes above the cached infeasible count
+    evaluate_levels, calls = _levels(rounds=10)
+    monkeypatch.setattr(optimizer, "_evaluate_levels", evaluate_levels)
+    design = optimizer.optimize_constellation(**TARGET)
+    assert min(probe[550.0] for probe in calls) > 4
+    assert design["satellites"] == 8 and design["minimal"]
@@ -0,0 +1,63 @@
+"""
+Coverage simulation accuracy and time budget
+Access matrices must match an exact per-cell test, and a day at 1-minute
+steps must stay within the request-time budget for the horizon footprint
+"""
+
+import math
+import time
+
+import numpy as np
+import pytest
+
+from app.calculators.coverage import Grid, _access_matrix, footprint_half_angle, region_bounds, simulate_coverage
+from app.calculators.propagation import mean_motion_rad_s, propagate_circular, walker_elements
+
+# One day at 1-minute steps, global grid, horizon footprint (swath_km=None)
+BUDGET_S = 0.2
+RUNS = 3
+
+
+def _exact(position, grid, half_angle):
+    """Cells within the footprint of any satellite, testing every cell"""
+    n_times, n_sats, _ = position.shape
+    along = position.reshape(-1, 3) @ grid.cells.T
+    return (along >= math.cos(half_angle)).reshape(n_times, n_sats, -1).any(axis=1)
+
+
+@pytest.mark.parametrize("region", ["global", "india", "pacific", "asia-pacific", (60.0, 90.0)])
+@pytest.mark.parametrize("max_cells", [300, 2000])
+def test_horizon_footprint_matches_exact_test(region, max_cells):
+    times = np.arange(0.0, 6 * 3600.0, 60.0)
+    raan, arg_lat = walker_elements(12, 3, 1)
+    position, normal = propagate_circular(550.0, 97.6 if region == (60.0, 90.0) else 53.0, raan, arg_lat, times)
+    half_angle = footprint_half_angle(550.0, None)
+    half_step = float(mean_motion_rad_s(550.0)) * 30.0
+
+    grid = Grid(region_bounds(region)[1], max_cells)
+    covered = _access_matrix(position, normal, grid, half_angle, half_step)
+    assert np.array_equal(covered, _exact(position, grid, half_angle))
+
+
+def test_horizon_footprint_day_within_budget():
+    def run():
+        return simulate_coverage(550.0, 53.0, satellites=24, planes=3, phasing=1, swath_km=None, regions=["global"])
+
+    run()
+    elapsed = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        result = run()
+        elapsed.append(time.perf_counter() - start)
+    assert min(elapsed) < BUDGET_S, f"24-satellite day took {min(elapsed) * 1000:.0f} ms (budget {BUDGET_S * 1000:.0f} ms)"
+
+    stats = result["regions"]["global"]
+    # A 53 degree constellation with a ~15 degree footprint reaches |lat| < 68 of the +-80 grid
+    assert stats["coverage_percent"] == pytest.approx(95.0, abs=1.0)
+    assert stats["max_revisit_hours"] < 12.0
+
+
+def test_swath_limits_coverage():
+    wide = simulate_coverage(550.0, 53.0, 6, 3, swath_km=None, regions=["india"])
+    narrow = simulate_coverage(550.0, 53.0, 6, 3, swath_km=50.0, regions=["india"])
+    assert narrow["regions"]["india"]["time_coverage_percent"] < wide["regions"]["india"]["time_coverage_percent"]
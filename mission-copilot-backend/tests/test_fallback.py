@@ -0,0 +1,76 @@
+"""
+Rule-based mission fallback
+The fallback is where shed requests go, so it must stay cheap: degraded
+requests never search constellations, others search within the budget, and
+profile designs precomputed at startup are reused
+"""
+
+import time
+
+import pytest
+
+from app import main
+from app.calculators import constellation_optimizer as optimizer
+
+DISASTER = "flood disaster monitoring"
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    optimizer._cache.clear()
+    yield
+    optimizer._cache.clear()
+    optimizer.shutdown_optimizer()
+
+
+def _no_search(*args, **kwargs):
+    raise AssertionError("unexpected search")
+
+
+def _designs(revisit_hours, band, starts, cap, *args, **kwargs):
+    """Stand-in search: 24 satellites in 4 planes at every altitude, nothing smaller"""
+    design = {"satellites": 24, "planes": 4, "phasing": 1, "configuration": "Walker 24/4/1", "revisit_hours": 5.0,
+              "coverage_percent": 100.0}
+    return {alt: (dict(design, altitude_km=alt, inclination_deg=98.0), 23) for alt in starts}, False
+
+
+def test_degraded_fallback_keeps_profile_walker(monkeypatch):
+    monkeypatch.setattr(optimizer, "_search", _no_search)
+    mission = main.parse_mission_fallback(DISASTER, degraded=True)
+    assert mission["constellation"]["satellites"] == main.MISSION_PROFILES["disaster"]["satellites"]
+
+
+def test_degraded_fallback_uses_precomputed_design(monkeypatch):
+    monkeypatch.setattr(optimizer, "_search", _designs)
+    main.warm_profile_designs()
+
+    monkeypatch.setattr(optimizer, "_search", _no_search)
+    mission = main.parse_mission_fallback(DISASTER, degraded=True)
+    assert mission["constellation"]["satellites"] == 24
+    assert mission["constellation"]["configuration"] == "Walker 24/4/1"
+
+
+def test_cold_search_stays_within_budget(monkeypatch):
+    monkeypatch.setattr(main, "SEARCH_BUDGET_S", 0.3)
+    start = time.perf_counter()
+    mission = main.parse_mission_fallback(DISASTER)
+    # The budget plus one coverage and pass simulation (an unbounded search takes ~10 s)
+    assert time.perf_counter() - start < 2.0
+    assert mission["constellation"]["satellites"] >= main.MISSION_PROFILES["disaster"]["satellites"]
+
+
+def test_infeasible_revisit_is_flagged(monkeypatch):
+    monkeypatch.setattr(optimizer, "_search", lambda revisit_hours, band, starts, cap, *args, **kwargs: (
+        {alt: (None, cap) for alt in starts}, False))
+    mission = main.parse_mission_fallback(DISASTER)
+    constellation = mission["constellation"]
+    assert constellation["design_status"] == "infeasible"
+    assert constellation["revisit_time"] in constellation["design_note"]
+    assert constellation["satellites"] == main.MISSION_PROFILES["disaster"]["satellites"]
+
+
+def test_optimized_design_is_reported(monkeypatch):
+    monkeypatch.setattr(optimizer, "_search", _designs)
+    constellation = main.parse_mission_fallback(DISASTER)["constellation"]
+    assert constellation["design_status"] == "optimized"
+    assert constellation["design_note"] is None
@@ -0,0 +1,68 @@
+"""
+Drag-decay lifetime tables
+Interpolated lifetimes must follow a direct integration of the decay model
+off the table grid, and respond to altitude, flux and ballistic coefficient
+in the physical direction
+"""
+
+import numpy as np
+import pytest
+
+from app.calculators.lifetime import (
+    MAX_LIFETIME_YEARS,
+    MU_M3_S2,
+    REENTRY_ALTITUDE_KM,
+    SECONDS_PER_YEAR,
+    decay_lifetime_years,
+    density_kg_m3,
+)
+from app.calculators.propagation import EARTH_RADIUS_KM
+
+
+def _integrated(altitude_km, f107, ballistic_coeff):
+    """Decay time by integrating da/dt = -rho * sqrt(mu * a) / B on a fine altitude grid"""
+    altitudes = np.linspace(REENTRY_ALTITUDE_KM, altitude_km, 20001)
+    seconds_per_m = ballistic_coeff / (density_kg_m3(altitudes, f107) * np.sqrt(MU_M3_S2 * (EARTH_RADIUS_KM + altitudes) * 1000.0))
+    return np.trapezoid(seconds_per_m, altitudes * 1000.0) / SECONDS_PER_YEAR
+
+
+@pytest.mark.parametrize("altitude_km", [250.3, 412.7, 550.5, 688.2])
+@pytest.mark.parametrize("f107", [72.5, 152.5, 231.0])
+def test_table_matches_direct_integration(altitude_km, f107):
+    expected = _integrated(altitude_km, f107, 50.0)
+    assert decay_lifetime_years(altitude_km, f107, 50.0) == pytest.approx(expected, rel=0.02)
+
+
+def test_lifetime_moves_in_the_physical_direction():
+    # Below the lifetime cap at every flux
+    altitudes = np.arange(200.0, 700.0, 10.0)
+    fluxes = np.arange(65.0, 300.0, 15.0)
+    years = decay_lifetime_years(altitudes[:, None], fluxes[None, :], 50.0)
+
+    # Higher orbits last longer, more solar activity shortens them
+    assert np.all(np.diff(years, axis=0) > 0)
+    assert np.all(np.diff(years, axis=1) < 0)
+
+
+def test_ballistic_coefficient_scales_lifetime():
+    assert decay_lifetime_years(500.0, 150.0, 100.0) == pytest.approx(2 * decay_lifetime_years(500.0, 150.0, 50.0))
+    # The cap applies after scaling
+    assert decay_lifetime_years(1500.0, 150.0, 500.0) == MAX_LIFETIME_YEARS
+
+
+def test_sweep_matches_scalar_calls():
+    altitudes = np.array([300.0, 450.0, 600.0])
+    fluxes = np.array([70.0, 150.0])
+    coefficients = np.array([20.0, 100.0])
+    sweep = decay_lifetime_years(altitudes[:, None, None], fluxes[None, :, None], coefficients[None, None, :])
+
+    assert sweep.shape == (3, 2, 2)
+    for i, j, k in np.ndindex(sweep.shape):
+        assert sweep[i, j, k] == decay_lifetime_years(altitudes[i], fluxes[j], coefficients[k])
+
+
+def test_reentry_and_flux_clamping():
+    assert decay_lifetime_years(REENTRY_ALTITUDE_KM) == 0.0
+    assert decay_lifetime_years(150.0) == 0.0
+    assert decay_lifetime_years(500.0, 20.0) == decay_lifetime_years(500.0, 60.0)
+    assert decay_lifetime_years(500.0, 400.0) == decay_lifetime_years(500.0, 300.0)
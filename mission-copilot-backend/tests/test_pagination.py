@@ -0,0 +1,100 @@
+"""
+Keyset pagination
+Walking nextCursor must return every document exactly once, newest first,
+even when many share a timestamp or are legacy documents without a stored
+datetime, and bad cursors are rejected
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+from app.services import pagination
+
+START = datetime(2024, 5, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def collection():
+    collection = mongomock_motor.AsyncMongoMockClient()["planexa-test"].chats
+    # Runs of equal timestamps, so pages have to break ties on _id
+    docs = [
+        {"_id": ObjectId(), "userId": "u1" if i % 5 else "u2", "updatedAt": START + timedelta(seconds=i // 4), "n": i}
+        for i in range(57)
+    ]
+    asyncio.run(collection.insert_many(docs))
+    return collection
+
+
+async def _walk(collection, user_id, limit):
+    pages, cursor = [], None
+    while True:
+        docs, cursor = await pagination.fetch_page(collection, {"userId": user_id}, "updatedAt", {"n": 1, "updatedAt": 1}, cursor, limit)
+        pages.append(docs)
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize("limit", [1, 4, 7, 100])
+def test_pages_cover_every_document_once(collection, limit):
+    pages = asyncio.run(_walk(collection, "u1", limit))
+    docs = [doc for page in pages for doc in page]
+
+    expected = sorted(
+        asyncio.run(collection.find({"userId": "u1"}).to_list(length=None)),
+        key=lambda doc: (doc["updatedAt"], doc["_id"]),
+        reverse=True,
+    )
+    assert [doc["n"] for doc in docs] == [doc["n"] for doc in expected]
+    assert all(len(page) == limit for page in pages[:-1])
+    assert 0 < len(pages[-1]) <= limit
+
+
+def test_page_size_is_bounded(collection, monkeypatch):
+    monkeypatch.setattr(pagination, "MAX_PAGE_SIZE", 10)
+    docs, cursor = asyncio.run(pagination.fetch_page(collection, {}, "updatedAt", {"updatedAt": 1}, None, 1000))
+    assert len(docs) == 10 and cursor is not None
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "e30", pagination.encode_cursor({"updatedAt": START, "_id": "bad"}, "updatedAt")])
+def test_malformed_cursor_is_rejected(collection, cursor):
+    with pytest.raises(HTTPException) as rejected:
+        asyncio.run(pagination.fetch_page(collection, {}, "updatedAt", {"updatedAt": 1}, cursor))
+    assert rejected.value.status_code == 400
+
+
+def test_cursor_for_legacy_documents():
+    oid = ObjectId.from_datetime(START)
+    for doc, expected in [
+        ({"_id": oid}, START),
+        ({"_id": oid, "updatedAt": None}, START),
+        ({"_id": oid, "updatedAt": "not a date"}, START),
+        ({"_id": oid, "updatedAt": "2024-06-01T08:30:00"}, datetime(2024, 6, 1, 8, 30)),
+        ({"_id": oid, "updatedAt": "2024-06-01T08:30:00+02:00"}, datetime(2024, 6, 1, 6, 30)),
+        ({"_id": oid, "updatedAt": datetime(2024, 6, 1, tzinfo=timezone.utc)}, datetime(2024, 6, 1)),
+    ]:
+        assert pagination.decode_cursor(pagination.encode_cursor(doc, "updatedAt")) == (expected, oid)
+
+
+def test_backfilled_legacy_documents_are_paged(collection):
+    db = collection.database
+    legacy = [
+        {"_id": ObjectId.from_datetime(START + timedelta(seconds=30)), "userId": "u1", "n": 100},
+        {"_id": ObjectId(), "userId": "u1", "updatedAt": (START - timedelta(days=1)).isoformat(), "n": 101},
+        {"_id": ObjectId(), "userId": "u1", "updatedAt": "yesterday", "n": 102},
+    ]
+    asyncio.run(collection.insert_many(legacy))
+
+    assert asyncio.run(pagination.backfill_timestamps(db)) == 3
+    assert asyncio.run(pagination.backfill_timestamps(db)) == 0
+
+    docs = [doc for page in asyncio.run(_walk(collection, "u1", 4)) for doc in page]
+    assert sorted(doc["n"] for doc in docs) == [n for n in range(57) if n % 5] + [100, 101, 102]
+    assert len(docs) == len({doc["_id"] for doc in docs})
+    assert docs[0]["n"] == 102 and docs[-1]["n"] == 101
+    assert [doc["n"] for doc in docs if doc["n"] >= 100] == [102, 100, 101]
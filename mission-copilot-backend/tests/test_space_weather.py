@@ -0,0 +1,55 @@
+"""
+Rolling space-weather series
+Windowed mean and max must match a recomputation over the samples in the
+window, including after the ring buffer wraps, and refreshes append only the
+tail of a SWPC series
+"""
+
+import numpy as np
+import pytest
+
+from app.core.space_weather import RollingWindow, _tail, _timestamp
+
+
+@pytest.mark.parametrize("capacity", [16, 1000])
+def test_window_statistics_match_brute_force(capacity):
+    rng = np.random.default_rng(5)
+    window = RollingWindow(window_s=100.0, capacity=capacity)
+    times = np.cumsum(rng.uniform(0.5, 6.0, 2000))
+    values = rng.normal(150.0, 30.0, 2000)
+
+    for n, (t, value) in enumerate(zip(times, values)):
+        assert window.append(t, value)
+        first = max(np.searchsorted(times, t - 100.0, side="right"), n + 1 - capacity)
+        held = values[first:n + 1]
+
+        assert len(window) == len(held)
+        assert window.mean == pytest.approx(held.mean(), rel=1e-9)
+        assert window.max == held.max()
+        assert window.covered_s == pytest.approx(t - times[first])
+
+
+def test_older_samples_are_ignored():
+    window = RollingWindow(window_s=10.0, capacity=8)
+    assert window.extend([(1.0, 5.0), (2.0, 7.0)]) == 2
+    assert window.extend([(2.0, 99.0), (1.5, 99.0), (3.0, 6.0)]) == 1
+    assert (window.latest, window.max, len(window)) == (6.0, 7.0, 3)
+
+
+def test_empty_window():
+    window = RollingWindow(window_s=10.0, capacity=8)
+    assert (window.latest, window.mean, window.max, window.covered_s) == (None, None, None, 0.0)
+
+
+def test_tail_returns_only_new_samples():
+    records = [
+        {"time_tag": "2024-05-01T17:00:00", "flux": 140.0, "frequency": 2800},
+        {"time_tag": "2024-05-02T17:00:00", "flux": 145.0, "frequency": 2800},
+        {"time_tag": "2024-05-02T17:00:00", "flux": 160.0, "frequency": 1000},
+        {"time_tag": "2024-05-03T17:00:00", "flux": "bad", "frequency": 2800},
+        {"time_tag": "2024-05-04T17:00:00", "flux": 150.0, "frequency": 2800},
+    ]
+    after = _timestamp("2024-05-01T17:00:00")
+    assert _tail(records, "flux", after) == [(_timestamp("2024-05-02T17:00:00"), 145.0), (_timestamp("2024-05-04T17:00:00"), 150.0)]
+    assert _tail(records, "flux", _timestamp("2024-05-04T17:00:00")) == []
+    assert len(_tail(records, "flux", None)) == 3
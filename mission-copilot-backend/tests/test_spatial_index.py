@@ -0,0 +1,84 @@
+"""
+Spatial index queries against brute force
+Bucket culling must never drop an object the exact test would keep,
+including around the antimeridian and the poles
+"""
+
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from app.calculators.propagation import EARTH_RADIUS_KM
+from app.core.catalog import Catalog
+from app.core.spatial_index import PositionTimeline, SpatialIndex, _unit
+
+N_OBJECTS = 3000
+
+
+@pytest.fixture(scope="module")
+def index():
+    rng = np.random.default_rng(7)
+    # Uniform on the sphere, at LEO radius
+    direction = rng.normal(size=(N_OBJECTS, 3))
+    direction /= np.linalg.norm(direction, axis=1, keepdims=True)
+    return SpatialIndex(direction * (EARTH_RADIUS_KM + 550.0), epoch_s=0.0)
+
+
+def _brute_radius(index, lat, lon, radius_km):
+    radius = min(math.pi, radius_km / EARTH_RADIUS_KM)
+    return np.flatnonzero(index.unit @ _unit(lat, lon) >= math.cos(radius))
+
+
+def _queries():
+    rng = np.random.default_rng(11)
+    random = [(rng.uniform(-89, 89), rng.uniform(-180, 180), rng.uniform(50, 3000)) for _ in range(400)]
+    antimeridian = [(rng.uniform(-70, 70), sign * rng.uniform(170, 180), rng.uniform(100, 1500))
+                    for sign in (-1, 1) for _ in range(100)]
+    return random + antimeridian + [(24.3, -175.4, 623.0), (89.5, 10.0, 800.0), (-88.0, -179.9, 300.0)]
+
+
+def test_query_radius_matches_brute_force(index):
+    wrong = [
+        (lat, lon, radius_km)
+        for lat, lon, radius_km in _queries()
+        if not np.array_equal(np.sort(index.query_radius(lat, lon, radius_km)), _brute_radius(index, lat, lon, radius_km))
+    ]
+    assert not wrong, f"{len(wrong)} radius queries differ from brute force, e.g. {wrong[:3]}"
+
+
+def test_nearest_matches_brute_force(index):
+    for lat, lon, _ in _queries()[::5]:
+        _, distance = index.nearest(lat, lon, k=5)
+        cos_angle = np.clip(index.unit @ _unit(lat, lon), -1.0, 1.0)
+        expected = np.sort(np.arccos(cos_angle) * EARTH_RADIUS_KM)[:5]
+        # float32 unit vectors: distances agree to well under a kilometre
+        assert np.allclose(distance, expected, rtol=0, atol=0.5), (lat, lon)
+
+
+def test_query_region_wraps_the_antimeridian(index):
+    found = index.query_region(170.0, -170.0, -30.0, 30.0)
+    lat, lon = index.lat, index.lon
+    expected = np.flatnonzero((lat >= -30.0) & (lat <= 30.0) & ((lon >= 170.0) | (lon <= -170.0)))
+    assert np.array_equal(np.sort(found), expected)
+
+
+def test_timeline_advances_consistently_across_threads():
+    catalog = Catalog.from_gp([
+        {"OBJECT_NAME": f"SAT-{i}", "EPOCH": "2024-05-01T00:00:00", "MEAN_MOTION": 15.1, "ECCENTRICITY": 0.001,
+         "INCLINATION": 53.0, "RA_OF_ASC_NODE": 7.0 * i, "ARG_OF_PERICENTER": 0.0, "MEAN_ANOMALY": 11.0 * i,
+         "NORAD_CAT_ID": i}
+        for i in range(1, 200)
+    ])
+    timeline = PositionTimeline(catalog, step_s=60.0, horizon_s=600.0)
+    start = 1_714_521_600.0
+    # Threads race to advance the same timeline, each reading a window as it goes
+    times = [start + 5.0 * n for n in range(120)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        windows = list(pool.map(lambda t: timeline.window(t, t + 600.0), times))
+
+    for window in windows + [timeline.snapshots]:
+        epochs = [s.epoch_s for s in window]
+        assert epochs and all(b - a == 60.0 for a, b in zip(epochs, epochs[1:]))
+    assert timeline.snapshots[0].epoch_s == math.floor(times[-1] / 60.0) * 60.0
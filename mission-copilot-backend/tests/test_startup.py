@@ -0,0 +1,56 @@
+"""
+Import-time budget for the API
+A new worker should be accepting traffic well under a second after it starts,
+so importing app.main must not pull in heavy SDKs or require secrets
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Seconds to import app.main in a fresh interpreter on top of FastAPI itself
+# (best of RUNS; FastAPI's own import time depends on the machine, not on us)
+IMPORT_BUDGET_S = 0.5
+RUNS = 3
+
+# Loaded on first use, never at import
+LAZY_MODULES = ("google.generativeai", "motor", "requests", "skyfield", "pandas")
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import fastapi
+framework = time.perf_counter() - start
+import app.main
+elapsed = time.perf_counter() - start - framework
+print(json.dumps({"elapsed": elapsed, "framework": framework, "modules": sorted(sys.modules)}))
+"""
+
+
+def _import_app() -> dict:
+    # No API keys: startup must not depend on them
+    env = {k: v for k, v in os.environ.items() if k not in ("GEMINI_API_KEY", "GOOGLE_API_KEY")}
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_import_within_budget():
+    elapsed = min(_import_app()["elapsed"] for _ in range(RUNS))
+    assert elapsed < IMPORT_BUDGET_S, f"importing app.main took {elapsed:.2f}s beyond FastAPI (budget {IMPORT_BUDGET_S}s)"
+
+
+def test_heavy_dependencies_are_lazy():
+    modules = set(_import_app()["modules"])
+    loaded = [name for name in LAZY_MODULES if name in modules]
+    assert not loaded, f"imported at startup: {loaded}"
@@ -716,6 +716,23 @@ export default function PlannerPage() {
   const currentChat = chats.find(c => c.id === activeChat);
 
 
+  // Chats listed from MongoDB come without messages; load them when opened
+  useEffect(() => {
+    if (!currentChat || currentChat.messages) return;
+
+    hybridStorage.loadMessages(currentChat)
+      .then((messages) => {
+        setChats(prevChats => prevChats.map(chat => (
+          chat.id === currentChat.id ? { ...chat, messages } : chat
+        )));
+      })
+      .catch((error) => {
+        console.error('❌ Failed to load messages:', error);
+        setError('Failed to load chat messages');
+      });
+  }, [currentChat]);
+
+
   // Create new chat
   const handleNewChat = () => {
     const newChat = {
@@ -773,7 +790,7 @@ export default function PlannerPage() {
   // Send message and generate mission
   const handleSendMessage = async (customInput = null) => {
     const messageContent = customInput || inputMessage;
-    if (!messageContent.trim() || loading) return;
+    if (!messageContent.trim() || loading || !currentChat?.messages) return;
 
 
     const userMessage = {
@@ -943,7 +960,7 @@ export default function PlannerPage() {
                     {chat.name}
                   </h3>
                   <p className="text-xs text-gray-400 mt-1">
-                    {chat.messages.length} messages
+                    {chat.messages ? chat.messages.length : chat.messageCount} messages
                   </p>
                   <p className="text-xs text-gray-500">
                     {new Date(chat.createdAt).toLocaleDateString()}
@@ -1020,7 +1037,7 @@ export default function PlannerPage() {
 
             <button
               onClick={handleExportChat}
-              disabled={!currentChat || currentChat?.messages.length === 0}
+              disabled={!currentChat?.messages || currentChat.messages.length === 0}
               className="flex items-center gap-2 px-3 py-2 bg-slate-700 hover:bg-slate-600 disabled:opacity-50 disabled:cursor-not-allowed text-white rounded-lg text-sm transition-all"
             >
               <Download className="w-4 h-4" />
@@ -1034,7 +1051,7 @@ export default function PlannerPage() {
         <div className="flex-1 overflow-y-auto p-6 space-y-6">
 
           {/* Welcome Message */}
-          {currentChat?.messages.length === 0 && !loading && (
+          {currentChat?.messages?.length === 0 && !loading && (
             <div className="text-center max-w-3xl mx-auto mt-10">
               <div className="text-6xl mb-4">🚀</div>
               <h2 className="text-3xl font-bold text-white mb-2">
@@ -1073,7 +1090,7 @@ export default function PlannerPage() {
 
 
           {/* Chat Messages */}
-          {currentChat?.messages.map((message) => (
+          {currentChat?.messages?.map((message) => (
             <div
               key={message.id}
               className={`flex ${message.role === 'user' ? 'justify-end' : 'justify-start'}`}
@@ -1186,6 +1203,13 @@ export default function PlannerPage() {
                                         </p>
                                       </div>
                                     )}
+                                    {message.missionData.constellation.design_note && (
+                                      <div className="col-span-2 bg-amber-900/20 rounded-lg p-3 border border-amber-500/30">
+                                        <p className="text-xs text-amber-300">
+                                          ⚠️ {message.missionData.constellation.design_note}
+                                        </p>
+                                      </div>
+                                    )}
                                   </>
                                 )}
                               </div>
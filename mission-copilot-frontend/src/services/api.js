@@ -75,12 +75,13 @@ export const deleteMission = async (missionId) => {
 
 /**
  * Save a chat to MongoDB
+ * Only messages past the stored count are written unless repair is set,
+ * which rewrites every message (use after a failed delta save)
  */
-export const saveChat = async (chatId, name, messages, userId = 'temp-user') => {
+export const saveChat = async (chatId, name, messages, userId = 'temp-user', repair = false) => {
   try {
-    const response = await axios.post(`${API_BASE_URL}/api/chats`, null, {
-      params: { chatId, name, userId },
-      data: { messages },
+    const response = await axios.post(`${API_BASE_URL}/api/chats`, { messages }, {
+      params: { chatId, name, userId, repair },
       headers: { 'Content-Type': 'application/json' }
     });
     console.log('✅ Chat saved to MongoDB:', response.data);
@@ -92,7 +93,22 @@ export const saveChat = async (chatId, name, messages, userId = 'temp-user') =>
 };
 
 /**
- * Get all chats from MongoDB
+ * Save only the messages that changed since baseVersion
+ * changes: [{ seq, message }]; rejects with status 409 when the chat was
+ * saved elsewhere in the meantime
+ */
+export const syncChat = async (chatId, baseVersion, name, changes, userId = 'temp-user') => {
+  const response = await axios.patch(`${API_BASE_URL}/api/chats/${chatId}`, {
+    baseVersion,
+    name,
+    messages: changes,
+    userId
+  });
+  return response.data;
+};
+
+/**
+ * Get all chat headers from MongoDB (messageCount, no messages)
  */
 export const getAllChats = async (userId = 'temp-user') => {
   try {
@@ -107,6 +123,22 @@ export const getAllChats = async (userId = 'temp-user') => {
   }
 };
 
+/**
+ * Get every message of a chat, walking the pages from newest to oldest
+ */
+export const getChatMessages = async (chatId) => {
+  let messages = [];
+  let before = null;
+  do {
+    const response = await axios.get(`${API_BASE_URL}/api/chats/${chatId}/messages`, {
+      params: { limit: 200, ...(before === null ? {} : { before }) }
+    });
+    messages = [...response.data.messages, ...messages];
+    before = response.data.nextBefore;
+  } while (before !== null && before !== undefined);
+  return messages;
+};
+
 /**
  * Delete a chat from MongoDB
  */
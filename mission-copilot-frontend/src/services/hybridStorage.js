@@ -7,7 +7,7 @@
  * - Saves to both for redundancy
  */
 
-import { getAllChats, saveChat, deleteChat as deleteChatAPI } from './api';
+import { getAllChats, getChatMessages, saveChat, syncChat, deleteChat as deleteChatAPI } from './api';
 import { missionStorage } from '../hooks/useLocalStorage';
 
 const STORAGE_MODE = {
@@ -20,6 +20,63 @@ class HybridStorage {
   constructor() {
     this.currentMode = STORAGE_MODE.HYBRID;
     this.mongoDBAvailable = null; // null = unknown, true/false = tested
+    // Last state saved to MongoDB per chat: { version, name, messages (JSON strings) }
+    this.synced = new Map();
+  }
+
+  rememberSynced(chatId, version, name, messages) {
+    this.synced.set(chatId, {
+      version,
+      name,
+      messages: messages.map((message) => JSON.stringify(message))
+    });
+  }
+
+  /**
+   * Save to MongoDB, sending only new or edited messages when the chat's
+   * saved version is known; falls back to a full save on conflict
+   */
+  async saveToMongoDB(chatId, chatName, messages, userId) {
+    const synced = this.synced.get(chatId);
+    if (synced && messages.length >= synced.messages.length) {
+      const changes = [];
+      messages.forEach((message, seq) => {
+        if (JSON.stringify(message) !== synced.messages[seq]) {
+          changes.push({ seq, message });
+        }
+      });
+      if (changes.length === 0 && chatName === synced.name) {
+        return;
+      }
+
+      try {
+        const result = await syncChat(chatId, synced.version, chatName, changes, userId);
+        this.rememberSynced(chatId, result.version, chatName, messages);
+        return;
+      } catch (error) {
+        // 409: saved elsewhere since; 422: our copy of the saved state is off
+        if (![409, 422].includes(error.response?.status)) {
+          throw error;
+        }
+        console.warn('⚠️ Chat changed elsewhere, saving full copy');
+      }
+    }
+
+    // Without a known saved state the server keeps the messages it has
+    // and appends the rest; otherwise our copy differs, so rewrite it all
+    const saved = await saveChat(chatId, chatName, messages, userId, Boolean(synced));
+    this.rememberSynced(chatId, saved.version, chatName, messages);
+  }
+
+  /**
+   * Load the messages of one chat listed by loadChats
+   */
+  async loadMessages(chat) {
+    const chatId = chat.chatId || chat.id;
+    const messages = await getChatMessages(chatId);
+    this.rememberSynced(chatId, chat.version || 0, chat.name, messages);
+    this.syncToLocalStorage([{ ...chat, messages }]);
+    return messages;
   }
 
   /**
@@ -46,12 +103,10 @@ class HybridStorage {
 
     // Try MongoDB first
     try {
+      // Headers only: messages are loaded per chat with loadMessages
       const mongoChats = await getAllChats(userId);
       console.log('✅ Loaded from MongoDB:', mongoChats.length, 'chats');
       
-      // Sync to localStorage for offline backup
-      this.syncToLocalStorage(mongoChats);
-      
       this.mongoDBAvailable = true;
       return {
         chats: mongoChats,
@@ -90,7 +145,7 @@ class HybridStorage {
     // Try MongoDB first
     if (this.mongoDBAvailable !== false) {
       try {
-        await saveChat(chatId, chatName, messages, userId);
+        await this.saveToMongoDB(chatId, chatName, messages, userId);
         console.log('✅ Saved to MongoDB');
         mongoSuccess = true;
         this.mongoDBAvailable = true;
@@ -122,6 +177,7 @@ class HybridStorage {
    */
   async deleteChat(chatId, userId = 'temp-user') {
     console.log('🗑️ Deleting chat with hybrid storage...');
+    this.synced.delete(chatId);
 
     let mongoSuccess = false;
     let localSuccess = false;